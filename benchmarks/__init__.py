@@ -0,0 +1,9 @@
+from .synthetic import SyntheticDataset
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+__all__ = [
+    'SyntheticDataset'
+]
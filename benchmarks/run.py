@@ -0,0 +1,232 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import logging
+import multiprocessing as mp
+from queue import Empty
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .synthetic import SyntheticDataset
+
+FORMATS = ["coco", "csv", "voc", "yolo", "parquet"]
+# output location of each format, "" for folders
+SAVE_EXTENSIONS = {"coco": ".json", "csv": ".csv", "voc": "", "yolo": "", "parquet": ""}
+ANN_TYPES = ["coco", "csv", "voc", "yolo", "parquet"]
+
+
+class ConversionBenchmark:
+    """ time every Convertor path and Sample.describe_* call on a synthetic dataset, one process per case """
+
+    def __init__(self, work_dir: str, n_images: int = 1000, boxes_per_image: int = 5, n_classes: int = 10,
+                 depth: int = 0, repeat: int = 1, only: list = None, timeout: float = 3600):
+        """
+        :param work_dir: folder for the dataset, the outputs and the image metadata cache
+        :param n_images: number of synthetic images
+        :param boxes_per_image: average number of boxes per image
+        :param n_classes: number of object classes
+        :param depth: number of nested image folders
+        :param repeat: number of runs of each case, the fastest one is recorded
+        :param only: case names to run, all of them by default
+        :param timeout: seconds a case may run before it is stopped and reported as failed
+        """
+        self.work_dir = work_dir
+        self.config = {"n_images": n_images, "boxes_per_image": boxes_per_image, "n_classes": n_classes,
+                       "depth": depth, "repeat": repeat}
+        self.dataset = SyntheticDataset(os.path.join(work_dir, "dataset"), n_images, boxes_per_image, n_classes, depth)
+        self.only = only
+        self.timeout = timeout
+
+    def cases(self):
+        """
+        :return: list of case names, i.e. "voc2coco", "csv2multilabel", "describe_ann[yolo]"
+        """
+        names = [f"{src}2{dst}" for src in FORMATS for dst in FORMATS if src != dst]
+        names += ["csv2multilabel", "describe_data"] + [f"describe_ann[{ann_type}]" for ann_type in ANN_TYPES]
+        if not self.__hasArrow():
+            names = [n for n in names if "parquet" not in n]
+        if self.only:
+            names = [n for n in names if n in self.only]
+        return names
+
+    def run(self):
+        """ generate the dataset and run the cases.
+
+        :return: {"meta" : {..}, "results" : [{name, wall_seconds, cpu_seconds, peak_rss_mb, rows, rows_per_sec}, ..]}
+        """
+        paths = self.dataset.generate()
+        if self.__hasArrow():
+            paths["parquet"] = os.path.join(self.work_dir, "dataset", "parquet")
+            self.__runIsolated("csv2parquet", dict(paths, parquet=None), paths["parquet"])
+
+        results = []
+        for name in self.cases():
+            rows = self.dataset.n_images if name == "describe_data" else self.dataset.n_boxes
+            runs = []
+            for _ in range(self.config["repeat"]):
+                save_path = os.path.join(self.work_dir, "out", name + self.__saveExtension(name))
+                runs.append(self.__runIsolated(name, paths, save_path))
+            best = min(runs, key=lambda r: r.get("wall_seconds", float("inf")))
+            best.update({"name": name, "rows": rows})
+            if "wall_seconds" in best:
+                best["rows_per_sec"] = rows / max(best["wall_seconds"], 1e-9)
+                logger.info(f"{name:<24} {best['wall_seconds']:8.3f}s {best['rows_per_sec']:12.0f} rows/sec "
+                            f"{best['peak_rss_mb'] or 0:8.1f} MB")
+            else:
+                logger.error(f"{name:<24} failed : {best.get('error')}")
+            results.append(best)
+        return {"meta": self.__meta(), "results": results}
+
+    @staticmethod
+    def compare(base: dict, current: dict, threshold: float = 1.1):
+        """
+        :param base: run() result of the reference commit
+        :param current: run() result to check
+        :param threshold: wall time ratio reported as a regression
+        :return: list of (name, base seconds, current seconds, ratio) of the regressed cases
+        """
+        base_walls = {r["name"]: r.get("wall_seconds") for r in base["results"]}
+        regressions = []
+        for record in current["results"]:
+            old, new = base_walls.get(record["name"]), record.get("wall_seconds")
+            if old and new:
+                ratio = new / old
+                logger.info(f"{record['name']:<24} {old:8.3f}s -> {new:8.3f}s  x{ratio:.2f}")
+                if ratio > threshold:
+                    regressions.append((record["name"], old, new, ratio))
+        return regressions
+
+    def __runIsolated(self, name: str, paths: dict, save_path: str):
+        """ run a case in a fresh interpreter, so the peak RSS and the import time belong to that case only. """
+        if os.path.isdir(save_path):
+            shutil.rmtree(save_path)
+        elif os.path.exists(save_path):
+            os.remove(save_path)
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        cache_dir = tempfile.mkdtemp(dir=self.work_dir, prefix="cache-")
+        ctx = mp.get_context("spawn")
+        queue = ctx.Queue()
+        process = ctx.Process(target=_runCase, args=(name, paths, save_path, cache_dir, queue))
+        process.start()
+        deadline = time.monotonic() + self.timeout
+        result = None
+        while result is None:
+            try:
+                result = queue.get(timeout=1)
+            except Empty:
+                if not process.is_alive():
+                    # the child died before reporting, i.e. killed by a signal or the OOM killer
+                    try:
+                        result = queue.get(timeout=1)
+                    except Empty:
+                        result = {"error": f"the case process exited with code {process.exitcode}"}
+                elif time.monotonic() > deadline:
+                    process.terminate()
+                    result = {"error": f"timed out after {self.timeout}s"}
+        process.join()
+        if process.exitcode and "error" not in result:
+            result = {"error": f"the case process exited with code {process.exitcode}"}
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return result
+
+    @staticmethod
+    def __saveExtension(name: str):
+        if name.startswith("describe"):
+            return ""
+        if name == "csv2multilabel":
+            return ".csv"
+        return SAVE_EXTENSIONS[name.split("2", 1)[1]]
+
+    @staticmethod
+    def __hasArrow():
+        import importlib.util
+        return importlib.util.find_spec("pyarrow") is not None
+
+    def __meta(self):
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.decode().strip()
+        except OSError:
+            commit = ""
+        return {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                "platform": platform.platform(), "cpus": os.cpu_count(), "config": self.config,
+                "n_boxes": self.dataset.n_boxes}
+
+
+def _runCase(name: str, paths: dict, save_path: str, cache_dir: str, queue):
+    """ child process body, puts the measurements of a single case in the queue. """
+    os.environ["IMGANN_CACHE_DIR"] = cache_dir
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        from imgann import Convertor, Sample
+        from imgann.operators.stages import _peakRss
+        import_seconds = time.perf_counter() - start
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        if name == "describe_data":
+            Sample.describe_data(paths["images"])
+        elif name.startswith("describe_ann"):
+            ann_type = name[len("describe_ann["):-1]
+            Sample.describe_ann(paths["images"], paths[ann_type], ann_type)
+        elif name == "csv2multilabel":
+            Convertor.csv2multilabel(paths["csv"], save_path)
+        else:
+            src = name.split("2", 1)[0]
+            getattr(Convertor, name)(paths["images"], paths[src], save_path)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        queue.put({"wall_seconds": wall, "cpu_seconds": cpu, "peak_rss_mb": _peakRss(),
+                   "import_seconds": import_seconds})
+    except BaseException as error:
+        queue.put({"error": f"{type(error).__name__} {error}"})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="imgann conversion benchmarks on synthetic datasets")
+    parser.add_argument("--images", type=int, default=1000, help="number of images")
+    parser.add_argument("--boxes", type=int, default=5, help="average number of boxes per image")
+    parser.add_argument("--classes", type=int, default=10, help="number of object classes")
+    parser.add_argument("--depth", type=int, default=0, help="number of nested image folders")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, the fastest is recorded")
+    parser.add_argument("--only", nargs="*", help="case names to run, i.e. voc2coco describe_data")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds before a case is reported as failed")
+    parser.add_argument("--work-dir", help="dataset and output folder, a temporary folder by default")
+    parser.add_argument("--output", default="benchmark.json", help="JSON result file")
+    parser.add_argument("--compare", help="JSON result of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.1, help="wall time ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="imgann-bench-")
+    bench = ConversionBenchmark(work_dir, args.images, args.boxes, args.classes, args.depth, args.repeat, args.only,
+                                args.timeout)
+    result = bench.run()
+    with open(args.output, "w") as fp:
+        json.dump(result, fp, indent=2)
+    logger.info(f"\nresults saved in <{args.output}>")
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, "r") as fp:
+            regressions = ConversionBenchmark.compare(json.load(fp), result, args.threshold)
+        for name, old, new, ratio in regressions:
+            logger.warning(f"\nWARNING : {name} is x{ratio:.2f} slower ({old:.3f}s -> {new:.3f}s)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import zlib
+import struct
+import logging
+import numpy as np
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+IMAGE_SIZES = [(640, 480), (800, 600), (1024, 768)]
+
+VOC_TEMPLATE = ("<annotation><folder>{folder}</folder><filename>{name}</filename><path>{path}</path>"
+                "<size><width>{width}</width><height>{height}</height><depth>3</depth></size>{objects}</annotation>")
+VOC_OBJECT = ("<object><name>{label}</name><pose>Unspecified</pose><truncated>0</truncated><difficult>0</difficult>"
+              "<bndbox><xmin>{x_min}</xmin><ymin>{y_min}</ymin><xmax>{x_max}</xmax><ymax>{y_max}</ymax></bndbox></object>")
+
+
+class SyntheticDataset:
+    """ generate an image dataset of placeholder images with the same boxes in COCO, Pascal VOC, YOLO and csv formats """
+
+    def __init__(self, root: str, n_images: int = 1000, boxes_per_image: int = 5, n_classes: int = 10,
+                 depth: int = 0, seed: int = 0):
+        """
+        :param root: output folder
+        :param n_images: number of images
+        :param boxes_per_image: average number of boxes, each image has 1 .. 2 * boxes_per_image - 1 boxes
+        :param n_classes: number of object classes
+        :param depth: number of nested folders the images are spread over, 8 sub folders per level
+        :param seed: random seed of the boxes
+        """
+        self.root = root
+        self.n_images = n_images
+        self.boxes_per_image = boxes_per_image
+        self.n_classes = n_classes
+        self.depth = depth
+        self.seed = seed
+        self.paths = {"images": os.path.join(root, "images"),
+                      "coco": os.path.join(root, "coco.json"),
+                      "csv": os.path.join(root, "ann.csv"),
+                      "voc": os.path.join(root, "voc"),
+                      # yolo labels are matched with the images found in the same walk
+                      "yolo": root}
+        self.n_boxes = 0
+
+    def generate(self):
+        """ write the images and the annotation files.
+
+        :return: {format : path} of the dataset and annotation locations
+        """
+        rng = np.random.default_rng(self.seed)
+        classes = [f"class_{i}" for i in range(self.n_classes)]
+        placeholders = {size: self.__png(*size) for size in IMAGE_SIZES}
+        for folder in ["images", "voc"]:
+            os.makedirs(self.paths[folder], exist_ok=True)
+        os.makedirs(os.path.join(self.root, "yolo"), exist_ok=True)
+
+        coco_images, coco_anns, csv_rows = [], [], []
+        n_boxes = rng.integers(1, 2 * self.boxes_per_image, size=self.n_images)
+        for i in range(self.n_images):
+            width, height = IMAGE_SIZES[i % len(IMAGE_SIZES)]
+            name = f"img{i:07d}.png"
+            folder = os.path.join(self.paths["images"], *[f"d{(i >> (3 * j)) % 8}" for j in range(self.depth)])
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, name)
+            with open(path, "wb") as fp:
+                fp.write(placeholders[(width, height)])
+
+            labels = rng.integers(0, self.n_classes, size=n_boxes[i])
+            x_min = rng.integers(0, width // 2, size=n_boxes[i])
+            y_min = rng.integers(0, height // 2, size=n_boxes[i])
+            x_max = x_min + rng.integers(2, width // 2, size=n_boxes[i])
+            y_max = y_min + rng.integers(2, height // 2, size=n_boxes[i])
+
+            coco_images.append({"id": i + 1, "file_name": name, "width": width, "height": height})
+            voc_objects, yolo_lines = [], []
+            for label, x0, y0, x1, y1 in zip(labels.tolist(), x_min.tolist(), y_min.tolist(),
+                                             x_max.tolist(), y_max.tolist()):
+                self.n_boxes += 1
+                coco_anns.append({"id": self.n_boxes, "image_id": i + 1, "category_id": label + 1,
+                                  "bbox": [(x0 + x1) // 2, (y0 + y1) // 2, x1 - x0, y1 - y0],
+                                  "area": (x1 - x0) * (y1 - y0), "iscrowd": 0})
+                csv_rows.append(f"{name},{width},{height},{classes[label]},{x0},{y0},{x1},{y1}")
+                voc_objects.append(VOC_OBJECT.format(label=classes[label], x_min=x0, y_min=y0, x_max=x1, y_max=y1))
+                yolo_lines.append(f"{label} {(x0 + x1) / 2 / width:.6f} {(y0 + y1) / 2 / height:.6f} "
+                                  f"{(x1 - x0) / width:.6f} {(y1 - y0) / height:.6f}")
+
+            stem = name.rsplit(".", 1)[0]
+            with open(os.path.join(self.paths["voc"], stem + ".xml"), "w") as fp:
+                fp.write(VOC_TEMPLATE.format(folder=os.path.basename(folder), name=name, path=path, width=width,
+                                             height=height, objects="".join(voc_objects)))
+            with open(os.path.join(self.root, "yolo", stem + ".txt"), "w") as fp:
+                fp.write("\n".join(yolo_lines) + "\n")
+
+        with open(self.paths["coco"], "w") as fp:
+            json.dump({"images": coco_images, "annotations": coco_anns,
+                       "categories": [{"id": i + 1, "name": c, "supercategory": "none"}
+                                      for i, c in enumerate(classes)]}, fp)
+        with open(self.paths["csv"], "w") as fp:
+            fp.write("filename,width,height,class,xmin,ymin,xmax,ymax\n" + "\n".join(csv_rows) + "\n")
+
+        logger.info(f"\ngenerated {self.n_images} images and {self.n_boxes} boxes in <{self.root}>")
+        return self.paths
+
+    @staticmethod
+    def __png(width: int, height: int):
+        """
+        :return: bytes of a black RGB .png image of the given size
+        """
+        def chunk(tag, data):
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+        raw = b"".join(b"\x00" + bytes(3 * width) for _ in range(height))
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(raw, 9)) + chunk(b"IEND", b""))
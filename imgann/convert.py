@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 
 from .operators.imgdata import ImgData
-from .operators import coco, csv, pascalvoc, yolo
+from .operators import coco, csv, parquet, pascalvoc, yolo
+from .operators.filewriter import FileWriter
+from .operators import stages
+from .operators.stages import conversion
 import logging
 import os
 
@@ -17,11 +20,24 @@ class Convertor:
     """ convert method implementation class """
 
     @staticmethod
+    def instrument(sink="log", profile: bool = False):
+        """record wall time, cpu time, peak memory and item counts of each stage of the following conversions
+
+        Args:
+            sink (str | callable, optional): "log" to log a table per conversion, a .json file path to save the report, a function called with the report dictionary, or None to turn the instrumentation off. Defaults to "log".
+            profile (bool, optional): also capture cProfile stats and tracemalloc allocation peaks, slows the conversion down. Defaults to False.
+        """
+        stages.configure(sink, profile)
+
+    @staticmethod
+    @conversion
     def coco2csv(dataset_dir: str,
                  coco_ann_dir: str,
                  save_dir: str,
                  center: bool = True,
-                 is_multilabel: bool = False):
+                 is_multilabel: bool = False,
+                 cache: bool = False,
+                 chunk_size: int = None):
         """convert coco to csv format
 
         Args:
@@ -30,24 +46,25 @@ class Convertor:
             save_dir (str): .csv file saving location
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
             is_multilabel (bool, optional): directly convert to TF multi-label One-Hot encoded version without bbox data. Defaults to False.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            chunk_size (int, optional): write the .csv file in chunks of this many rows to bound the memory use, not used with is_multilabel. Defaults to None.
         """
-        imgdataset = ImgData.extract(dataset_dir)
+        imgdataset = ImgData.extract(dataset_dir, cache=cache)
         coco_obj = coco.COCO(imgdataset.dataset)
         coco_obj.extract(coco_ann_dir, center)
-        df = coco_obj.get_dataset()
-        ann, clas = coco_obj.get_annotations()
-
-        csv_obj = csv.CSV(df)
-        csv_obj.set_annotations(ann)
-        csv_obj.set_classes(clas)
-        csv_fomatted = csv_obj.translate(is_multilabel)
+        csv_obj = csv.CSV.from_annotation_set(coco_obj.export())
+        csv_fomatted = csv_obj.translate(is_multilabel, chunk_size)
         csv_obj.archive(save_dir, csv_fomatted)
 
     @staticmethod
+    @conversion
     def coco2voc(dataset_dir: str,
                  coco_ann_dir: str,
                  save_dir: str,
-                 center: bool = True):
+                 center: bool = True,
+                 cache: bool = False,
+                 n_writers: int = 4,
+                 queue_depth: int = 64):
         """convert coco to pascal VOC format
 
         Args:
@@ -55,28 +72,31 @@ class Convertor:
             coco_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str):  .xml files saving location
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
         """
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-        imgdataset = ImgData.extract(dataset_dir)
+        imgdataset = ImgData.extract(dataset_dir, cache=cache)
         coco_obj = coco.COCO(imgdataset.dataset)
         coco_obj.extract(coco_ann_dir, center)
-        df = coco_obj.get_dataset()
-        ann, cls = coco_obj.get_annotations()
-
-        voc_obj = pascalvoc.PascalVOC(df)
-        voc_obj.set_annotations(ann)
-        voc_obj.set_classes(cls)
-        for xml, name in voc_obj.translate():
-            file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
-            voc_obj.archive(file_dir, xml)
+        voc_obj = pascalvoc.PascalVOC.from_annotation_set(coco_obj.export())
+        with FileWriter(voc_obj.archive, n_writers, queue_depth) as writer:
+            for xml, name in voc_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
+                writer.submit(file_dir, xml)
 
     @staticmethod
+    @conversion
     def coco2yolo(dataset_dir: str,
                  coco_ann_dir: str,
                  save_dir: str,
-                 center: bool = True):
+                 center: bool = True,
+                  cache: bool = False,
+                  n_writers: int = 4,
+                  queue_depth: int = 64):
         """convert coco to yolo format
 
         Args:
@@ -84,28 +104,31 @@ class Convertor:
             coco_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .txt files saving location
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
         """
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-        imgdataset = ImgData.extract(dataset_dir)
+        imgdataset = ImgData.extract(dataset_dir, cache=cache)
         coco_obj = coco.COCO(imgdataset.dataset)
         coco_obj.extract(coco_ann_dir, center)
-        df = coco_obj.get_dataset()
-        ann, cls = coco_obj.get_annotations()
-
-        yolo_obj = yolo.Yolo(df)
-        yolo_obj.set_annotations(ann)
-        yolo_obj.set_classes(cls)
-        for data, name in yolo_obj.translate():
-            file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
-            yolo_obj.archive(file_dir, data)
+        yolo_obj = yolo.Yolo.from_annotation_set(coco_obj.export())
+        with FileWriter(yolo_obj.archive, n_writers, queue_depth) as writer:
+            for data, name in yolo_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
+                writer.submit(file_dir, data)
 
     @staticmethod
+    @conversion
     def csv2coco(dataset_dir: str,
                  csv_ann_dir: str,
                  save_dir: str,
-                 center: bool = True):
+                 center: bool = True,
+                 cache: bool = False,
+                 compact: bool = False,
+                 chunk_size: int = None):
         """convert .csv into coco format
 
         Args:
@@ -113,78 +136,90 @@ class Convertor:
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .json file saving location
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            compact (bool, optional): write the .json file without white spaces. Defaults to False.
+            chunk_size (int, optional): read the .csv file in chunks of this many rows to bound the memory use. Defaults to None.
         """
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         csv_obj = csv.CSV(imagedataset.dataset)
-        csv_obj.extract(csv_ann_dir)
-        df = csv_obj.get_dataset()
-        ann, cls = csv_obj.get_annotations()
-
-        coco_obj = coco.COCO(df)
-        coco_obj.set_annotations(ann)
-        coco_obj.set_classes(cls)
+        csv_obj.extract(csv_ann_dir, chunk_size)
+        coco_obj = coco.COCO.from_annotation_set(csv_obj.export())
         data = coco_obj.translate(center)
-        coco_obj.archive(save_dir, data)
+        coco_obj.archive(save_dir, data, compact)
 
     @staticmethod
+    @conversion
     def csv2voc(dataset_dir: str,
                 csv_ann_dir: str,
-                save_dir: str):
+                save_dir: str,
+                cache: bool = False,
+                n_writers: int = 4,
+                queue_depth: int = 64,
+                chunk_size: int = None):
         """convert .csv into pascal VOC format
 
         Args:
             dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .xml files saving location
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
+            chunk_size (int, optional): read the .csv file in chunks of this many rows to bound the memory use. Defaults to None.
         """
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         csv_obj = csv.CSV(imagedataset.dataset)
-        csv_obj.extract(csv_ann_dir)
-        df = csv_obj.get_dataset()
-        ann, cls = csv_obj.get_annotations()
-
-        voc_obj = pascalvoc.PascalVOC(df)
-        voc_obj.set_annotations(ann)
-        voc_obj.set_classes(cls)
-        for xml, name in voc_obj.translate():
-            file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
-            voc_obj.archive(file_dir, xml)
+        csv_obj.extract(csv_ann_dir, chunk_size)
+        voc_obj = pascalvoc.PascalVOC.from_annotation_set(csv_obj.export())
+        with FileWriter(voc_obj.archive, n_writers, queue_depth) as writer:
+            for xml, name in voc_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
+                writer.submit(file_dir, xml)
 
     @staticmethod
+    @conversion
     def csv2yolo(dataset_dir: str,
                 csv_ann_dir: str,
-                save_dir: str):
+                save_dir: str,
+                 cache: bool = False,
+                 n_writers: int = 4,
+                 queue_depth: int = 64,
+                 chunk_size: int = None):
         """convert .csv into pascal yolo format
 
         Args:
             dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .txt files saving location
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
+            chunk_size (int, optional): read the .csv file in chunks of this many rows to bound the memory use. Defaults to None.
         """
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         csv_obj = csv.CSV(imagedataset.dataset)
-        csv_obj.extract(csv_ann_dir)
-        df = csv_obj.get_dataset()
-        ann, cls = csv_obj.get_annotations()
-
-        yolo_obj = yolo.Yolo(df)
-        yolo_obj.set_annotations(ann)
-        yolo_obj.set_classes(cls)
-        for data, name in yolo_obj.translate():
-            file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
-            yolo_obj.archive(file_dir, data)
+        csv_obj.extract(csv_ann_dir, chunk_size)
+        yolo_obj = yolo.Yolo.from_annotation_set(csv_obj.export())
+        with FileWriter(yolo_obj.archive, n_writers, queue_depth) as writer:
+            for data, name in yolo_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
+                writer.submit(file_dir, data)
 
     @staticmethod
+    @conversion
     def voc2coco(dataset_dir: str,
                  voc_ann_dir: str,
                  save_dir: str,
-                 center: bool = True):
+                 center: bool = True,
+                 cache: bool = False,
+                 n_workers: int = 1,
+                 compact: bool = False):
         """convert Pascal-VOC to COCO format
 
         Args:
@@ -192,24 +227,26 @@ class Convertor:
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .json file saving location,
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_workers (int, optional): number of processes used to read the .xml files. Defaults to 1.
+            compact (bool, optional): write the .json file without white spaces. Defaults to False.
         """
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         voc_obj = pascalvoc.PascalVOC(imagedataset.dataset)
-        voc_obj.extract(voc_ann_dir)
-        df = voc_obj.get_dataset()
-        ann, cls = voc_obj.get_annotations()
-
-        coco_obj = coco.COCO(df)
-        coco_obj.set_annotations(ann)
-        coco_obj.set_classes(cls)
+        voc_obj.extract(voc_ann_dir, n_workers)
+        coco_obj = coco.COCO.from_annotation_set(voc_obj.export())
         data = coco_obj.translate(center)
-        coco_obj.archive(save_dir, data)
+        coco_obj.archive(save_dir, data, compact)
 
     @staticmethod
+    @conversion
     def voc2csv(dataset_dir: str,
                 voc_ann_dir: str,
                 save_dir: str,
-                is_multilabel: bool = False):
+                is_multilabel: bool = False,
+                cache: bool = False,
+                n_workers: int = 1,
+                chunk_size: int = None):
         """convert Pascal-VOC to csv format
 
         Args:
@@ -217,23 +254,26 @@ class Convertor:
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .csv file saving location,
             is_multilabel (bool, optional): directly convert to TF multi-label One-Hot encoded version without bbox data. Defaults to False.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_workers (int, optional): number of processes used to read the .xml files. Defaults to 1.
+            chunk_size (int, optional): write the .csv file in chunks of this many rows to bound the memory use, not used with is_multilabel. Defaults to None.
         """
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         voc_obj = pascalvoc.PascalVOC(imagedataset.dataset)
-        voc_obj.extract(voc_ann_dir)
-        df = voc_obj.get_dataset()
-        ann, cls = voc_obj.get_annotations()
-
-        csv_obj = csv.CSV(df)
-        csv_obj.set_annotations(ann)
-        csv_obj.set_classes(cls)
-        csv_fomatted = csv_obj.translate(is_multilabel)
+        voc_obj.extract(voc_ann_dir, n_workers)
+        csv_obj = csv.CSV.from_annotation_set(voc_obj.export())
+        csv_fomatted = csv_obj.translate(is_multilabel, chunk_size)
         csv_obj.archive(save_dir, csv_fomatted)
 
     @staticmethod
+    @conversion
     def voc2yolo(dataset_dir: str,
                 voc_ann_dir: str,
-                save_dir: str):
+                save_dir: str,
+                 cache: bool = False,
+                 n_workers: int = 1,
+                 n_writers: int = 4,
+                 queue_depth: int = 64):
         """convert Pascal-VOC to yolo format
 
         Args:
@@ -241,31 +281,32 @@ class Convertor:
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .txt files saving location,
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_workers (int, optional): number of processes used to read the .xml files. Defaults to 1.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
         """
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         voc_obj = pascalvoc.PascalVOC(imagedataset.dataset)
-        voc_obj.extract(voc_ann_dir)
-        df = voc_obj.get_dataset()
-        ann, cls = voc_obj.get_annotations()
-
-        yolo_obj = yolo.Yolo(df)
-        yolo_obj.set_annotations(ann)
-        yolo_obj.set_classes(cls)
-        for data, name in yolo_obj.translate():
-            file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
-            yolo_obj.archive(file_dir, data)
+        voc_obj.extract(voc_ann_dir, n_workers)
+        yolo_obj = yolo.Yolo.from_annotation_set(voc_obj.export())
+        with FileWriter(yolo_obj.archive, n_writers, queue_depth) as writer:
+            for data, name in yolo_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
+                writer.submit(file_dir, data)
 
     @staticmethod
+    @conversion
     def csv2multilabel(csv_dir: str,
                        save_dir: str):
         """Convert Object detection related annotation formatted .csv file into classification related .csv file
 
         Args:
             csv_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
-            save_dir (str): .csv file saving location
+            save_dir (str): .csv file saving location, a .npz or .parquet location saves the sparse matrix instead
 
         Returns:
             None | save .csv file in <save_dir> location
@@ -275,10 +316,14 @@ class Convertor:
         csv_obj.archive(save_dir, df)
 
     @staticmethod
+    @conversion
     def yolo2coco(dataset_dir: str,
                   yolo_ann_dir: str,
                   save_dir: str,
-                  center: bool = True):
+                  center: bool = True,
+                  cache: bool = False,
+                  compact: bool = False,
+                  metadata_cache=False):
 
         """convert yolo to coco format
 
@@ -287,51 +332,58 @@ class Convertor:
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .json file saving location
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            compact (bool, optional): write the .json file without white spaces. Defaults to False.
+            metadata_cache (bool | str, optional): keep the image sizes read from the image headers in the MetadataCache, True for its default location or a path to the sqlite file. Defaults to False.
         """
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         yolo_obj = yolo.Yolo(imagedataset.dataset)
-        yolo_obj.extract(yolo_ann_dir)
-        df = yolo_obj.get_dataset()
-        ann, cls = yolo_obj.get_annotations()
-
-        coco_obj = coco.COCO(df)
-        coco_obj.set_annotations(ann)
-        coco_obj.set_classes(cls)
+        yolo_obj.extract(yolo_ann_dir, metadata_cache)
+        coco_obj = coco.COCO.from_annotation_set(yolo_obj.export())
         data = coco_obj.translate(center)
-        coco_obj.archive(save_dir, data)
+        coco_obj.archive(save_dir, data, compact)
 
     @staticmethod
+    @conversion
     def yolo2voc(dataset_dir: str,
                  yolo_ann_dir: str,
-                 save_dir: str):
+                 save_dir: str,
+                 cache: bool = False,
+                 n_writers: int = 4,
+                 queue_depth: int = 64,
+                 metadata_cache=False):
         """convert yolo to Pascal-VOC format
 
         Args:
             dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .xml files saving location
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
+            metadata_cache (bool | str, optional): keep the image sizes read from the image headers in the MetadataCache, True for its default location or a path to the sqlite file. Defaults to False.
         """
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
             
-        imagedataset = ImgData.extract(dataset_dir)
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         yolo_obj = yolo.Yolo(imagedataset.dataset)
-        yolo_obj.extract(yolo_ann_dir)
-        df = yolo_obj.get_dataset()
-        ann, cls = yolo_obj.get_annotations()
-
-        voc_obj = pascalvoc.PascalVOC(df)
-        voc_obj.set_annotations(ann)
-        voc_obj.set_classes(cls)
-        for xml, name in voc_obj.translate():
-            file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
-            voc_obj.archive(file_dir, xml)
+        yolo_obj.extract(yolo_ann_dir, metadata_cache)
+        voc_obj = pascalvoc.PascalVOC.from_annotation_set(yolo_obj.export())
+        with FileWriter(voc_obj.archive, n_writers, queue_depth) as writer:
+            for xml, name in voc_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
+                writer.submit(file_dir, xml)
 
     @staticmethod
+    @conversion
     def yolo2csv(dataset_dir: str,
                  yolo_ann_dir: str,
                  save_dir: str,
-                 is_multilabel: bool = False):
+                 is_multilabel: bool = False,
+                 cache: bool = False,
+                 chunk_size: int = None,
+                 metadata_cache=False):
         """convert yolo to csv format
 
         Args:
@@ -339,15 +391,235 @@ class Convertor:
             csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
             save_dir (str): .csv file saving location
             is_multilabel (bool, optional): directly convert to TF multi-label One-Hot encoded version without bbox data. Defaults to False.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            chunk_size (int, optional): write the .csv file in chunks of this many rows to bound the memory use, not used with is_multilabel. Defaults to None.
+            metadata_cache (bool | str, optional): keep the image sizes read from the image headers in the MetadataCache, True for its default location or a path to the sqlite file. Defaults to False.
+        """
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        yolo_obj = yolo.Yolo(imagedataset.dataset)
+        yolo_obj.extract(yolo_ann_dir, metadata_cache)
+        csv_obj = csv.CSV.from_annotation_set(yolo_obj.export())
+        csv_fomatted = csv_obj.translate(is_multilabel, chunk_size)
+        csv_obj.archive(save_dir, csv_fomatted)
+
+    @staticmethod
+    @conversion
+    def coco2parquet(dataset_dir: str,
+                     coco_ann_dir: str,
+                     save_dir: str,
+                     center: bool = True,
+                     cache: bool = False,
+                     ipc: bool = False):
+        """convert coco to Parquet / Arrow format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            coco_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): folder to save the images, annotations and classes tables
+            center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            ipc (bool, optional): write uncompressed Arrow IPC (.arrow) files, which are memory mapped without copying when read back, instead of Parquet files. Defaults to False.
+        """
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        coco_obj = coco.COCO(imagedataset.dataset)
+        coco_obj.extract(coco_ann_dir, center)
+        parquet_obj = parquet.Parquet.from_annotation_set(coco_obj.export())
+        data = parquet_obj.translate()
+        parquet_obj.archive(save_dir, data, ipc)
+
+    @staticmethod
+    @conversion
+    def csv2parquet(dataset_dir: str,
+                    csv_ann_dir: str,
+                    save_dir: str,
+                    cache: bool = False,
+                    chunk_size: int = None,
+                    ipc: bool = False):
+        """convert .csv to Parquet / Arrow format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            csv_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): folder to save the images, annotations and classes tables
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            chunk_size (int, optional): read the .csv file in chunks of this many rows to bound the memory use. Defaults to None.
+            ipc (bool, optional): write uncompressed Arrow IPC (.arrow) files, which are memory mapped without copying when read back, instead of Parquet files. Defaults to False.
+        """
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        csv_obj = csv.CSV(imagedataset.dataset)
+        csv_obj.extract(csv_ann_dir, chunk_size)
+        parquet_obj = parquet.Parquet.from_annotation_set(csv_obj.export())
+        data = parquet_obj.translate()
+        parquet_obj.archive(save_dir, data, ipc)
+
+    @staticmethod
+    @conversion
+    def voc2parquet(dataset_dir: str,
+                    voc_ann_dir: str,
+                    save_dir: str,
+                    cache: bool = False,
+                    n_workers: int = 1,
+                    ipc: bool = False):
+        """convert Pascal-VOC to Parquet / Arrow format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            voc_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): folder to save the images, annotations and classes tables
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_workers (int, optional): number of processes used to read the .xml files. Defaults to 1.
+            ipc (bool, optional): write uncompressed Arrow IPC (.arrow) files, which are memory mapped without copying when read back, instead of Parquet files. Defaults to False.
+        """
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        voc_obj = pascalvoc.PascalVOC(imagedataset.dataset)
+        voc_obj.extract(voc_ann_dir, n_workers)
+        parquet_obj = parquet.Parquet.from_annotation_set(voc_obj.export())
+        data = parquet_obj.translate()
+        parquet_obj.archive(save_dir, data, ipc)
+
+    @staticmethod
+    @conversion
+    def yolo2parquet(dataset_dir: str,
+                     yolo_ann_dir: str,
+                     save_dir: str,
+                     cache: bool = False,
+                     ipc: bool = False,
+                     metadata_cache=False):
+        """convert yolo to Parquet / Arrow format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            yolo_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): folder to save the images, annotations and classes tables
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            ipc (bool, optional): write uncompressed Arrow IPC (.arrow) files, which are memory mapped without copying when read back, instead of Parquet files. Defaults to False.
+            metadata_cache (bool | str, optional): keep the image sizes read from the image headers in the MetadataCache, True for its default location or a path to the sqlite file. Defaults to False.
         """
-        imagedataset = ImgData.extract(dataset_dir)
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
         yolo_obj = yolo.Yolo(imagedataset.dataset)
-        yolo_obj.extract(yolo_ann_dir)
-        df = yolo_obj.get_dataset()
-        ann, cls = yolo_obj.get_annotations()
-
-        csv_obj = csv.CSV(df)
-        csv_obj.set_annotations(ann)
-        csv_obj.set_classes(cls)
-        csv_fomatted = csv_obj.translate(is_multilabel)
-        csv_obj.archive(save_dir, csv_fomatted)
\ No newline at end of file
+        yolo_obj.extract(yolo_ann_dir, metadata_cache)
+        parquet_obj = parquet.Parquet.from_annotation_set(yolo_obj.export())
+        data = parquet_obj.translate()
+        parquet_obj.archive(save_dir, data, ipc)
+
+    @staticmethod
+    @conversion
+    def parquet2coco(dataset_dir: str,
+                     parquet_ann_dir: str,
+                     save_dir: str,
+                     center: bool = True,
+                     cache: bool = False,
+                     compact: bool = False):
+        """convert Parquet / Arrow to coco format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            parquet_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): .json file saving location
+            center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            compact (bool, optional): write the .json file without white spaces. Defaults to False.
+        """
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        parquet_obj = parquet.Parquet(imagedataset.dataset)
+        parquet_obj.extract(parquet_ann_dir)
+        coco_obj = coco.COCO.from_annotation_set(parquet_obj.export())
+        data = coco_obj.translate(center)
+        coco_obj.archive(save_dir, data, compact)
+
+    @staticmethod
+    @conversion
+    def parquet2csv(dataset_dir: str,
+                    parquet_ann_dir: str,
+                    save_dir: str,
+                    is_multilabel: bool = False,
+                    cache: bool = False,
+                    chunk_size: int = None):
+        """convert Parquet / Arrow to csv format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            parquet_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): .csv file saving location
+            is_multilabel (bool, optional): directly convert to TF multi-label One-Hot encoded version without bbox data. Defaults to False.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            chunk_size (int, optional): write the .csv file in chunks of this many rows to bound the memory use, not used with is_multilabel. Defaults to None.
+        """
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        parquet_obj = parquet.Parquet(imagedataset.dataset)
+        parquet_obj.extract(parquet_ann_dir)
+        csv_obj = csv.CSV.from_annotation_set(parquet_obj.export())
+        csv_fomatted = csv_obj.translate(is_multilabel, chunk_size)
+        csv_obj.archive(save_dir, csv_fomatted)
+
+    @staticmethod
+    @conversion
+    def parquet2voc(dataset_dir: str,
+                    parquet_ann_dir: str,
+                    save_dir: str,
+                    cache: bool = False,
+                    n_writers: int = 4,
+                    queue_depth: int = 64):
+        """convert Parquet / Arrow to Pascal-VOC format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            parquet_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): .xml files saving location
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
+        """
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        parquet_obj = parquet.Parquet(imagedataset.dataset)
+        parquet_obj.extract(parquet_ann_dir)
+        voc_obj = pascalvoc.PascalVOC.from_annotation_set(parquet_obj.export())
+        with FileWriter(voc_obj.archive, n_writers, queue_depth) as writer:
+            for xml, name in voc_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.xml'
+                writer.submit(file_dir, xml)
+
+    @staticmethod
+    @conversion
+    def parquet2yolo(dataset_dir: str,
+                     parquet_ann_dir: str,
+                     save_dir: str,
+                     cache: bool = False,
+                     n_writers: int = 4,
+                     queue_depth: int = 64):
+        """convert Parquet / Arrow to yolo format
+
+        Args:
+            dataset_dir (str): relative path current folder, or absolute path to the main folder of the image dataset
+            parquet_ann_dir (str): relative path current folder, or absolute path to the main folder of the annotated file
+            save_dir (str): .txt files saving location
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            n_writers (int, optional): number of threads writing the output files. Defaults to 4.
+            queue_depth (int, optional): maximum number of translated files waiting to be written. Defaults to 64.
+        """
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+
+        imagedataset = ImgData.extract(dataset_dir, cache=cache)
+        parquet_obj = parquet.Parquet(imagedataset.dataset)
+        parquet_obj.extract(parquet_ann_dir)
+        yolo_obj = yolo.Yolo.from_annotation_set(parquet_obj.export())
+        with FileWriter(yolo_obj.archive, n_writers, queue_depth) as writer:
+            for data, name in yolo_obj.translate():
+                file_dir = save_dir + '/' + name.rsplit('.', 1)[0]+'.txt'
+                writer.submit(file_dir, data)
\ No newline at end of file
@@ -1,17 +1,43 @@
+from . import boxstore
 from . import coco
+from . import columnar
 from . import csv
+from . import filewriter
 from . import imgdata
+from . import imgsize
+from . import jsonstream
+from . import lazy
+from . import metacache
 from . import operator
+from . import parquet
 from . import pascalvoc
+from . import preview
+from . import sampling
+from . import scanindex
+from . import scanner
+from . import stages
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 __all__ = [
+    'boxstore',
     'coco',
+    'columnar',
     'csv',
+    'filewriter',
     'imgdata',
+    'imgsize',
+    'jsonstream',
+    'lazy',
+    'metacache',
     'operator',
-    'pascalvoc'
+    'parquet',
+    'pascalvoc',
+    'preview',
+    'sampling',
+    'scanindex',
+    'scanner',
+    'stages'
 ]
@@ -0,0 +1,134 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import logging
+import numpy as np
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .columnar import BOX_COLUMNS
+from . import sampling
+
+""":cvar
+store folder, all the .npy files are opened with numpy memory mapping :
+    - boxes.npy : (n_objects, 7) array of BOX_COLUMNS rows, sorted by image_id
+    - ids.npy : sorted distinct image_id of the boxes
+    - offsets.npy : (len(ids) + 1,) array, boxes of image ids[i] are boxes[offsets[i]:offsets[i + 1]]
+    - images.npy : structured array of (image_id, width, height, name, path) in the dataset order
+    - classes.json : {class_id : class_name}
+"""
+
+STORE_FILES = ["boxes.npy", "ids.npy", "offsets.npy", "images.npy", "classes.json"]
+
+
+class BoxStore:
+    """ read only, memory mapped annotation store with O(1) box lookup per image """
+
+    def __init__(self, location: str):
+        """
+        :param location: store folder written by BoxStore.write
+        """
+        missing = [f for f in STORE_FILES if not os.path.exists(os.path.join(location, f))]
+        if missing:
+            logger.error(f"\n ERROR : <{location}> is not a box store, missing {missing}.")
+            sys.exit(1)
+        self.location = location
+        self.boxes = np.load(os.path.join(location, "boxes.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(location, "ids.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(location, "offsets.npy"), mmap_mode="r")
+        self.images = np.load(os.path.join(location, "images.npy"), mmap_mode="r")
+        with open(os.path.join(location, "classes.json"), "r") as fp:
+            self.classes = {int(k): v for k, v in json.load(fp).items()}
+
+    def __len__(self):
+        return self.images.shape[0]
+
+    @staticmethod
+    def write(location: str, operator):
+        """ build a store from an operator that has extracted its annotations.
+
+        :param location: store folder, created if it does not exist
+        :param operator: IOperator with dataset, annotations and classes
+        :return: BoxStore opened on the written files
+        """
+        ann_set = operator.export()
+        image_ids = ann_set.boxes["image_id"].astype(np.int64)
+        order = np.argsort(image_ids, kind="stable")
+        boxes = np.column_stack([ann_set.boxes[col] for col in BOX_COLUMNS])[order]
+
+        # sized by the number of distinct ids, so sparse or negative ids cost nothing extra
+        ids, counts = np.unique(image_ids, return_counts=True)
+        offsets = np.zeros(ids.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        dataset = ann_set.images
+        names = np.asarray(dataset["name"].tolist(), dtype=str)
+        paths = np.asarray(dataset["path"].tolist(), dtype=str)
+        images = np.empty(dataset.shape[0], dtype=[("image_id", np.int64), ("width", np.int64),
+                                                   ("height", np.int64), ("name", names.dtype),
+                                                   ("path", paths.dtype)])
+        images["image_id"] = dataset["image_id"].to_numpy()
+        images["width"] = dataset["width"].to_numpy()
+        images["height"] = dataset["height"].to_numpy()
+        images["name"] = names
+        images["path"] = paths
+
+        try:
+            os.makedirs(location, exist_ok=True)
+            np.save(os.path.join(location, "boxes.npy"), boxes)
+            np.save(os.path.join(location, "ids.npy"), ids)
+            np.save(os.path.join(location, "offsets.npy"), offsets)
+            np.save(os.path.join(location, "images.npy"), images)
+            with open(os.path.join(location, "classes.json"), "w") as fp:
+                json.dump({str(k): v for k, v in ann_set.classes.items()}, fp)
+        except Exception as error:
+            logger.exception(error)
+            sys.exit(1)
+        return BoxStore(location)
+
+    def get_image_annotations(self, image_id):
+        """ get the annotation rows of a single image, a view of the memory mapped file.
+
+        :param image_id: [int] image_id
+        :return: numpy.ndarray of BOX_COLUMNS rows, empty if the image has no objects.
+        """
+        i = int(np.searchsorted(self.ids, image_id))
+        if i < self.ids.shape[0] and self.ids[i] == image_id:
+            return self.boxes[self.offsets[i]:self.offsets[i + 1]]
+        return self.boxes[:0]
+
+    def ranges(self, image_ids):
+        """ row ranges of a set of images in self.boxes, vectorized over the ids.
+
+        :param image_ids: numpy.ndarray of image_id
+        :return: (starts, stops) numpy.ndarray, empty ranges for the images without objects
+        """
+        i = np.searchsorted(self.ids, image_ids)
+        found = i < self.ids.shape[0]
+        found[found] = self.ids[i[found]] == image_ids[found]
+        starts = np.where(found, self.offsets[np.where(found, i, 0)], 0)
+        stops = np.where(found, self.offsets[np.where(found, i, 0) + 1], 0)
+        return starts, stops
+
+    def sample(self, numOfSamples, s=0):
+        """ choose a set of images randomly in the same format as IOperator.sample
+
+        :param numOfSamples: number of images
+        :param s: seed of the random generator
+        :return: dictionary list of [{"image_id" : int, "path" : str, "classes" : [], "bbox" : []}]
+        """
+        rows = sampling.choose(len(self), numOfSamples, s)
+        final_list = []
+        for image in self.images[rows]:
+            boxes = self.get_image_annotations(int(image["image_id"]))
+            final_list.append({"classes": boxes[:, 2].tolist(),
+                               "bbox": [[(b[3], b[4]), (b[5], b[6])] for b in boxes.tolist()],
+                               "image_id": int(image["image_id"]),
+                               "path": str(image["path"])})
+        return final_list
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC
+import io
 import json
 import os
+import numpy as np
 import pandas as pd
 import logging
 import sys
@@ -15,6 +17,20 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 from .operator import IOperator
+from .stages import timed, extracted
+from .jsonstream import JSONStreamReader, ColumnBuffer
+
+""":cvar
+.json record formats written by COCO.archive, in the column order of COCO.translate
+"""
+RECORD_TEMPLATES = {
+    "annotations": '{{"id": {}, "image_id": {}, "category_id": {}, "area": {}, "bbox": [{}, {}, {}, {}], '
+                   '"ignore": "0", "iscrowd": "0"}}',
+    "images": '{{"file_name": {}, "height": {}, "width": {}, "id": {}}}',
+    "categories": '{{"id": {}, "name": {}, "supercategory": "none"}}'
+}
+# fields json.dump wrote as strings in the original writer, the areas were numpy integers
+QUOTED_FIELDS = ("area",)
 
 
 class COCO(IOperator, ABC):
@@ -24,36 +40,104 @@ class COCO(IOperator, ABC):
     def __init__(self, dataset):
         super(COCO, self).__init__(dataset)
         self._dataset = dataset
+        self.missing_images = pd.DataFrame(columns=["name", "image_id", "width", "height"])
+        self.unannotated_images = pd.DataFrame(columns=["name", "folder", "path"])
 
+    @timed(count=extracted)
     def extract(self, path: str, center):
         """
         all the annotations in the file convert into general dataframe object.
+        the file is read as a stream, so only the final columns are kept in memory.
         :param path: string, relative / absolute path
         :return: generalize pandas.DataFrame type object.
         """
         if os.path.exists(path):
-            with open(path) as fp:
-                ann_data = json.load(fp)
-            self.__updateDataset(ann_data["images"])
-            self.__extractAnnotation(ann_data["annotations"], center)
-            self.__extractClasses(ann_data["categories"])
+            img_names, img_buffer, ann_buffer, cats = self.__readFile(path)
+            img_cols, ann_cols = img_buffer.to_dict(), ann_buffer.to_dict()
+            if img_cols["image_id"].dtype == object:
+                self.__numberImages(img_cols, ann_cols)
+            img_df = pd.DataFrame({"name": img_names, **img_cols})
+            del img_names, img_buffer, ann_buffer
+            self.__updateDataset(img_df)
+            self.__extractAnnotation(ann_cols, center)
+            self.__extractClasses(cats)
         else:
             logger.error(f"\n ERROR : entered path <{path}> is invalid.")
             sys.exit(1)
 
         return
 
-    def archive(self, location, data):
+    @staticmethod
+    def __readFile(path: str):
+        """ stream the images, annotations and categories of a .json file into columns.
+        the image ids are read as int64 until the first id that is not an integer, i.e. a string, then both
+        image_id columns are switched to object in place.
+
+        :param path: .json file
+        :return: (image names [list], image ColumnBuffer, annotation ColumnBuffer, categories [list])
+        """
+        img_names = []
+        img_buffer = ColumnBuffer({"image_id": np.int64, "width": np.int64, "height": np.int64})
+        ann_buffer = ColumnBuffer({"obj_id": np.int64, "image_id": np.int64, "class_id": np.int64,
+                                   "x": np.float64, "y": np.float64,
+                                   "width": np.float64, "height": np.float64})
+        cats = []
+        int_ids = True
+        with open(path) as fp:
+            try:
+                for key, obj in JSONStreamReader(fp).items(("images", "annotations", "categories")):
+                    if key == "categories":
+                        cats.append(obj)
+                        continue
+                    image_id = obj["image_id" if key == "annotations" else "id"]
+                    if int_ids and type(image_id) is not int:
+                        img_buffer.set_dtype("image_id", object)
+                        ann_buffer.set_dtype("image_id", object)
+                        int_ids = False
+                    if key == "annotations":
+                        if not isinstance(obj.get("bbox"), list) or len(obj["bbox"]) != 4:
+                            logger.error(f"\n ERROR : annotation {obj.get('id')} has the bbox {obj.get('bbox')}, "
+                                         f"expected [x, y, width, height].")
+                            sys.exit(1)
+                        ann_buffer.append(obj["id"], image_id, obj["category_id"], *obj["bbox"])
+                    else:
+                        img_buffer.append(image_id, obj["width"], obj["height"])
+                        img_names.append(obj["file_name"])
+            except Exception as error:
+                logger.exception("\n ERROR : annotation file doesn't in accept the format.")
+                sys.exit(1)
+        return img_names, img_buffer, ann_buffer, cats
+
+    @staticmethod
+    def __numberImages(img_cols, ann_cols):
+        """ replace image ids that are not integers, i.e. strings, by 1, 2, .. in the order of the images.
+        annotations of an unknown image id get 0, which matches no image.
+
+        :param img_cols: image columns, changed in place
+        :param ann_cols: annotation columns, changed in place
+        """
+        codes, uniques = pd.factorize(img_cols["image_id"])
+        img_cols["image_id"] = (codes + 1).astype(np.int64)
+        ann_cols["image_id"] = (pd.Index(uniques).get_indexer(ann_cols["image_id"]) + 1).astype(np.int64)
+
+    @timed
+    def archive(self, location, data, compact: bool = False, chunk_size: int = 100000):
         """ save coco annotation file in the given location
 
         :param location: .json file saving directory
-        :param data: dictionary to save as .json
+        :param data: dictionary of DataFrames from self.translate(), or a dictionary to save as .json
+        :param compact: write the .json file without white spaces
+        :param chunk_size: number of records formatted at once
         :return: none
         """
         if os.path.exists(os.path.dirname(location)):
             if data:
                 with open(location, 'w') as pf:
-                    json.dump(data, pf)
+                    if all(isinstance(v, pd.DataFrame) for v in data.values()):
+                        self.__writeJSON(pf, data, compact, chunk_size)
+                    else:
+                        sep = "," if compact else ", "
+                        json.dump(data, pf, separators=(sep, ":" if compact else ": "))
             else:
                 logger.error("\n ERROR : The DataFrame file is empty.")
                 sys.exit(1)
@@ -61,125 +145,154 @@ class COCO(IOperator, ABC):
             logger.error("\n ERROR : There are no such parent directory to file save.")
             sys.exit(1)
 
-    def translate(self, center):
+    @timed
+    def translate(self, center, records: bool = False):
         """ translate common schema into json compatible format.
 
-        :return:
+        :param records: return the .json structure, {"annotations" : [{..}, ..], "images" : [..], "categories" : [..]}
+                        as earlier versions did, instead of DataFrames. slower and larger for big datasets.
+        :return: dictionary of DataFrames {"annotations" : .., "images" : .., "categories" : ..} with a column
+                 for each .json field, to be written with self.archive(). self.archive() writes the same file
+                 for both return types.
         """
         data = {}
-        data["annotations"] = []
-        data["images"] = []
-        data["categories"] = []
-
-        filenames = self._dataset["name"].to_list()
-        widths = self._dataset["width"].to_list()
-        heights = self._dataset["height"].to_list()
-        ids = self._dataset["image_id"].to_list()
-        compact_image_list = zip(filenames, heights, widths, ids)
-
-        for line in compact_image_list:
-            data["images"].append(self.__list2dict(['file_name', 'height', 'width', 'id'], line))
-
-        obj_ids = self.annotations["obj_id"].astype('int32')
-        image_ids = self.annotations["image_id"].astype('int32')
-        cat_ids = self.annotations["class_id"].astype('int32')
-        xmins = self.annotations["x_min"].astype('int32')
-        ymins = self.annotations["y_min"].astype('int32')
-        xmaxs = self.annotations["x_max"].astype('int32')
-        ymaxs = self.annotations["y_max"].astype('int32')
-        bboxs = []
-        areas = []
-        for i in range(len(xmaxs)):
-            bboxs.append(self.__KITTI2normilized(xmins[i], ymins[i], xmaxs[i], ymaxs[i], center))
-            areas.append((xmaxs[i] - xmins[i]) * (ymaxs[i] - ymins[i]))
-
-        compact_ann_list = zip(obj_ids, image_ids, cat_ids, areas, bboxs)
-        for line in compact_ann_list:
-            data["annotations"].append(
-                self.__list2dict(["id", "image_id", "category_id", "area", "bbox", "ignore", "iscrowd"], line))
-
-        class_ids = list(self.classes.keys())
-        class_names = list(self.classes.values())
-        compact_class_list = zip(class_ids, class_names)
-        for line in compact_class_list:
-            data["categories"].append(self.__list2dict(["id", "name", "supercategory"], line, padd='none'))
-
+        xmins = self.annotations["x_min"].to_numpy(dtype='int32')
+        ymins = self.annotations["y_min"].to_numpy(dtype='int32')
+        xmaxs = self.annotations["x_max"].to_numpy(dtype='int32')
+        ymaxs = self.annotations["y_max"].to_numpy(dtype='int32')
+        x0, y0, widths, heights = self.__KITTI2normilized(xmins, ymins, xmaxs, ymaxs, center)
+        data["annotations"] = pd.DataFrame({"id": self.annotations["obj_id"].to_numpy(dtype='int32'),
+                                            "image_id": self.annotations["image_id"].to_numpy(dtype='int32'),
+                                            "category_id": self.annotations["class_id"].to_numpy(dtype='int32'),
+                                            "area": (xmaxs - xmins) * (ymaxs - ymins),
+                                            "x": x0, "y": y0, "width": widths, "height": heights})
+
+        data["images"] = pd.DataFrame({"file_name": self._dataset["name"].to_numpy(),
+                                       "height": self._dataset["height"].to_numpy(),
+                                       "width": self._dataset["width"].to_numpy(),
+                                       "id": self._dataset["image_id"].to_numpy()})
+
+        data["categories"] = pd.DataFrame({"id": list(self.classes.keys()),
+                                           "name": list(self.classes.values())})
+        if records:
+            buffer = io.StringIO()
+            self.__writeJSON(buffer, data)
+            return json.loads(buffer.getvalue())
         return data
 
-    def __normalized2KITTI(self, box, center=True):
-        """
+    def __writeJSON(self, pf, data, compact: bool = False, chunk_size: int = 100000):
+        """ write the DataFrames of self.translate() as a .json object of record lists.
 
-        :param box: [X, Y, width, height]
-        :return: [(xmin, ymin), (xmax, ymax)]
+        :param pf: opened text file
+        :param data: return value of self.translate()
+        :param compact: write without white spaces
+        :param chunk_size: number of records formatted at once
+        :return: None
+        """
+        sep = "," if compact else ", "
+        pf.write("{")
+        for i, (key, df) in enumerate(data.items()):
+            template = RECORD_TEMPLATES[key]
+            if compact:
+                template = template.replace(", ", ",").replace(": ", ":")
+            pf.write(f'{sep if i else ""}"{key}":{"" if compact else " "}[')
+            self.__writeRecords(pf, df, template, sep, chunk_size)
+            pf.write("]")
+        pf.write("}")
+
+    def __writeRecords(self, pf, df, template, sep, chunk_size):
+        """ write the rows of a DataFrame as .json objects, a chunk at a time.
+
+        :param pf: opened .json file
+        :param df: translated DataFrame, columns in the order of the template
+        :param template: format string of a single record
+        :param sep: separator between records
+        :param chunk_size: number of records formatted at once
+        :return: None
         """
-        o_x, o_y, o_width, o_height = box
-        if center:  
-            xmin = int(o_x - o_width / 2)
-            ymin = int(o_y - o_height / 2)
-            xmax = int(o_x + o_width / 2)
-            ymax = int(o_y + o_height / 2)
+        for start in range(0, df.shape[0], chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            cols = [self.__jsonValues(chunk[c], c in QUOTED_FIELDS) for c in chunk.columns]
+            if start:
+                pf.write(sep)
+            pf.write(sep.join(template.format(*row) for row in zip(*cols)))
+
+    @staticmethod
+    def __jsonValues(col, quoted: bool = False):
+        """ .json text of the values of a column, integers are written as numbers and every other value,
+        including NaN and floats, as a string, like the original writer did.
+
+        :param col: pd.Series
+        :param quoted: write the integers as strings too
+        :return: list of .json values
+        """
+        values = col.tolist()
+        if quoted:
+            return [json.dumps(str(v)) for v in values]
+        if pd.api.types.is_integer_dtype(col.dtype):
+            return values
+        return [v if type(v) is int else json.dumps(str(v)) for v in values]
+
+    def __normalized2KITTI(self, x, y, width, height, center=True):
+        """ vectorized over numpy arrays of boxes.
+
+        :param x, y, width, height: [X, Y, width, height] columns
+        :return: [xmin, ymin, xmax, ymax] columns
+        """
+        if center:
+            xmin = np.trunc(x - width / 2).astype(np.int64)
+            ymin = np.trunc(y - height / 2).astype(np.int64)
+            xmax = np.trunc(x + width / 2).astype(np.int64)
+            ymax = np.trunc(y + height / 2).astype(np.int64)
         else:
-            xmin = o_x
-            ymin = o_y
-            xmax = int(o_x + o_width)
-            ymax = int(o_y + o_height)
+            xmin = x
+            ymin = y
+            xmax = np.trunc(x + width).astype(np.int64)
+            ymax = np.trunc(y + height).astype(np.int64)
         return [xmin, ymin, xmax, ymax]
 
-    def __updateDataset(self, images):
+    def __updateDataset(self, img_df):
         """
 
-        :param images: image attributes in the .json file
+        :param img_df: image attributes in the .json file, pd.DataFrame with [name, image_id, width, height] columns
         :return: add id, image width & height columns to self.dataset
         """
-        dataset_imgs = list(self._dataset.iloc[:, 0].values)
-        ann_imgs = []
-        ann_id = {}
-        img_width = {}
-        img_height = {}
-        for obj in images:
-            if obj["file_name"] in dataset_imgs:
-                try:
-                    ann_imgs.append(obj["file_name"])
-                    ann_id[obj["file_name"]] = obj["id"]
-                    img_width[obj["file_name"]] = obj["width"]
-                    img_height[obj["file_name"]] = obj["height"]
-                except Exception as error:
-                    logger.exception("\n ERROR : annotation file doesn't in accept the format.")
-                    sys.exit(1)
-        if len(dataset_imgs) > len(ann_imgs):
-            self._dataset = self._dataset.loc[self._dataset.loc[:, "name"].isin(ann_imgs), :]
-            logger.warning("\nWARNING: all the images had not annotated!")
-        self._dataset = self._dataset.copy()
-        self._dataset["image_id"] = self._dataset["name"].map(ann_id)
-        self._dataset.loc[:, "width"] = self._dataset.loc[:, "name"].map(img_width)
-        self._dataset.loc[:, "height"] = self._dataset.loc[:, "name"].map(img_height)
-        super(COCO, self).set_dataset(self._dataset)
+        img_df = img_df.drop_duplicates(subset="name", keep="last")
+
+        on_disk = img_df["name"].isin(self._dataset["name"])
+        annotated = self._dataset["name"].isin(img_df["name"])
+        self.missing_images = img_df.loc[~on_disk, :].reset_index(drop=True)
+        self.unannotated_images = self._dataset.loc[~annotated, :].reset_index(drop=True)
+        if self.missing_images.shape[0]:
+            logger.warning(f"\nWARNING: {self.missing_images.shape[0]} annotated images are not in the image dataset!")
+        if self.unannotated_images.shape[0]:
+            logger.warning(f"\nWARNING: {self.unannotated_images.shape[0]} images in the dataset had not annotated!")
+
+        dataset = self._dataset.drop(columns=["width", "height"], errors="ignore")
+        res_df = pd.merge(dataset, img_df, on="name", how="inner")
+        super(COCO, self).set_dataset(res_df)
         return
 
-    def __extractAnnotation(self, anns, center):
+    def get_unmatched_images(self):
         """
+        :return: (annotated images missing in the image dataset [pd.DataFrame],
+                  images in the dataset without annotations [pd.DataFrame])
+        """
+        return self.missing_images, self.unannotated_images
 
-        :param anns: annotation attribute in the .json file
-        :return: None , add self.annotations attr.
+    def __extractAnnotation(self, cols, center):
         """
-        ann_list = []
-        for obj in anns:
-            try:
-                obj_id = obj["id"]
-                img_id = obj["image_id"]
-                cls_id = obj["category_id"]
-                x_min, y_min, x_max, y_max = self.__normalized2KITTI(obj["bbox"], center)
-                #logger.info(print(f'obj_id : {obj_id} | image_id : {img_id} | normalized : {obj["bbox"]} > KITTI : {[x_min, y_min, x_max, y_max]}'))
-            except Exception as error:
-                logger.exception("\n ERROR : annotation file doesn't in accept the format.")
-                sys.exit(1)
-            else:
-                ann_list.append((obj_id, img_id, cls_id, x_min, y_min, x_max, y_max))
 
-        if ann_list:
-            ann_df = pd.DataFrame.from_records(ann_list,
-                                               columns=['obj_id', 'image_id', 'class_id', 'x_min', 'y_min', 'x_max',
-                                                        'y_max'])
+        :param cols: annotation columns read from the .json file, {column name : numpy array}
+        :return: None , add self.annotations attr.
+        """
+        if cols["obj_id"].shape[0]:
+            cols = dict(cols)
+            boxes = self.__normalized2KITTI(cols.pop("x"), cols.pop("y"), cols.pop("width"), cols.pop("height"), center)
+            ann_df = pd.DataFrame({**cols, **dict(zip(['x_min', 'y_min', 'x_max', 'y_max'], boxes))})
+            for col in ['x_min', 'y_min']:
+                if (ann_df[col] % 1 == 0).all():
+                    ann_df[col] = ann_df[col].astype(np.int64)
             super(COCO, self).set_annotations(ann_df)
         else:
             super(COCO, self).set_annotations(pd.DataFrame())
@@ -206,45 +319,17 @@ class COCO(IOperator, ABC):
             super(COCO, self).set_classes({})
 
     def __KITTI2normilized(self, xmin, ymin, xmax, ymax, center=True):
-        """
+        """ vectorized over numpy arrays of boxes.
 
-        :param xmin:
-        :param ymin:
-        :param xmax:
-        :param ymax:
-        :return: [X, Y, width, height]
+        :param xmin, ymin, xmax, ymax: integer columns of KITTI boxes
+        :return: [X, Y, width, height] columns
         """
+        width = xmax - xmin
+        height = ymax - ymin
         if center:
-            width = xmax - xmin
-            height = ymax - ymin
             x0 = (xmax + xmin) // 2
             y0 = (ymin + ymax) // 2
         else:
-            width = xmax - xmin
-            height = ymax - ymin
             x0 = xmin
             y0 = ymin
         return [x0, y0, width, height]
-
-    def __list2dict(self, tags, values, padd='0'):
-        nt = len(tags)
-        nv = len(values)
-        if nt >= nv:
-            ret_dict = {}
-            for i in range(nt):
-                if i < nv:
-                    #ret_dict[tags[i]] = str(values[i])
-                    if isinstance(values[i], int):
-                        ret_dict[tags[i]] = int(values[i])
-                    elif isinstance(values[i], list):
-                        cl_list = [int(elem) for elem in values[i]]
-                        ret_dict[tags[i]] = cl_list
-                    else:
-                        ret_dict[tags[i]] = str(values[i])
-                else:
-                    ret_dict[tags[i]] = padd
-            else:
-                return ret_dict
-        else:
-            logger.error(f"\n ERROR : There are not enough attributes to create .json file.\n #tags : {nt} & #attrs : {nv}")
-            sys.exit(1)
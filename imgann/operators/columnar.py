@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import logging
+import pandas as pd
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+""":cvar
+boxes (struct of arrays, one numpy array per column) :
+    - obj_id : int
+    - image_id : int
+    - class_id : int
+    - x_min : int
+    - y_min : int
+    - x_max : int
+    - y_max : int
+"""
+
+BOX_COLUMNS = ["obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max"]
+
+
+class AnnotationSet:
+    """ columnar intermediate representation passed between the operators without copies """
+
+    def __init__(self, images, boxes: dict, classes: dict):
+        """
+        :param images: pandas.DataFrame image table with attr. defined in the ImgData.py file
+        :param boxes: {column name : numpy array} for each of BOX_COLUMNS
+        :param classes: {class_id : class_name}
+        """
+        self.images = images
+        self.boxes = boxes
+        self.classes = classes
+
+    @classmethod
+    def from_frames(cls, images, annotations, classes):
+        """ wrap the frames of an operator, the box columns are numpy views of the annotation frame.
+
+        :param images: image table [pd.DataFrame]
+        :param annotations: annotation table [pd.DataFrame] with BOX_COLUMNS
+        :param classes: {class_id : class_name}
+        :return: AnnotationSet
+        """
+        if annotations.shape[0]:
+            boxes = {col: annotations[col].to_numpy() for col in BOX_COLUMNS}
+        else:
+            boxes = {col: pd.Series([], dtype="int64").to_numpy() for col in BOX_COLUMNS}
+        return cls(images, boxes, classes)
+
+    def __len__(self):
+        return len(self.boxes["obj_id"])
+
+    def to_frame(self):
+        """
+        :return: annotation table [pd.DataFrame] built on the box arrays without copying them
+        """
+        return pd.DataFrame(self.boxes, columns=BOX_COLUMNS, copy=False)
+
+
+class MultilabelMatrix:
+    """ file x class 0/1 indicator matrix of the multilabel output, kept sparse until it is written """
+
+    def __init__(self, filenames, classes, matrix):
+        """
+        :param filenames: numpy array of the row labels
+        :param classes: numpy array of the column labels
+        :param matrix: scipy.sparse.csr_matrix of shape (len(filenames), len(classes))
+        """
+        self.filenames = filenames
+        self.classes = classes
+        self.matrix = matrix
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def to_frame(self):
+        """
+        :return: dense pd.DataFrame with a filename column and a 0/1 column per class, for small outputs
+        """
+        res_df = pd.DataFrame(self.matrix.toarray(), columns=list(self.classes))
+        res_df.insert(0, "filename", self.filenames)
+        return res_df
@@ -5,8 +5,8 @@ from abc import ABC
 import logging
 import os
 import sys
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MultiLabelBinarizer
 
 # setup logger
 logging.basicConfig()
@@ -14,6 +14,12 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 from .operator import IOperator
+from .columnar import MultilabelMatrix
+from .stages import timed, extracted
+from .lazy import LazyModule
+
+# only the multilabel output needs scipy
+sparse = LazyModule("scipy.sparse")
 
 
 class CSV(IOperator, ABC):
@@ -25,19 +31,24 @@ class CSV(IOperator, ABC):
         self._dataset = dataset
         self.attrs = ['filename', 'width', 'height', 'class', 'xmin', 'ymin', 'xmax', 'ymax']
 
-    def extract(self, path: str):
+    @timed(count=extracted)
+    def extract(self, path: str, chunk_size: int = None):
         """
         all the annotations in the file convert into general dataframe object.
         :param path: string, relative / absolute path
+        :param chunk_size: read the file in chunks of this many rows, the image and class ids are assigned across the
+         chunks so only the annotation columns are kept in memory.
         :return: generalize pandas.DataFrame type object.
         """
         if os.path.exists(path):
-            ann_df = pd.read_csv(path)
-            attr_df_list = list(ann_df.columns)
+            attr_df_list = list(pd.read_csv(path, nrows=0).columns)
             if all(x in attr_df_list for x in self.attrs):
-                new_ann_df = self.__dfUpdates(ann_df)
-                self.__updateDataset(new_ann_df.loc[:, ["name", "width", "height", "image_id"]])
-                self.__setAnn(new_ann_df)
+                if chunk_size:
+                    self.__extractChunks(path, chunk_size)
+                else:
+                    new_ann_df = self.__dfUpdates(pd.read_csv(path))
+                    self.__updateDataset(new_ann_df.loc[:, ["name", "width", "height", "image_id"]])
+                    self.__setAnn(new_ann_df)
             else:
                 logger.error(f"\n ERROR : Entered annotation file does not contains all the required attributes. \n {self.attrs}")
                 sys.exit()
@@ -46,53 +57,126 @@ class CSV(IOperator, ABC):
             logger.error(f"\n ERROR : Entered directory {path}, does not exsist.")
             sys.exit()
 
+    @timed
     def archive(self, location, df):
         """ save csv annotation file in the given location
 
         :param location: .csv file saving location
-        :param df: finalized DataFrame object from the self.translate()
+        :param df: finalized DataFrame object from the self.translate(), or an iterable of DataFrame chunks.
+         or the MultilabelMatrix from self.to_multilabel(), which can also be saved as .npz or .parquet files.
         :return: None
         """
         if os.path.exists(os.path.dirname(location)):
+            if isinstance(df, MultilabelMatrix):
+                self.__archiveMultilabel(location, df)
+            elif isinstance(df, pd.DataFrame):
                 df.to_csv(location, index=False)
+            else:
+                with open(location, "w", newline="") as fp:
+                    header = True
+                    for chunk in df:
+                        chunk.to_csv(fp, index=False, header=header)
+                        header = False
+                    if header:
+                        fp.write(",".join(self.attrs) + "\n")
         else:
             logger.error("\n ERROR : There are no such parent directory to file save.")
             sys.exit(1)
 
-    def translate(self, is_multilabel: bool=False):
+    @timed
+    def translate(self, is_multilabel: bool=False, chunk_size: int = None):
         """ translate common schema into csv compatible format.
 
-        :return: pd.DataFrame object with ["filename", "width", "height", "class", "xmin", "ymin", "xmax", "ymax"] columns.
+        :param is_multilabel: one-hot encoded labels per file instead of boxes.
+        :param chunk_size: return a generator of DataFrames with this many rows instead of a single DataFrame,
+         not used with is_multilabel.
+        :return: pd.DataFrame object with ["filename", "width", "height", "class", "xmin", "ymin", "xmax", "ymax"] columns,
+         MultilabelMatrix with is_multilabel.
         """
-        csv_ann_df = self.annotations.copy()
-
+        lookups = self.__imageLookups()
+        if chunk_size and not is_multilabel:
+            n_rows = self.annotations.shape[0]
+            return (self.__csvRows(self.annotations.iloc[i:i + chunk_size], lookups)
+                    for i in range(0, n_rows, chunk_size))
+
+        res_df = self.__csvRows(self.annotations, lookups)
+        if is_multilabel:
+            res_df = self.to_multilabel(res_df)
+        return res_df
+
+    def __imageLookups(self):
+        """
+        :return: pd.Series of class names by class_id and of file names, widths and heights by image_id
+        """
+        image_ids = self._dataset["image_id"].to_numpy()
         class_series = pd.Series(self.classes)
-        csv_ann_df.loc[:,"class"] = csv_ann_df["class_id"].map(class_series)
-
-        filename_series = pd.Series(self._dataset['name'].tolist(),
-                                    index=self._dataset["image_id"].tolist())
-        csv_ann_df.loc[:,"filename"] = csv_ann_df["image_id"].map(filename_series)
+        filename_series = pd.Series(self._dataset["name"].to_numpy(), index=image_ids)
+        width_series = pd.Series(self._dataset["width"].to_numpy(), index=image_ids)
+        height_series = pd.Series(self._dataset["height"].to_numpy(), index=image_ids)
+        return class_series, filename_series, width_series, height_series
 
-        width_series = pd.Series(self._dataset['width'].tolist(),
-                                    index=self._dataset["image_id"].tolist())
-        csv_ann_df.loc[:, "width"] = csv_ann_df["image_id"].map(width_series)
+    def __csvRows(self, ann_df, lookups):
+        """
+        :param ann_df: rows of self.annotations
+        :param lookups: return value of self.__imageLookups()
+        :return: pd.DataFrame object with the csv columns for the given rows.
+        """
+        class_series, filename_series, width_series, height_series = lookups
+        res_df = pd.DataFrame({"filename": ann_df["image_id"].map(filename_series),
+                               "width": ann_df["image_id"].map(width_series),
+                               "height": ann_df["image_id"].map(height_series),
+                               "class": ann_df["class_id"].map(class_series),
+                               "xmin": ann_df["x_min"], "ymin": ann_df["y_min"],
+                               "xmax": ann_df["x_max"], "ymax": ann_df["y_max"]})
+
+        if (pd.isnull(res_df["class"]).sum() + pd.isnull(res_df["filename"]).sum()) != 0:
+            logger.error(f"\n ERROR : There are not enough data in past annotation file to create annotation file. {pd.isnull(res_df['class']).sum()}, {pd.isnull(res_df['filename']).sum()}")
+            sys.exit(1)
+        return res_df
 
-        height_series = pd.Series(self._dataset['height'].tolist(),
-                                    index=self._dataset["image_id"].tolist())
-        csv_ann_df.loc[:, "height"] = csv_ann_df["image_id"].map(height_series)
+    def __extractChunks(self, path: str, chunk_size: int):
+        """ read the annotation file chunk by chunk, ids are given in the order of first appearance like __dfUpdates.
 
-        if (pd.isnull(csv_ann_df["class"]).sum() + pd.isnull(csv_ann_df["filename"]).sum()) != 0:
-            logger.error(f"\n ERROR : There are not enough data in past annotation file to create annotation file. {pd.isnull(csv_ann_df['class']).sum()}, {pd.isnull(csv_ann_df['filename']).sum()}")
+        :param path: .csv annotation file
+        :param chunk_size: number of rows read at once
+        :return: None, sets self.dataset, self.annotations and self.classes
+        """
+        file_ids, class_ids = {}, {}
+        img_parts, ann_parts = [], []
+        n_objs = 0
+        for chunk in pd.read_csv(path, usecols=self.attrs, chunksize=chunk_size):
+            image_id = self.__incrementalIds(chunk["filename"], file_ids)
+            class_id = self.__incrementalIds(chunk["class"], class_ids)
+            n_rows = chunk.shape[0]
+            ann_parts.append(pd.DataFrame({"obj_id": np.arange(n_objs + 1, n_objs + n_rows + 1),
+                                           "image_id": image_id, "class_id": class_id,
+                                           "x_min": chunk["xmin"].to_numpy(), "y_min": chunk["ymin"].to_numpy(),
+                                           "x_max": chunk["xmax"].to_numpy(), "y_max": chunk["ymax"].to_numpy()}))
+            img_parts.append(pd.DataFrame({"name": chunk["filename"].to_numpy(), "width": chunk["width"].to_numpy(),
+                                           "height": chunk["height"].to_numpy(),
+                                           "image_id": image_id}).drop_duplicates())
+            n_objs += n_rows
+
+        if not ann_parts:
+            logger.error(f"\n ERROR : Entered annotation file {path} is empty.")
             sys.exit(1)
-        else:
-            csv_ann_df.rename(columns={"x_min": "xmin", "y_min": "ymin", "x_max": "xmax", "y_max": "ymax"},
-                              inplace=True)
-            res_df =  csv_ann_df.copy().loc[:, ["filename", "width", "height", "class", "xmin", "ymin", "xmax", "ymax"]]
+        self.__defineClasses(len(class_ids), list(class_ids))
+        self.__updateDataset(pd.concat(img_parts, ignore_index=True))
+        super(CSV, self).set_annotations(pd.concat(ann_parts, ignore_index=True))
 
-            if is_multilabel:
-                res_df = self.to_multilabel(res_df)
-            
-            return res_df
+    @staticmethod
+    def __incrementalIds(values, ids: dict):
+        """
+        :param values: pd.Series of file or class names in a chunk
+        :param ids: {name : id} of the previous chunks, new names are added with the next ids
+        :return: numpy array of the ids of values
+        """
+        codes, uniques = pd.factorize(values)
+        if (codes < 0).any():
+            logger.error(f"\n ERROR : there are empty values in the <{values.name}> column.")
+            sys.exit(1)
+        chunk_ids = np.array([ids.setdefault(name, len(ids) + 1) for name in uniques], dtype=np.int64)
+        return chunk_ids[codes]
 
     def __dfUpdates(self, full_df):
         """add id, image width & height columns to self.dataset
@@ -100,8 +184,6 @@ class CSV(IOperator, ABC):
         :param full_df: read .csv file from annotation file.
         :return: refine DataFrame object with column of ["name" ,"obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max"]
         """
-        full_df = full_df.copy()
-
         uni_files = list(full_df.loc[:, "filename"].unique())
         ns = len(uni_files)
         file_id_col = pd.Series(range(1, ns + 1), index=uni_files)
@@ -141,7 +223,6 @@ class CSV(IOperator, ABC):
         :param full_df: refined DataFrame object.
         :return: set generalized annotation df object as self.annotations
         """
-        full_df = full_df.copy()
         col_lis = ["obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max"]
         if all(y in list(full_df.columns) for y in col_lis):
             ann_df = full_df.loc[:, col_lis]
@@ -156,17 +237,83 @@ class CSV(IOperator, ABC):
         :param image_df: image attributes DataFrame
         :return: merge current self.__dataset with image_df.
         """
-        partial_df = image_df.copy()
-        partial_df.drop_duplicates(inplace=True)
-        res_df = pd.merge(self._dataset, partial_df, on="name")
+        partial_df = image_df.drop_duplicates()
+        dataset = self._dataset.drop(columns=["width", "height"], errors="ignore")
+        res_df = pd.merge(dataset, partial_df, on="name")
         super(CSV, self).set_dataset(res_df)
 
+    @timed
     def to_multilabel(self, df):
+        """ one-hot encode the classes of each file.
+
+        :param df: csv formatted pd.DataFrame or path to a .csv annotation file
+        :return: MultilabelMatrix, rows and classes are sorted. MultilabelMatrix.to_frame() gives a DataFrame.
+        """
+        return MultilabelMatrix(*self.multilabel_matrix(df))
+
+    def multilabel_matrix(self, df):
+        """ build the file x class indicator matrix straight from the factorized filename and class columns.
+
+        :param df: csv formatted pd.DataFrame or path to a .csv annotation file
+        :return: (sorted file names [np.ndarray], sorted class names [np.ndarray], scipy.sparse.csr_matrix of int64)
+        """
         if isinstance(df, str):
-            df = pd.read_csv(df)
-    
-        grp_df = df.groupby('filename')['class'].apply(list).reset_index(name='labels')
-        mlb = MultiLabelBinarizer(sparse_output=True)
-        res_df = grp_df.join(pd.DataFrame.sparse.from_spmatrix(mlb.fit_transform(grp_df.pop('labels')),index=grp_df.index,columns=mlb.classes_))
-        res_df.drop_duplicates(inplace=True)
-        return res_df
\ No newline at end of file
+            df = pd.read_csv(df, usecols=["filename", "class"])
+
+        file_codes, filenames = pd.factorize(df["filename"], sort=True)
+        class_codes, classes = pd.factorize(df["class"], sort=True)
+        valid = (file_codes >= 0) & (class_codes >= 0)
+        matrix = sparse.csr_matrix((np.ones(int(valid.sum()), dtype=np.int64),
+                                    (file_codes[valid], class_codes[valid])),
+                                   shape=(len(filenames), len(classes)))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return np.asarray(filenames), np.asarray(classes), matrix
+
+    def __archiveMultilabel(self, location, ml, chunk_size: int = 10000):
+        """ save the to_multilabel() result by the file extension :
+            - .npz : scipy.sparse.save_npz layout, with filenames and classes arrays added
+            - .parquet : (filename, class) rows of the non-zero entries
+            - other : dense .csv written chunk_size rows at a time
+
+        :param location: file saving location
+        :param ml: MultilabelMatrix from self.to_multilabel()
+        :param chunk_size: number of rows densified at once for .csv files
+        :return: None
+        """
+        filenames, classes, matrix = ml.filenames, ml.classes, ml.matrix
+        ext = os.path.splitext(location)[1].lower()
+        if ext == ".npz":
+            np.savez_compressed(location, format=b"csr", shape=matrix.shape, data=matrix.data,
+                                indices=matrix.indices, indptr=matrix.indptr,
+                                filenames=filenames.astype(str), classes=np.asarray(classes).astype(str))
+        elif ext == ".parquet":
+            rows, cols = matrix.nonzero()
+            pairs_df = pd.DataFrame({"filename": filenames[rows], "class": np.asarray(classes)[cols]})
+            try:
+                pairs_df.to_parquet(location, index=False)
+            except ImportError as error:
+                logger.error(f"\n ERROR : writing .parquet files needs pyarrow or fastparquet. {error}")
+                sys.exit(1)
+        else:
+            with open(location, "wb") as fp:
+                header = ",".join(self.__csvField(c) for c in ["filename"] + list(classes))
+                fp.write((header + "\n").encode("utf-8"))
+                for i in range(0, matrix.shape[0], chunk_size):
+                    # the values are only 0 / 1, so each row is written as ",d,d,...,d" bytes
+                    dense = matrix[i:i + chunk_size].toarray()
+                    line_buf = np.full((dense.shape[0], 2 * dense.shape[1]), ord(","), dtype=np.uint8)
+                    line_buf[:, 1::2] = dense + ord("0")
+                    fp.write(b"".join(self.__csvField(name).encode("utf-8") + row.tobytes() + b"\n"
+                                      for name, row in zip(filenames[i:i + chunk_size], line_buf)))
+
+    @staticmethod
+    def __csvField(value):
+        """
+        :param value: file or class name
+        :return: the value quoted the way pandas.DataFrame.to_csv does
+        """
+        value = str(value)
+        if any(c in value for c in ',"\n\r'):
+            return '"' + value.replace('"', '""') + '"'
+        return value
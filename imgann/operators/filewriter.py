@@ -0,0 +1,78 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class FileWriter:
+    """ write annotation files on a bounded thread pool while the next ones are translated """
+
+    def __init__(self, archive, n_writers: int = 4, queue_depth: int = 64):
+        """
+        :param archive: function(location, data) that saves a single file, i.e. IOperator.archive
+        :param n_writers: number of writer threads
+        :param queue_depth: maximum number of files waiting to be written, submit() blocks when it is full
+        """
+        self.archive = archive
+        self.executor = ThreadPoolExecutor(max_workers=max(1, n_writers))
+        self.slots = threading.BoundedSemaphore(max(1, queue_depth))
+        self.error = None
+        self.n_files = 0
+        self.stats = {}
+        self.__start = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.executor.shutdown(wait=True)
+
+    def submit(self, location: str, data):
+        """ queue a file to be written.
+
+        :param location: file saving path
+        :param data: file content in the format the archive function accepts
+        :return: None
+        """
+        if self.error is not None:
+            self.__fail()
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self.archive, location, data)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(self.__done)
+        self.n_files += 1
+
+    def close(self):
+        """ wait for the queued files and report the throughput. """
+        self.executor.shutdown(wait=True)
+        if self.error is not None:
+            self.__fail()
+        elapsed = max(time.perf_counter() - self.__start, 1e-9)
+        self.stats = {"files": self.n_files, "seconds": elapsed, "files/sec": self.n_files / elapsed}
+        logger.info(f"\nwrote {self.n_files} files in {elapsed:.2f}s ({self.stats['files/sec']:.0f} files/sec)")
+
+    def __done(self, future):
+        self.slots.release()
+        if future.exception() is not None and self.error is None:
+            self.error = future.exception()
+
+    def __fail(self):
+        self.executor.shutdown(wait=True)
+        if not isinstance(self.error, SystemExit):
+            logger.error(f"\n ERROR : could not write the annotation files : {self.error}")
+        sys.exit(1)
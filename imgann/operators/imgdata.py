@@ -12,15 +12,22 @@ logging.basicConfig()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+from . import sampling
+from .scanner import DirScanner
+from .scanindex import ScanIndex
+from .metacache import MetadataCache
+from .stages import timed
+
 """:cvar
 (self.dataset) image_df attributes:
     - image_id : int
     - name : str
     - folder : str
     - path : str (separated by / )
-    - width : int
-    - height : int
-    - format : class [(default) RGB, GBR, SHA ]
+    - width : int (only with metadata)
+    - height : int (only with metadata)
+    - format : str [PNG, JPEG, ..] (only with metadata)
+    - channels : int (only with metadata)
 """
 
 
@@ -32,45 +39,44 @@ class ImgData:
         self.root = root
 
     @classmethod
-    def extract(cls, dataset_path: str):
+    @timed
+    def extract(cls, dataset_path: str, max_workers: int = None, cache=False, metadata=False,
+                sample: int = None, seed=0):
         """
         :param: dataset_path: directory of the dataset.
+        :param: max_workers: number of threads used to scan the directory tree.
+        :param: cache: False, True to keep an index file next to the dataset folder or a path to the index file.
+                only the folders that changed since the last run are scanned again when an index is given.
+        :param: metadata: add width, height, format and channels columns read through the MetadataCache, True for
+                its default location or a path to the sqlite file.
+        :param: sample: keep only this many images, drawn uniformly with sampling.reservoir while the directory tree
+                is scanned so the table of the whole dataset is never built.
+        :param: seed: seed of the sample, see sampling.generator(). the images drawn also depend on the order the
+                folders are listed in, which can change between runs with several max_workers.
         :return: ImgData instance
-        Extract folder names, all the files in the dataset.pip
+        Extract all the image files in the dataset with a single pass over the directory tree.
         """
-        folders = ImgData.ext_folders(dataset_path)
-        files = ImgData.ext_files(dataset_path)
-        dataset = {"folders": folders, "files": files}
-
-        data_df = pd.DataFrame()
-        if type(folders) == str:
+        if not os.path.exists(dataset_path):
+            logger.error(f"\n ERROR : entered path <{dataset_path}> does not exists.")
+            sys.exit(1)
+        if not os.path.isdir(dataset_path):
             logger.error("\n ERROR : Enter a Folder directory.")
             sys.exit(1)
-        else:
-            data_list = []
-            if len(folders) == 1:
-                files = ImgData.ext_files(os.path.abspath(dataset_path))
-                imgFiles = ImgData.__filterImg(files)
-                if files:
-                    data_list.extend(ImgData.list_creator(os.path.abspath(dataset_path), folders[0], imgFiles))
-                else:
-                    logger.error("\n ERROR : there are no files in given directory!")
-                    sys.exit(1)
-            else:
-                for folder in folders:
-                    files = ImgData.ext_files(os.path.abspath(dataset_path) + os.sep + folder)
-                    imgFiles = ImgData.__filterImg(files)
-                    if files:
-                        data_list.extend(
-                            ImgData.list_creator(os.path.abspath(dataset_path + os.sep + folder), folder, imgFiles))
-                    else:
-                        continue
-
-            if data_list:
-                data_df = pd.DataFrame.from_records(data_list, columns=['name', 'folder', 'path'])
-            else:
-                logger.warning("\nthere was some error, record tuples are empty.")
-                sys.exit(1)
+
+        if cache is True:
+            cache = ScanIndex.default_path(dataset_path)
+        scanner = DirScanner(max_workers=max_workers, index_path=cache if cache else None)
+        records = scanner.scan(dataset_path)
+        if sample is not None:
+            records = sampling.reservoir(records, sample, seed)
+        data_df = pd.DataFrame.from_records(records, columns=['name', 'folder', 'path'])
+        if data_df.empty:
+            logger.error("\n ERROR : there are no image files in given directory!")
+            sys.exit(1)
+        data_df = data_df.sort_values("path", ignore_index=True)
+        if metadata:
+            data_df[["width", "height", "format", "channels"]] = pd.DataFrame(
+                MetadataCache(metadata if isinstance(metadata, str) else None, max_workers=max_workers).lookup(data_df["path"].tolist()))
         return cls(root=dataset_path, dataset=data_df)
 
     @staticmethod
@@ -147,22 +153,6 @@ class ImgData:
         sample_df = self.dataset.iloc[rnd_numbers, :]
         return sample_df
 
-    @staticmethod
-    def __filterImg(file_list: list):
-        """
-
-        :param file_list: list of image file names
-        :return: list of image files names
-        """
-        files_type = ["png", "jpg", "jpeg"]
-        img_list = []
-        for file in file_list:
-            ext = file.split(".")[-1].lower()
-            if ext in files_type:
-                img_list.append(file)
-
-        return img_list
-
     def describe(self):
         """
         give of summary of data folders
@@ -183,6 +173,10 @@ class ImgData:
         fld_img_cnt_df = self.dataset.loc[:, ["name","folder"]].groupby("folder").count()
         desc_dict["folder image counts"] = fld_img_cnt_df.to_dict()["name"]
 
+        if "width" in self.dataset.columns:
+            desc_dict["number of image sizes"] = len(self.dataset.groupby(["width", "height"]))
+            desc_dict["image formats"] = self.dataset["format"].value_counts().to_dict()
+
         return desc_dict
 
 
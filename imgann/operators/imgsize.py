@@ -0,0 +1,110 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .lazy import LazyModule
+
+# PIL is only used for the files without a PNG / JPEG header
+Image = LazyModule("PIL.Image")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# channels of the PNG color types, palette images are counted as a single channel like PIL "P" mode
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# start of frame markers, all 0xC0 - 0xCF except DHT (0xC4), JPG (0xC8) and DAC (0xCC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+
+class SizeProber:
+    """ read image sizes and channels from the PNG / JPEG file headers without decoding the images """
+
+    def __init__(self, max_workers: int = None):
+        """
+        :param max_workers: number of threads used by probe_all, defaults to min(32, cpu_count + 4)
+        """
+        self.max_workers = max_workers if max_workers else min(32, (os.cpu_count() or 1) + 4)
+
+    def probe_all(self, paths, info: bool = False):
+        """
+        :param paths: list of image file paths
+        :param info: return (width, height, format, channels) instead of (width, height)
+        :return: list of tuples in the order of paths
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.probe_info if info else self.probe, paths))
+
+    def probe(self, path: str):
+        """
+        :param path: image file path
+        :return: (width, height)
+        """
+        return self.probe_info(path)[:2]
+
+    def probe_info(self, path: str):
+        """ read the image size and channels from the IHDR chunk (PNG) or the SOF marker (JPEG),
+        other files and unreadable headers are opened with PIL.
+
+        :param path: image file path
+        :return: (width, height, format, channels)
+        """
+        info = None
+        try:
+            with open(path, "rb") as fp:
+                head = fp.read(2)
+                if head == PNG_SIGNATURE[:2]:
+                    info = self.__pngInfo(head + fp.read(24))
+                elif head == b"\xff\xd8":
+                    info = self.__jpegInfo(fp)
+        except (OSError, struct.error):
+            info = None
+        if info is None:
+            with Image.open(path) as im:
+                info = im.size + (im.format, len(im.getbands()))
+        return info
+
+    @staticmethod
+    def __pngInfo(head: bytes):
+        """
+        :param head: first 26 bytes of the file
+        :return: (width, height, "PNG", channels) or None
+        """
+        if len(head) == 26 and head[:8] == PNG_SIGNATURE and head[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", head[16:24])
+            return width, height, "PNG", PNG_CHANNELS.get(head[25], 3)
+        return None
+
+    @staticmethod
+    def __jpegInfo(fp):
+        """ walk the JPEG segments up to the first start of frame marker.
+
+        :param fp: file object positioned after the SOI marker
+        :return: (width, height, "JPEG", channels) or None
+        """
+        while True:
+            byte = fp.read(1)
+            while byte and byte != b"\xff":
+                byte = fp.read(1)
+            while byte == b"\xff":
+                byte = fp.read(1)
+            if not byte:
+                return None
+            marker = byte[0]
+            if marker in JPEG_STANDALONE_MARKERS:
+                continue
+            if marker == 0xDA:  # start of scan before any frame header
+                return None
+            length, = struct.unpack(">H", fp.read(2))
+            if marker in JPEG_SOF_MARKERS:
+                _, height, width, channels = struct.unpack(">BHHB", fp.read(6))
+                return (width, height, "JPEG", channels) if width and height else None
+            fp.seek(length - 2, os.SEEK_CUR)
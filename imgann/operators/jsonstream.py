@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import re
+import logging
+import numpy as np
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JSONStreamReader:
+    """ incremental reader for the top level arrays of a large .json file """
+
+    def __init__(self, fp, chunk_size: int = 1 << 20):
+        """
+        :param fp: text file object opened for reading.
+        :param chunk_size: number of characters read from the file at once.
+        """
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def items(self, keys):
+        """ walk the top level object and yield the elements of the selected arrays one at a time.
+
+        :param keys: top level keys of the arrays to stream, other values are decoded and dropped.
+        :return: generator of (key, element)
+        """
+        self.__expect("{")
+        if self.__peek() == "}":
+            return
+        while True:
+            key = self.__decode()
+            self.__expect(":")
+            if key in keys and self.__peek() == "[":
+                self.pos += 1
+                if self.__peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self.__decode()
+                        if self.__next() == "]":
+                            break
+            else:
+                self.__decode()
+            if self.__next() == "}":
+                return
+
+    def __fill(self):
+        """ read the next chunk into the buffer, returns False at the end of the file. """
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def __peek(self):
+        """ skip white spaces and return the next character without consuming it. """
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.__fill():
+                raise ValueError("unexpected end of the .json file.")
+
+    def __next(self):
+        """ consume the next separator, one of [ , ] } ]. """
+        ch = self.__peek()
+        if ch not in ",]}":
+            raise ValueError(f"unexpected character {ch!r} in the .json file.")
+        self.pos += 1
+        return ch
+
+    def __expect(self, ch):
+        if self.__peek() != ch:
+            raise ValueError(f"expected {ch!r} in the .json file, found {self.buf[self.pos]!r}.")
+        self.pos += 1
+
+    def __decode(self):
+        """ decode the next json value, reading more of the file until the value is complete. """
+        self.__peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a number at the end of the buffer could continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.__fill()
+
+
+class ColumnBuffer:
+    """ growable numpy columns, filled one row at a time while streaming """
+
+    def __init__(self, columns: dict, capacity: int = 1024):
+        """
+        :param columns: {column name : numpy dtype}
+        :param capacity: initial number of rows
+        """
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self.size = 0
+        self.capacity = capacity
+
+    def append(self, *values):
+        """ add a row, values are given in the column order. """
+        if len(values) != len(self.columns):
+            raise ValueError(f"expected {len(self.columns)} values for the columns {list(self.columns)}, "
+                             f"got {len(values)}.")
+        if self.size == self.capacity:
+            self.capacity *= 2
+            for name, col in self.columns.items():
+                self.columns[name] = np.resize(col, self.capacity)
+        for col, value in zip(self.columns.values(), values):
+            col[self.size] = value
+        self.size += 1
+
+    def set_dtype(self, name: str, dtype):
+        """ convert a column in place, i.e. to object when a value does not fit its dtype. the rows are kept. """
+        self.columns[name] = self.columns[name].astype(dtype)
+
+    def to_dict(self):
+        """
+        :return: {column name : numpy array} trimmed to the filled rows
+        """
+        return {name: col[:self.size] for name, col in self.columns.items()}
@@ -0,0 +1,31 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import importlib
+import logging
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class LazyModule:
+    """ module placeholder that imports the module on the first attribute access,
+    so heavy dependencies are only loaded by the code paths that use them. """
+
+    def __init__(self, name: str):
+        """
+        :param name: full module name, i.e. "matplotlib.pyplot"
+        """
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__name)
+        return getattr(self.__module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__module is not None else "not loaded"
+        return f"<lazy module '{self.__name}' ({state})>"
@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .imgsize import SizeProber
+
+""":cvar
+cache table
+    - key : str, sha1 of (absolute path, file size, mtime_ns)
+    - width : int
+    - height : int
+    - format : str, [PNG, JPEG, ..]
+    - channels : int
+    - last_used : int, unix time of the last lookup, the least recently used entries are evicted first
+"""
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "imgann")
+# sqlite limits the number of bound parameters in a statement
+QUERY_BATCH = 900
+
+
+class MetadataCache:
+    """ persistent image metadata cache shared by all the conversions """
+
+    def __init__(self, path: str = None, max_entries: int = 5000000, max_workers: int = None):
+        """
+        :param path: sqlite cache file, defaults to $IMGANN_CACHE_DIR/metadata.sqlite or ~/.cache/imgann/metadata.sqlite
+        :param max_entries: number of images kept in the cache before the least recently used ones are dropped
+        :param max_workers: number of threads used to stat and probe the images
+        """
+        if path is None:
+            path = os.path.join(os.environ.get("IMGANN_CACHE_DIR", DEFAULT_CACHE_DIR), "metadata.sqlite")
+        self.path = path
+        self.max_entries = max_entries
+        self.prober = SizeProber(max_workers)
+        self.stats = {}
+
+    def lookup(self, paths):
+        """ get the metadata of images, probing only the files that are not in the cache.
+
+        :param paths: list of image file paths
+        :return: list of (width, height, format, channels) in the order of paths, (None, None, None, None) for
+         the files that can not be read
+        """
+        with ThreadPoolExecutor(max_workers=self.prober.max_workers) as executor:
+            keys = list(executor.map(self.__key, paths))
+        found = self.__load([key for key in keys if key is not None])
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        results = [found.get(key) for key in keys]
+        new_entries = {}
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.prober.max_workers) as executor:
+                probed = list(executor.map(self.__probe, [paths[i] for i in missing]))
+            for i, info in zip(missing, probed):
+                results[i] = info
+                # files that could not be stat'ed or read are probed again on the next lookup
+                if keys[i] is not None and info[0] is not None:
+                    new_entries[keys[i]] = info
+        self.__save(new_entries, list(found))
+        self.stats = {"images": len(keys), "cached": len(keys) - len(missing), "probed": len(missing)}
+        logger.info(f"\nimage metadata : {self.stats['cached']} from cache, {self.stats['probed']} probed")
+        return results
+
+    def __probe(self, path: str):
+        """
+        :param path: image file path
+        :return: (width, height, format, channels), (None, None, None, None) when the file can not be read
+        """
+        try:
+            return tuple(self.prober.probe_info(path))
+        except OSError as error:
+            logger.warning(f"\nWARNING: could not read the image <{path}> : {error}")
+            return None, None, None, None
+
+    @staticmethod
+    def __key(path: str):
+        """
+        :param path: image file path
+        :return: content address of the file, sha1 of its absolute path, size and mtime, None when it can not be
+         stat'ed so the path is treated as a cache miss
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        token = f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}"
+        return hashlib.sha1(token.encode("utf-8", "surrogateescape")).hexdigest()
+
+    def __load(self, keys):
+        """
+        :param keys: cache keys
+        :return: {key : (width, height, format, channels)} of the keys in the cache
+        """
+        if not os.path.exists(self.path):
+            return {}
+        found = {}
+        try:
+            with closing(sqlite3.connect(self.path)) as con:
+                for i in range(0, len(keys), QUERY_BATCH):
+                    batch = keys[i:i + QUERY_BATCH]
+                    rows = con.execute("SELECT key, width, height, format, channels FROM images WHERE key IN "
+                                       f"({','.join('?' * len(batch))})", batch)
+                    for key, width, height, fmt, channels in rows:
+                        found[key] = (width, height, fmt, channels)
+        except sqlite3.Error as error:
+            logger.warning(f"\nWARNING: could not read image metadata cache <{self.path}> : {error}")
+            return {}
+        return found
+
+    def __save(self, new_entries: dict, used_keys):
+        """ add the probed images, refresh the used ones and evict the least recently used entries.
+
+        :param new_entries: {key : (width, height, format, channels)}
+        :param used_keys: keys that were read from the cache
+        :return: None
+        """
+        now = int(time.time())
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with closing(sqlite3.connect(self.path)) as con, con:
+                con.execute("CREATE TABLE IF NOT EXISTS images (key TEXT PRIMARY KEY, width INTEGER, height INTEGER, "
+                            "format TEXT, channels INTEGER, last_used INTEGER)")
+                con.execute("CREATE INDEX IF NOT EXISTS images_last_used ON images (last_used)")
+                con.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)",
+                                [(key,) + info + (now,) for key, info in new_entries.items()])
+                con.executemany("UPDATE images SET last_used = ? WHERE key = ?", [(now, key) for key in used_keys])
+                n_entries, = con.execute("SELECT COUNT(*) FROM images").fetchone()
+                if n_entries > self.max_entries:
+                    con.execute("DELETE FROM images WHERE key IN (SELECT key FROM images ORDER BY last_used LIMIT ?)",
+                                (n_entries - self.max_entries,))
+        except (OSError, sqlite3.Error) as error:
+            logger.warning(f"\nWARNING: could not save image metadata cache <{self.path}> : {error}")
@@ -3,11 +3,9 @@
 
 from abc import ABCMeta, abstractmethod
 from typing import List
-import matplotlib.pyplot as plt
-import cv2
+import numpy as np
 import pandas as pd
 import logging
-import random
 import sys
 
 # set logger
@@ -15,6 +13,16 @@ logging.basicConfig()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+from .columnar import AnnotationSet
+from .stages import timed
+from .lazy import LazyModule
+from . import preview
+from . import sampling
+
+# only render() needs the drawing libraries
+cv2 = LazyModule("cv2")
+plt = LazyModule("matplotlib.pyplot")
+
 """:param
 ann_df attributes:
     - obj_id : int
@@ -43,6 +51,9 @@ class IOperator(object):
 
     def __init__(self, dataset):
         self._dataset = dataset
+        self._image_index = None
+        self._box_store = None
+        self._sample_index = None
 
     def set_dataset(self, df):
         """
@@ -52,6 +63,7 @@ class IOperator(object):
         """
         if type(df) is pd.DataFrame:
             self._dataset = df
+            self._sample_index = None
         else:
             logger.error(f"\n ERROR : Data type of df : {type(df)} not compatible with database object.")
 
@@ -82,6 +94,77 @@ class IOperator(object):
         :return:
         """
         self.annotations = ann
+        self._image_index = None
+        self._box_store = None
+        self._sample_index = None
+
+    def index_annotations(self):
+        """ sort the image_id column once and keep the row offsets of each image, the rows themselves are
+        gathered from the annotation columns on demand so the annotations are not copied.
+
+        :return: ([numpy view of each self.annotations column], row positions sorted by image_id, sorted distinct
+         image ids, offsets) the rows of ids[i] are at order[offsets[i]:offsets[i + 1]]
+        """
+        if self._image_index is None:
+            columns = [self.annotations[col].to_numpy() for col in self.annotations.columns]
+            if self.annotations.shape[0]:
+                image_ids = self.annotations["image_id"].to_numpy()
+                order = np.argsort(image_ids, kind="stable")
+                ids, counts = np.unique(image_ids[order], return_counts=True)
+            else:
+                order = ids = counts = np.empty(0, dtype=np.int64)
+            offsets = np.zeros(ids.shape[0] + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            self._image_index = (columns, order, ids, offsets)
+        return self._image_index
+
+    def get_image_annotations(self, image_id):
+        """ get the annotation rows of a single image with the image index.
+
+        :param image_id: [int] image_id in the self.annotations
+        :return: numpy.ndarray of rows with the self.annotations columns, empty if the image has no objects.
+        """
+        if self._box_store is not None:
+            return self._box_store.get_image_annotations(image_id)
+        columns, order, ids, offsets = self.index_annotations()
+        i = int(np.searchsorted(ids, image_id))
+        if i < ids.shape[0] and ids[i] == image_id:
+            return self.__gather(columns, order[offsets[i]:offsets[i + 1]])
+        return self.__gather(columns, order[:0])
+
+    @staticmethod
+    def __gather(columns, rows):
+        """
+        :param columns: numpy arrays of the annotation columns
+        :param rows: row positions
+        :return: numpy.ndarray of the rows, one column per annotation column
+        """
+        if not columns:
+            return np.empty((rows.shape[0], 7))
+        return np.column_stack([col[rows] for col in columns])
+
+    def iter_image_annotations(self, image_ids, chunk_size: int = 128):
+        """ get the annotation rows of many images in order, gathered with one take per chunk of images.
+
+        :param image_ids: sequence of image_id
+        :param chunk_size: number of images gathered at once
+        :return: generator of the rows of each image as lists, [] if the image has no objects.
+        """
+        image_ids = list(image_ids)
+        for i in range(0, len(image_ids), chunk_size):
+            boxes, bounds = self.take_images(image_ids[i:i + chunk_size])
+            rows, bounds = boxes.tolist(), bounds.tolist()
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                yield rows[start:stop]
+
+    def attach_store(self, store):
+        """ serve get_image_annotations, and so sample(), from a memory mapped BoxStore of these annotations
+        instead of building the in-memory image index.
+
+        :param store: BoxStore written from this operator
+        :return:
+        """
+        self._box_store = store
 
     def set_classes(self, classes):
         """
@@ -91,6 +174,35 @@ class IOperator(object):
         """
         self.classes = classes
 
+    @timed
+    def export(self):
+        """ hand over the extracted data to another operator, the box columns are shared without copying.
+
+        :return: AnnotationSet with the dataset, the annotation columns and the classes
+        """
+        return AnnotationSet.from_frames(self._dataset, self.annotations, self.classes)
+
+    def load(self, ann_set):
+        """ take the data exported by another operator.
+
+        :param ann_set: AnnotationSet
+        :return:
+        """
+        self.set_dataset(ann_set.images)
+        self.set_annotations(ann_set.to_frame())
+        self.set_classes(ann_set.classes)
+
+    @classmethod
+    @timed
+    def from_annotation_set(cls, ann_set):
+        """
+        :param ann_set: AnnotationSet exported by the source operator
+        :return: operator of this format holding the same data, ready to translate
+        """
+        obj = cls(ann_set.images)
+        obj.load(ann_set)
+        return obj
+
     @abstractmethod
     def extract(self, path: str):
         raise NotImplementedError
@@ -141,31 +253,118 @@ class IOperator(object):
         desc_dict["class object count"] = class_cnt
         return desc_dict
 
-    def sample(self, numOfSamples, s=0):
+    def sample(self, numOfSamples, s=0, arrays: bool = False):
         """
         choose set of images randomly and get bounding boxes of them
-        :return: dictionary list of [{"image_id" : "name", "classes" : [], "categories" : []}]
-        """
-        ## TODO : add feature to set seed in random sampling
-        if s != 0:
-            random.seed(s)
-        numOfrecords, _ = self._dataset.shape
-        rnd_numbers = sorted(random.sample(range(0, numOfrecords), numOfSamples))
-        sample_df = self._dataset.iloc[rnd_numbers, :]
-        image_list = list(sample_df.loc[:, "image_id"].values)
-        image_paths = list(sample_df.loc[:, "path"].values)
-        sampled_anns = self.annotations.loc[self.annotations.loc[:, "image_id"].isin(image_list), :]
+        :param numOfSamples: number of images, all the images when it is larger than the dataset
+        :param s: seed of the numpy random generator, 0 for a different set at each run
+        :param arrays: give "classes" and "bbox" as numpy views of one contiguous block of boxes instead of lists,
+         "bbox" is then a (n_boxes, 2, 2) array of [[x_min, y_min], [x_max, y_max]]
+        :return: dictionary list of [{"image_id" : int, "path" : str, "classes" : [], "bbox" : []}]
+        """
+        rows = sampling.choose(self._dataset.shape[0], numOfSamples, s)
+        return self.__collect(self._dataset.iloc[rows, :], arrays)
+
+    def sample_index(self):
+        """ build the class / folder to image index of the stratified samplers once.
+
+        :return: sampling.SampleIndex
+        """
+        if self._sample_index is None:
+            self._sample_index = sampling.SampleIndex(self._dataset, self.annotations)
+        return self._sample_index
+
+    def sample_balanced(self, perClass, s=0, class_ids=None, arrays: bool = False):
+        """
+        choose up to perClass images of every class, an image with several classes can count for each of them
+        :param perClass: number of images of each class
+        :param s: seed of the numpy random generator, 0 for a different set at each run
+        :param class_ids: list of class_id to sample, all the classes by default
+        :param arrays: see sample()
+        :return: dictionary list of [{"image_id" : int, "path" : str, "classes" : [], "bbox" : []}]
+        """
+        rows = self.sample_index().balanced(perClass, "class", class_ids, s)
+        return self.__collect(self._dataset.iloc[rows, :], arrays)
+
+    def sample_stratified(self, numOfSamples, by="class", rare_weight=0.0, s=0, arrays: bool = False):
+        """
+        choose numOfSamples images split across the classes or folders
+        :param numOfSamples: number of images
+        :param by: "class", each image is counted in its rarest class and images without objects are left out,
+         or "folder"
+        :param rare_weight: 0 to split in proportion to the number of images of the groups, 1 to split evenly,
+         values between favour the rare groups
+        :param s: seed of the numpy random generator, 0 for a different set at each run
+        :param arrays: see sample()
+        :return: dictionary list of [{"image_id" : int, "path" : str, "classes" : [], "bbox" : []}]
+        """
+        if by not in ["class", "folder"]:
+            logger.error(f"\n ERROR : {by} is not a valid stratum, use 'class' or 'folder'.")
+            sys.exit(1)
+        rows = self.sample_index().stratified(numOfSamples, by, rare_weight, s)
+        return self.__collect(self._dataset.iloc[rows, :], arrays)
+
+    def take_images(self, image_ids):
+        """ gather the annotation rows of a set of images with a single take.
+
+        :param image_ids: sequence of image_id
+        :return: (numpy.ndarray of rows with the self.annotations columns, bounds) the rows of image_ids[i] are
+         rows[bounds[i]:bounds[i + 1]]
+        """
+        ids = np.asarray(image_ids, dtype=np.int64)
+        if self._box_store is not None:
+            values = self._box_store.boxes
+            starts, stops = self._box_store.ranges(ids)
+        else:
+            columns, order, index_ids, offsets = self.index_annotations()
+            i = np.searchsorted(index_ids, ids)
+            found = i < index_ids.shape[0]
+            found[found] = index_ids[i[found]] == ids[found]
+            i = np.where(found, i, 0)
+            starts = np.where(found, offsets[i], 0)
+            stops = np.where(found, offsets[i + 1], 0)
+            rows, bounds = sampling.take_ranges(order, starts, stops)
+            return self.__gather(columns, rows), bounds
+        return sampling.take_ranges(values, starts, stops)
+
+    def previews(self, location: str, max_size: int = None, n_workers: int = 1, chunk_size: int = 64):
+        """ save an annotated copy of every image in the dataset, without matplotlib or a display.
+
+        :param location: output folder, the files are named <image_id>_<image file name>
+        :param max_size: longest side of the previews in pixels, None to keep the image size.
+        :param n_workers: number of processes to render with, 1 to render in this process.
+        :param chunk_size: number of images sent to a process at once.
+        :return: list of the written file paths
+        """
+        return preview.write_previews(location, self.__collect(self._dataset), self.classes, max_size, n_workers,
+                                      chunk_size)
+
+    def __collect(self, image_df, arrays=False):
+        """
+        :param image_df: rows of self._dataset
+        :param arrays: see sample()
+        :return: dictionary list of [{"image_id" : int, "path" : str, "classes" : [], "bbox" : []}]
+        """
+        image_list = list(image_df.loc[:, "image_id"].values)
+        image_paths = list(image_df.loc[:, "path"].values)
+        boxes, bounds = self.take_images(image_list)
+        if arrays:
+            classes = boxes[:, 2]
+            bbox = boxes[:, 3:7].reshape(-1, 2, 2)
+        else:
+            classes = boxes[:, 2].tolist()
+            x_min, y_min, x_max, y_max = boxes[:, 3:7].T.tolist()
+            bbox = [[(x1, y1), (x2, y2)] for x1, y1, x2, y2 in zip(x_min, y_min, x_max, y_max)]
+        bounds = bounds.tolist()
         final_list = []
-        for image_id, image_path in zip(image_list, image_paths):
-            ann_for_image = sampled_anns.loc[sampled_anns.loc[:, "image_id"] == image_id, :]
-            spares_list = ann_for_image.values.tolist()
-            ordered_dict = self.__listGen(spares_list)
-            ordered_dict["image_id"] = image_id
-            ordered_dict["path"] = image_path
-            final_list.append(ordered_dict)
+        for i, (image_id, image_path) in enumerate(zip(image_list, image_paths)):
+            start, stop = bounds[i], bounds[i + 1]
+            final_list.append({"classes": classes[start:stop], "bbox": bbox[start:stop],
+                               "image_id": image_id, "path": image_path})
         return final_list
 
-    def render(self, path: str, boxes: list, cl: list, shape: List[int], rect_th=1, text_size=0.5, text_th=1):
+    def render(self, path: str, boxes: list, cl: list, shape: List[int], rect_th=1, text_size=0.5, text_th=1,
+               save_path: str = None):
         """ show annotated image
 
         :param path: directory to image
@@ -174,11 +373,10 @@ class IOperator(object):
         :param rect_th: thickness of he box :int
         :param text_size: font size
         :param text_th: thickness of the text :int
+        :param save_path: write the annotated image to this file with cv2 instead of showing it, works headless.
         :return: matplotlib.pyplot.plt object / a image.
         """
         img = cv2.imread(path)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        px = 1/plt.rcParams['figure.dpi']  # pixel in inches
 
         for i in range(len(boxes)):
             # print(boxes[i][0], boxes[i][1])
@@ -186,25 +384,17 @@ class IOperator(object):
             cv2.putText(img, str(cl[i]),
                         boxes[i][0], cv2.FONT_HERSHEY_COMPLEX,
                         text_size, color=(1, 1, 1), thickness=text_th)
+        if save_path is not None:
+            if not cv2.imwrite(save_path, img):
+                logger.error(f"\n ERROR : can not write the image <{save_path}>.")
+                sys.exit(1)
+            return
+
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        px = 1/plt.rcParams['figure.dpi']  # pixel in inches
         plt.figure(figsize=(shape[0]*px, shape[1]*px))
         plt.imshow(img)
         plt.xticks([])
         plt.yticks([])
         plt.show()
         return
-
-    def __listGen(self, data_list):
-        """
-
-        :param data_list: [obj_id, class_id, class_id , x_min, y_min, x_max, y_max]
-        :return: two list {"classes" : [classes, ..] , "bbox" : [[(x_min, y_min), (x_max, y_max)], ..]}
-        """
-        bounding_boxes = []
-        classes = []
-        for obj in data_list:
-            classes.append(obj[2])
-            bounding_boxes.append([(obj[3], obj[4]), (obj[5], obj[6])])
-        final_dict = {"classes": classes, "bbox": bounding_boxes}
-        return final_dict
-
-
@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from abc import ABC
+import logging
+import os
+import sys
+import importlib.util
+import pandas as pd
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .operator import IOperator
+from .stages import timed, extracted
+from .lazy import LazyModule
+
+# pyarrow is optional and loaded on the first read or write
+pa = LazyModule("pyarrow")
+feather = LazyModule("pyarrow.feather")
+pq = LazyModule("pyarrow.parquet")
+
+""":cvar
+annotation folder, <ext> is parquet or arrow (uncompressed Arrow IPC file) :
+    - images.<ext> : name, width, height, image_id
+    - annotations.<ext> : obj_id, image_id, class_id, x_min, y_min, x_max, y_max
+    - classes.<ext> : class_id, name
+"""
+
+TABLES = ["images", "annotations", "classes"]
+IMAGE_COLUMNS = ["name", "width", "height", "image_id"]
+FORMATS = ["arrow", "parquet"]
+
+
+class Parquet(IOperator, ABC):
+
+    """ Instance Object for Parquet / Arrow IPC annotation folders """
+
+    def __init__(self, dataset):
+        super().__init__(dataset)
+        self._dataset = dataset
+
+    @timed(count=extracted)
+    def extract(self, path: str):
+        """ read the common schema tables written by archive(), the files are memory mapped.
+
+        :param path: string, relative / absolute path for annotation folder
+        :return:
+        """
+        self.__requireArrow()
+        ext = self.__findFormat(path)
+        try:
+            tables = {name: self.__readTable(os.path.join(path, f"{name}.{ext}"), ext) for name in TABLES}
+        except Exception as error:
+            logger.exception(error)
+            sys.exit(1)
+
+        self.__updateDataset(tables["images"])
+        super(Parquet, self).set_annotations(tables["annotations"])
+        classes = tables["classes"]
+        super(Parquet, self).set_classes(dict(zip(classes["class_id"].tolist(), classes["name"].tolist())))
+
+    @timed
+    def translate(self):
+        """ translate common schema into the tables of the annotation folder.
+
+        :return: {table name : pd.DataFrame}
+        """
+        classes = pd.DataFrame({"class_id": list(self.classes.keys()), "name": list(self.classes.values())})
+        return {"images": self._dataset.loc[:, IMAGE_COLUMNS], "annotations": self.annotations, "classes": classes}
+
+    @timed
+    def archive(self, location: str, data, ipc: bool = False):
+        """ save the tables in the given folder
+
+        :param location: annotation folder saving location
+        :param data: return value of self.translate()
+        :param ipc: write uncompressed Arrow IPC files, which are read back without copying, instead of Parquet files.
+        :return:
+        """
+        self.__requireArrow()
+        ext = "arrow" if ipc else "parquet"
+        try:
+            for name, df in data.items():
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                file_path = os.path.join(location, f"{name}.{ext}")
+                if ipc:
+                    feather.write_feather(table, file_path, compression="uncompressed")
+                else:
+                    pq.write_table(table, file_path)
+        except Exception as error:
+            logger.exception(error)
+            sys.exit(1)
+
+    @staticmethod
+    def __requireArrow():
+        if importlib.util.find_spec("pyarrow") is None:
+            logger.error("\n ERROR : pyarrow is required for the Parquet / Arrow annotation format, "
+                         "install it with `pip install pyarrow`.")
+            sys.exit(1)
+
+    @staticmethod
+    def __findFormat(path: str):
+        """
+        :param path: annotation folder
+        :return: extension of the tables in the folder, arrow files are preferred.
+        """
+        if not os.path.isdir(path):
+            logger.error(f"\n ERROR : The entered path <{path}> is not valid.")
+            sys.exit(1)
+        for ext in FORMATS:
+            if all(os.path.exists(os.path.join(path, f"{name}.{ext}")) for name in TABLES):
+                return ext
+        logger.error(f"\n ERROR : {', '.join(TABLES)} tables are not found in <{path}>.")
+        sys.exit(1)
+
+    @staticmethod
+    def __readTable(file_path: str, ext: str):
+        """
+        :param file_path: table file
+        :param ext: arrow or parquet
+        :return: pd.DataFrame, numeric columns of arrow files keep pointing to the memory mapped file.
+        """
+        if ext == "arrow":
+            table = feather.read_table(file_path, memory_map=True)
+        else:
+            table = pq.read_table(file_path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def __updateDataset(self, image_df):
+        """
+
+        :param image_df: image attributes DataFrame
+        :return: merge current self.__dataset with image_df.
+        """
+        dataset = self._dataset.drop(columns=["width", "height"], errors="ignore")
+        res_df = pd.merge(dataset, image_df, on="name")
+        super(Parquet, self).set_dataset(res_df)
@@ -3,6 +3,7 @@
 
 from abc import ABC
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import os
 import re
@@ -15,6 +16,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 from .operator import IOperator
+from .stages import timed, extracted
 
 
 class PascalVOC(IOperator, ABC):
@@ -25,38 +27,85 @@ class PascalVOC(IOperator, ABC):
         super().__init__(dataset)
         self._dataset = dataset
 
-    def extract(self, path: str):
+    @timed(count=extracted)
+    def extract(self, path: str, n_workers: int = 1, chunk_size: int = 256):
         """ extract annotation data when input the path to .xml files
 
         :param path: string, relative / absolute path for annotation folder
+        :param n_workers: number of processes to parse the .xml files with, 1 to parse them in this process.
+        :param chunk_size: number of .xml files sent to a process at once.
         :return:
         """
         files_list = self.__extractFiles(path)
-        image_id = 0
-        img_list = []
-        tol_obj_list = []
-        for file in files_list:
-            img_data, obj_list = self.__FileReader(os.path.abspath(path) + os.sep + file)
-            image_id += 1
-            img_data.append(image_id)
-            obj_list = [i+[image_id] for i in obj_list]
-            img_list.append(img_data)
-            tol_obj_list.extend(obj_list)
-        if img_list:
-            img_df = pd.DataFrame.from_records(img_list, columns=['name', 'width', 'height','image_id'])
+        root = os.path.abspath(path)
+        chunks = [[root + os.sep + file for file in files_list[i:i + chunk_size]]
+                  for i in range(0, len(files_list), chunk_size)]
+        try:
+            if n_workers > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    results = list(executor.map(PascalVOC.parse_files, chunks))
+            else:
+                results = [PascalVOC.parse_files(chunk) for chunk in chunks]
+        except Exception as error:
+            logger.exception(error)
+            sys.exit(1)
+
+        img_cols, obj_cols = self.__mergeChunks(results)
+        if img_cols["name"]:
+            img_df = pd.DataFrame(img_cols, columns=['name', 'width', 'height', 'image_id'])
             self.__updateDataset(img_df)
         else:
             logger.error("[var]: img_list is empty.")
             sys.exit(1)
 
-        if obj_list and len(obj_list[0]) == 6:
-            obj_df = pd.DataFrame.from_records(tol_obj_list,
-                                               columns=['x_min', 'y_min', 'x_max', 'y_max', 'class', 'image_id'])
+        if obj_cols["class"]:
+            obj_df = pd.DataFrame(obj_cols, columns=['x_min', 'y_min', 'x_max', 'y_max', 'class', 'image_id'])
             self.__DFRefiner(obj_df)
         else:
-            logger.error(f"\n ERROR : obj_list has not many attrs. : {len(obj_list[0])} or obj_list is empty : {len(obj_list)}")
+            logger.error("\n ERROR : there are no objects in the annotation files.")
             sys.exit(1)
 
+    @staticmethod
+    def parse_files(file_paths):
+        """ read a chunk of .xml files into columns, run in the worker processes.
+
+        :param file_paths: list of absolute paths to .xml files
+        :return: tuple of two dictionaries of lists
+         img_cols = { name, width, height }
+         obj_cols = { x_min, y_min, x_max, y_max, class, file } , file is the position of the file in file_paths
+        """
+        img_cols = {"name": [], "width": [], "height": []}
+        obj_cols = {"x_min": [], "y_min": [], "x_max": [], "y_max": [], "class": [], "file": []}
+        for i, file_path in enumerate(file_paths):
+            img_data, obj_list = PascalVOC.__FileReader(file_path)
+            for col, value in zip(["name", "width", "height"], img_data):
+                img_cols[col].append(value)
+            for obj in obj_list:
+                for col, value in zip(["x_min", "y_min", "x_max", "y_max", "class"], obj):
+                    obj_cols[col].append(value)
+                obj_cols["file"].append(i)
+        return img_cols, obj_cols
+
+    @staticmethod
+    def __mergeChunks(results):
+        """ concatenate the chunk columns in order, so the ids are the same as reading the files one by one.
+
+        :param results: list of return values from PascalVOC.parse_files
+        :return: img_cols with an image_id column, obj_cols with an image_id column in place of file
+        """
+        img_cols = {"name": [], "width": [], "height": [], "image_id": []}
+        obj_cols = {"x_min": [], "y_min": [], "x_max": [], "y_max": [], "class": [], "image_id": []}
+        for chunk_img_cols, chunk_obj_cols in results:
+            offset = len(img_cols["name"]) + 1
+            for col in ["name", "width", "height"]:
+                img_cols[col].extend(chunk_img_cols[col])
+            img_cols["image_id"].extend(range(offset, len(img_cols["name"]) + 1))
+            for col in ["x_min", "y_min", "x_max", "y_max", "class"]:
+                obj_cols[col].extend(chunk_obj_cols[col])
+            obj_cols["image_id"].extend([offset + i for i in chunk_obj_cols["file"]])
+        return img_cols, obj_cols
+
+    @timed
     def archive(self, location: str, data):
         """ save pascalVOC annotation file in the given location
 
@@ -72,13 +121,14 @@ class PascalVOC(IOperator, ABC):
             logger.exception(error)
             sys.exit(1)
 
+    @timed
     def translate(self):
         """ translate common schema into json compatible format.
 
         :return: none
         """
-        for index, row in self._dataset.iterrows():
-            ann_list = self.__filterImgObj(row['image_id'])
+        records = self._dataset.to_dict('records')
+        for row, ann_list in zip(records, self.iter_image_annotations([r['image_id'] for r in records])):
             box = self.__xmlFormatter(row, ann_list)
             if box:
                 yield box, row['name']
@@ -108,6 +158,7 @@ class PascalVOC(IOperator, ABC):
             logger.error(f"\n ERROR : The entered path <{path}> is not valid.")
             sys.exit(1)
 
+    @timed
     def __DFRefiner(self, ann_df):
         """
         create pd.DataFrame with columns of [ "obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max" ] and
@@ -115,63 +166,55 @@ class PascalVOC(IOperator, ABC):
         :param ann_df: pd.Dataframe with columns of [ 'x_min', 'y_min', 'x_max', 'y_max', 'class', 'image_id' ]
         :return: None
         """
-        ann_df = ann_df.copy()
-
-        cats = list(ann_df.loc[:, "class"].unique())
+        codes, cats = pd.factorize(ann_df["class"])
+        cats = list(cats)
         n_cats = len(cats)
-        cat_series = pd.Series(range(1, n_cats + 1), index=cats)
 
-        ann_df["class_id"] = ann_df["class"].map(cat_series)
-        ann_df["obj_id"] = range(1,ann_df.shape[0]+1)
-        nw_df = ann_df.loc[:, ["obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max"]]
+        nw_df = pd.DataFrame({"obj_id": range(1, ann_df.shape[0] + 1), "image_id": ann_df["image_id"],
+                              "class_id": codes + 1, "x_min": ann_df["x_min"], "y_min": ann_df["y_min"],
+                              "x_max": ann_df["x_max"], "y_max": ann_df["y_max"]})
 
         super(PascalVOC, self).set_annotations(nw_df)
         super(PascalVOC, self).set_classes(dict(zip(range(1,n_cats+1),cats)))
 
-    def __FileReader(self, file_path: str):
+    @staticmethod
+    def __FileReader(file_path: str):
         """ read individual xml files extract data, create pd.DataFrame files
 
         :param file_path: absolute path to the single .xml file
         :return: tuple of two list
          img_data = [ filename, width, height ]
-         obj_list = [ class, xmin, ymin, xmax, ymax ]
+         obj_list = [ xmin, ymin, xmax, ymax, class ]
         """
         ann_tree = ET.parse(file_path)
         ann_root = ann_tree.getroot()
-        try:
-            filename = self.__tagFilter(ann_root.find('filename').text)
-            size = ann_root.find('size')
-            width = int(size.find('width').text)
-            height = int(size.find('height').text)
-            img_data = [filename, width, height]
-
-            obj_list = []
-            for obj in ann_root.findall('object'):
-                obj_list.append(self.__get_voc_annotation_from_obj(obj))
-        except Exception as error:
-            logger.exception(error)
-            sys.exit(1)
+        filename = PascalVOC.__tagFilter(ann_root.find('filename').text)
+        size = ann_root.find('size')
+        width = int(size.find('width').text)
+        height = int(size.find('height').text)
+        img_data = [filename, width, height]
+
+        obj_list = []
+        for obj in ann_root.findall('object'):
+            obj_list.append(PascalVOC.__get_voc_annotation_from_obj(obj))
 
         return [img_data, obj_list]
 
-    def __get_voc_annotation_from_obj(self, obj):
+    @staticmethod
+    def __get_voc_annotation_from_obj(obj):
         """ read <object> block in xml file
 
         :param obj: <object> block in the .xml file
-        :return: a list of object attrs. [ class, xmin, ymin, xmax, ymax ]
+        :return: a list of object attrs. [ xmin, ymin, xmax, ymax, class ]
         """
-        try:
-            label = self.__tagFilter(obj.find('name').text)
-            bndbox = obj.find('bndbox')
-            xmin = int(bndbox.find('xmin').text)
-            ymin = int(bndbox.find('ymin').text)
-            xmax = int(bndbox.find('xmax').text)
-            ymax = int(bndbox.find('ymax').text)
-            ann = [xmin, ymin, xmax, ymax, label]
-            return ann
-        except Exception as error:
-            logger.exception(error)
-            sys.exit(1)
+        label = PascalVOC.__tagFilter(obj.find('name').text)
+        bndbox = obj.find('bndbox')
+        xmin = int(bndbox.find('xmin').text)
+        ymin = int(bndbox.find('ymin').text)
+        xmax = int(bndbox.find('xmax').text)
+        ymax = int(bndbox.find('ymax').text)
+        ann = [xmin, ymin, xmax, ymax, label]
+        return ann
 
     def __updateDataset(self, image_df):
         """
@@ -179,24 +222,15 @@ class PascalVOC(IOperator, ABC):
         :param image_df: image attributes DataFrame
         :return: merge current self.__dataset with image_df.
         """
-        partial_df = image_df.copy()
-        res_df = pd.merge(self._dataset, partial_df, on="name")
+        dataset = self._dataset.drop(columns=["width", "height"], errors="ignore")
+        res_df = pd.merge(dataset, image_df, on="name")
         super(PascalVOC, self).set_dataset(res_df)
 
-    def __filterImgObj(self, img_id):
-        """ get row for specific image_id.
-
-        :param img_id: [int] image_id in the self.annotations
-        :return: all the row that carry given image_id as a list.
-        """
-        filtered_list = self.annotations.loc[self.annotations["image_id"] == img_id, :].values.tolist()
-        return filtered_list
-
     def __xmlFormatter(self, image_data, ann_data):
         """ build the structure of the .xml file with data.
 
         :param image_data: dictionary for data in self._dataset
-        :param ann_data: return values from self.__filterImgObj
+        :param ann_data: annotation rows of the image from self.iter_image_annotations
         :return: complete .xml object
         """
         try:
@@ -224,6 +258,7 @@ class PascalVOC(IOperator, ABC):
             logger.exception(error)
             sys.exit(1)
 
-    def __tagFilter(self,st: str):
+    @staticmethod
+    def __tagFilter(st: str):
         s = re.sub(r'\t*\n*\r*', '', st)
         return s
@@ -0,0 +1,213 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List
+import numpy as np
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .lazy import LazyModule
+
+cv2 = LazyModule("cv2")
+
+""":cvar
+sample : one item of IOperator.sample()
+    - classes : [class_id, ..]
+    - bbox : [[(x_min, y_min), (x_max, y_max)], ..]
+    - image_id : int
+    - path : str
+"""
+
+# BGR colours of the boxes, picked by class_id
+PALETTE = [(75, 25, 230), (75, 180, 60), (25, 225, 255), (200, 130, 0), (48, 130, 245), (180, 30, 145),
+           (240, 240, 70), (230, 50, 240), (60, 245, 210), (212, 190, 250), (128, 128, 0), (40, 110, 170)]
+BACKGROUND = (40, 40, 40)
+
+
+def annotate(sample: dict, classes: dict, shape: List[int], rect_th=1, text_size=0.4, text_th=1):
+    """ decode an image, fit it in a tile of the given shape and draw its boxes.
+
+    :param sample: item of IOperator.sample()
+    :param classes: {class_id : class name}
+    :param shape: [width, height] of the tile in pixels
+    :param rect_th: thickness of the box :int
+    :param text_size: font size
+    :param text_th: thickness of the text :int
+    :return: BGR numpy.ndarray of (height, width, 3), a blank tile when the image can not be read.
+    """
+    width, height = shape
+    tile = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    img = cv2.imread(sample["path"], cv2.IMREAD_COLOR)
+    if img is None:
+        logger.warning(f"can not read the image <{sample['path']}>.")
+        return tile
+
+    img_h, img_w = img.shape[:2]
+    scale = min(width / img_w, height / img_h)
+    img = _resize(img, scale)
+    left, top = (width - img.shape[1]) // 2, (height - img.shape[0]) // 2
+    tile[top:top + img.shape[0], left:left + img.shape[1]] = img
+    _draw(tile, sample, classes, scale, (left, top), rect_th, text_size, text_th)
+    return tile
+
+
+def render_image(sample: dict, classes: dict, max_size: int = None, rect_th=1, text_size=0.5, text_th=1):
+    """ decode an image, downscale it and draw its boxes and class names.
+
+    :param sample: item of IOperator.sample()
+    :param classes: {class_id : class name}
+    :param max_size: longest side of the output in pixels, None to keep the image size. images are never upscaled.
+    :return: BGR numpy.ndarray, None when the image can not be read.
+    """
+    img = cv2.imread(sample["path"], cv2.IMREAD_COLOR)
+    if img is None:
+        logger.warning(f"can not read the image <{sample['path']}>.")
+        return None
+    scale = 1.0
+    if max_size is not None and max(img.shape[:2]) > max_size:
+        scale = max_size / max(img.shape[:2])
+        img = _resize(img, scale)
+    return _draw(img, sample, classes, scale, (0, 0), rect_th, text_size, text_th)
+
+
+def _resize(img, scale: float):
+    """ resize by a factor, downscaling happens before drawing so the boxes and labels keep their thickness. """
+    if scale == 1:
+        return img
+    size = (max(1, round(img.shape[1] * scale)), max(1, round(img.shape[0] * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+
+
+def _draw(img, sample: dict, classes: dict, scale: float, offset, rect_th, text_size, text_th):
+    """ draw the boxes of a sample in place, the box coordinates are scaled and shifted by offset (x, y). """
+    left, top = offset
+    for class_id, ((x_min, y_min), (x_max, y_max)) in zip(sample["classes"], sample["bbox"]):
+        color = PALETTE[int(class_id) % len(PALETTE)]
+        p1 = (left + int(round(x_min * scale)), top + int(round(y_min * scale)))
+        p2 = (left + int(round(x_max * scale)), top + int(round(y_max * scale)))
+        cv2.rectangle(img, p1, p2, color=color, thickness=rect_th)
+        cv2.putText(img, str(classes.get(class_id, class_id)), (p1[0], max(p1[1] - 2, 8)),
+                    cv2.FONT_HERSHEY_SIMPLEX, text_size, color=color, thickness=text_th)
+    return img
+
+
+def mosaic(tiles: list, columns: int, shape: List[int]):
+    """ tile images into a single contact sheet, row by row.
+
+    :param tiles: list of numpy.ndarray of the same (height, width, 3) shape
+    :param columns: number of tiles in a row
+    :param shape: [width, height] of the tiles
+    :return: numpy.ndarray contact sheet
+    """
+    width, height = shape
+    columns = min(columns, len(tiles))
+    rows = -(-len(tiles) // columns)
+    sheet = np.full((rows * height, columns * width, 3), BACKGROUND, dtype=np.uint8)
+    for i, tile in enumerate(tiles):
+        row, col = divmod(i, columns)
+        sheet[row * height:(row + 1) * height, col * width:(col + 1) * width] = tile
+    return sheet
+
+
+def contact_sheets(samples: list, classes: dict, shape: List[int] = [300, 300], columns: int = 5, rows: int = 5,
+                   n_workers: int = 4):
+    """ annotate the samples in parallel and group them into contact sheets.
+
+    :param samples: return value of IOperator.sample()
+    :param classes: {class_id : class name}
+    :param shape: [width, height] of each tile in pixels
+    :param columns: number of tiles in a row of a sheet
+    :param rows: number of rows in a sheet, a new sheet is started when a sheet is full
+    :param n_workers: number of threads decoding the images, cv2 releases the GIL while decoding
+    :return: generator of BGR numpy.ndarray sheets
+    """
+    per_sheet = columns * rows
+    with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+        for start in range(0, len(samples), per_sheet):
+            batch = samples[start:start + per_sheet]
+            tiles = list(executor.map(lambda sample: annotate(sample, classes, shape), batch))
+            yield mosaic(tiles, columns, shape)
+
+
+def write_contact_sheets(location: str, samples: list, classes: dict, shape: List[int] = [300, 300],
+                         columns: int = 5, rows: int = 5, n_workers: int = 4):
+    """ save the contact sheets of the samples as sheet_000.png, sheet_001.png, .. in the given folder.
+
+    :param location: output folder, created if it does not exist
+    :return: list of the written file paths
+    """
+    try:
+        os.makedirs(location, exist_ok=True)
+    except Exception as error:
+        logger.exception(error)
+        sys.exit(1)
+    paths = []
+    for i, sheet in enumerate(contact_sheets(samples, classes, shape, columns, rows, n_workers)):
+        path = os.path.join(location, f"sheet_{i:03d}.png")
+        if not cv2.imwrite(path, sheet):
+            logger.error(f"\n ERROR : can not write the contact sheet <{path}>.")
+            sys.exit(1)
+        paths.append(path)
+    return paths
+
+
+def preview_name(sample: dict):
+    """
+    :return: output file name of a sample, <image_id>_<image file name>, unique when images share a name
+    """
+    return f"{sample['image_id']}_{os.path.basename(sample['path'])}"
+
+
+def render_files(jobs: list, classes: dict, max_size: int = None):
+    """ render and save a chunk of samples, run in the worker processes.
+
+    :param jobs: list of (sample, output file path)
+    :param classes: {class_id : class name}
+    :param max_size: see render_image()
+    :return: list of the written file paths
+    """
+    written = []
+    for sample, path in jobs:
+        img = render_image(sample, classes, max_size)
+        if img is None:
+            continue
+        if cv2.imwrite(path, img):
+            written.append(path)
+        else:
+            logger.warning(f"can not write the preview <{path}>.")
+    return written
+
+
+def write_previews(location: str, samples: list, classes: dict, max_size: int = None, n_workers: int = 1,
+                   chunk_size: int = 64):
+    """ save an annotated copy of each sample in the given folder, named by preview_name() and encoded
+    by cv2 in the format of the file extension.
+
+    :param location: output folder, created if it does not exist
+    :param samples: list of IOperator.sample() items
+    :param classes: {class_id : class name}
+    :param max_size: longest side of the previews in pixels, None to keep the image size.
+    :param n_workers: number of processes to render with, 1 to render in this process.
+    :param chunk_size: number of images sent to a process at once.
+    :return: list of the written file paths, unreadable images are skipped
+    """
+    try:
+        os.makedirs(location, exist_ok=True)
+    except Exception as error:
+        logger.exception(error)
+        sys.exit(1)
+    jobs = [(sample, os.path.join(location, preview_name(sample))) for sample in samples]
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    if n_workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(render_files, chunks, [classes] * len(chunks), [max_size] * len(chunks)))
+    else:
+        results = [render_files(chunk, classes, max_size) for chunk in chunks]
+    return [path for written in results for path in written]
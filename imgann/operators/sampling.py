@@ -0,0 +1,212 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import logging
+from itertools import islice
+import numpy as np
+import pandas as pd
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def generator(seed=0):
+    """
+    :param seed: seed of the random generator, 0 for a different set at each run, or a numpy.random.Generator
+    :return: numpy.random.Generator
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed if seed != 0 else None)
+
+
+def choose(n: int, k: int, seed=0):
+    """ choose k distinct row positions out of n.
+
+    :param n: number of rows
+    :param k: number of samples, all the rows when k >= n
+    :param seed: see generator()
+    :return: sorted numpy.ndarray of row positions
+    """
+    if k >= n:
+        return np.arange(n)
+    return np.sort(generator(seed).choice(n, size=k, replace=False))
+
+
+def take_ranges(values, starts, stops):
+    """ gather the rows values[starts[i]:stops[i]] of every range with one take.
+
+    :param values: numpy.ndarray of rows
+    :param starts: numpy.ndarray of range starts
+    :param stops: numpy.ndarray of range stops
+    :return: (contiguous numpy.ndarray of the gathered rows, bounds) the rows of range i are
+     rows[bounds[i]:bounds[i + 1]]
+    """
+    counts = stops - starts
+    bounds = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(counts, out=bounds[1:])
+    positions = np.arange(bounds[-1], dtype=np.int64) + np.repeat(starts - bounds[:-1], counts)
+    return np.take(values, positions, axis=0), bounds
+
+
+# end of stream marker of reservoir()
+_END = object()
+
+
+def reservoir(stream, k: int, seed: int = 0):
+    """ sample k items of an iterable of unknown length in one pass and O(k) memory (Li's algorithm L),
+    the random numbers drawn grow with k * log(n / k) instead of n.
+
+    :param stream: any iterable, i.e. the DirScanner records of ImgData.extract(sample=k)
+    :param k: number of samples
+    :param seed: see generator()
+    :return: list of the sampled items in stream order, all the items when the stream is shorter than k
+    """
+    rng = generator(seed)
+    it = iter(stream)
+    items = list(islice(it, k))
+    positions = list(range(len(items)))
+    if len(items) < k or k == 0:
+        return items
+
+    position = k - 1
+    w = math.exp(math.log(1.0 - rng.random()) / k)
+    while True:
+        skip = math.floor(math.log(1.0 - rng.random()) / math.log1p(-w)) if w < 1 else 0
+        item = next(islice(it, skip, None), _END)
+        if item is _END:
+            break
+        position += skip + 1
+        slot = int(rng.integers(k))
+        items[slot], positions[slot] = item, position
+        w *= math.exp(math.log(1.0 - rng.random()) / k)
+    return [item for _, item in sorted(zip(positions, items), key=lambda pair: pair[0])]
+
+
+class SampleIndex:
+    """ inverted indexes from classes and folders to the dataset rows of their images, built once so the
+    stratified samplers only touch the groups and the drawn rows. """
+
+    def __init__(self, dataset, annotations):
+        """
+        :param dataset: IOperator dataset with image_id and folder columns
+        :param annotations: IOperator annotations with image_id and class_id columns
+        """
+        image_ids = dataset["image_id"].to_numpy()
+        order = np.argsort(image_ids, kind="stable")
+        sorted_ids = image_ids[order]
+        ann_ids = annotations["image_id"].to_numpy()
+        found = np.searchsorted(sorted_ids, ann_ids)
+        valid = found < sorted_ids.shape[0]
+        valid[valid] = sorted_ids[found[valid]] == ann_ids[valid]
+        rows = order[found[valid]]
+        class_ids = annotations["class_id"].to_numpy()[valid]
+
+        self.n_images = image_ids.shape[0]
+        self.groups = {"class": self.__group(class_ids, rows),
+                       "folder": self.__group(dataset["folder"].to_numpy(), np.arange(self.n_images))}
+        self.__strata = {}
+
+    @staticmethod
+    def __group(keys, rows):
+        """
+        :param keys: group key of each row
+        :param rows: dataset row positions
+        :return: (labels, offsets, members) the distinct rows of labels[i] are members[offsets[i]:offsets[i + 1]]
+        """
+        codes, labels = pd.factorize(keys, sort=True)
+        n_rows = int(rows.max()) + 1 if rows.shape[0] else 1
+        # one sort of the (group, row) pairs packed into single integers
+        pairs = np.unique(codes.astype(np.int64) * n_rows + rows)
+        group_codes, members = np.divmod(pairs, n_rows)
+        offsets = np.searchsorted(group_codes, np.arange(len(labels) + 1))
+        return labels.tolist(), offsets, members
+
+    def sizes(self, by: str = "class"):
+        """
+        :param by: "class" or "folder"
+        :return: {label : number of images}
+        """
+        labels, offsets, _ = self.groups[by]
+        return dict(zip(labels, np.diff(offsets).tolist()))
+
+    def balanced(self, per_group: int, by: str = "class", labels=None, seed=0):
+        """ draw up to per_group images of every group, images shared by groups are kept once.
+
+        :param per_group: number of images of each group, all of them for smaller groups
+        :param by: "class" or "folder"
+        :param labels: groups to sample from, all of them by default
+        :param seed: see generator()
+        :return: sorted numpy.ndarray of dataset row positions
+        """
+        rng = generator(seed)
+        group_labels, offsets, members = self.groups[by]
+        wanted = set(group_labels if labels is None else labels)
+        picked = [members[offsets[i]:offsets[i + 1]][choose(offsets[i + 1] - offsets[i], per_group, rng)]
+                  for i, label in enumerate(group_labels) if label in wanted]
+        return np.unique(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int64)
+
+    def stratified(self, k: int, by: str = "class", rare_weight: float = 0.0, seed=0):
+        """ draw k images split across the groups in proportion to size ** (1 - rare_weight).
+        for classes each image belongs to the stratum of its rarest class, images without objects are left out.
+
+        :param k: number of images
+        :param by: "class" or "folder"
+        :param rare_weight: 0 for proportional strata, 1 for the same number of images of every group, values
+         between favour the rare groups
+        :param seed: see generator()
+        :return: sorted numpy.ndarray of dataset row positions
+        """
+        rng = generator(seed)
+        offsets, members = self.__stratify(by)
+        sizes = np.diff(offsets)
+        counts = _allocate(sizes, k, rare_weight)
+        picked = [members[offsets[i]:offsets[i + 1]][choose(sizes[i], counts[i], rng)]
+                  for i in np.flatnonzero(counts)]
+        return np.sort(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int64)
+
+    def __stratify(self, by: str):
+        """
+        :return: (offsets, members) of groups that do not share images, cached
+        """
+        if by not in self.__strata:
+            _, offsets, members = self.groups[by]
+            if by == "class":
+                # keep each image in its rarest class
+                sizes = np.diff(offsets)
+                group_of = np.repeat(np.arange(sizes.shape[0]), sizes)
+                order = np.lexsort((sizes[group_of], members))
+                first = np.ones(order.shape[0], dtype=bool)
+                first[1:] = members[order][1:] != members[order][:-1]
+                keep = np.sort(order[first])
+                offsets = np.searchsorted(keep, offsets)
+                members = members[keep]
+            self.__strata[by] = (offsets, members)
+        return self.__strata[by]
+
+
+def _allocate(sizes, k: int, rare_weight: float = 0.0):
+    """ split k samples across groups by weight size ** (1 - rare_weight), without going over the group sizes.
+
+    :param sizes: numpy.ndarray of group sizes
+    :return: numpy.ndarray of samples per group
+    """
+    counts = np.zeros(sizes.shape[0], dtype=np.int64)
+    weights = np.where(sizes > 0, np.power(sizes.astype(float), 1.0 - rare_weight), 0.0)
+    remaining = min(int(k), int(sizes.sum()))
+    while remaining > 0:
+        open_groups = counts < sizes
+        share = remaining * weights * open_groups / weights[open_groups].sum()
+        add = np.minimum(np.floor(share).astype(np.int64), sizes - counts)
+        left = remaining - int(add.sum())
+        if left > 0:
+            # hand out the rest by the largest fractional shares
+            fraction = np.where(open_groups & (counts + add < sizes), share - np.floor(share), -1.0)
+            extra = np.argsort(-fraction, kind="stable")[:left]
+            add[extra[fraction[extra] >= 0]] += 1
+        counts += add
+        remaining -= int(add.sum())
+    return counts
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+from contextlib import closing
+import logging
+
+# set the logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+""":cvar
+index tables
+    - dirs : path [str, absolute], parent [str], mtime_ns [int], n_files [int]
+    - files : dir [str], name [str]
+    - meta : key [str], value [str]
+"""
+
+INDEX_VERSION = "1"
+
+
+class ScanIndex:
+    """ on-disk index of a scanned image dataset, keyed by directory mtimes. """
+
+    def __init__(self, path: str, extensions):
+        """
+        :param path: location of the sqlite index file.
+        :param extensions: file extensions the scan keeps, the index is dropped if they change.
+        """
+        self.path = path
+        self.extensions = ",".join(sorted(extensions))
+
+    @staticmethod
+    def default_path(dataset_path: str):
+        """
+        :param dataset_path: directory of the dataset.
+        :return: index file location next to the dataset folder, <parent>/.<folder>.imgann.sqlite
+        """
+        dataset_path = os.path.abspath(dataset_path)
+        parent, folder = os.path.split(dataset_path.rstrip(os.sep))
+        return os.path.join(parent, f".{folder}.imgann.sqlite")
+
+    def load(self):
+        """ read the saved index.
+
+        :return: {dir path : (mtime_ns, [(name, path), ..], [sub dir paths], n_files)}
+        """
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with closing(sqlite3.connect(self.path)) as con:
+                meta = dict(con.execute("SELECT key, value FROM meta"))
+                if meta.get("version") != INDEX_VERSION or meta.get("extensions") != self.extensions:
+                    logger.info(f"\nindex <{self.path}> is out of date, the dataset will be rescanned.")
+                    return {}
+                entries = {}
+                sub_dirs = {}
+                for path, parent, mtime_ns, n_files in con.execute("SELECT path, parent, mtime_ns, n_files FROM dirs"):
+                    entries[path] = (mtime_ns, n_files)
+                    sub_dirs.setdefault(parent, []).append(path)
+                files = {}
+                for folder, name in con.execute("SELECT dir, name FROM files"):
+                    files.setdefault(folder, []).append((name, folder + os.sep + name))
+        except sqlite3.Error as error:
+            logger.warning(f"\nWARNING: could not read index <{self.path}> : {error}")
+            return {}
+        return {path: (mtime_ns, files.get(path, []), sub_dirs.get(path, []), n_files)
+                for path, (mtime_ns, n_files) in entries.items()}
+
+    def save(self, changed: dict, removed):
+        """ write the rescanned directories into the index.
+
+        :param changed: {dir path : (mtime_ns, [(name, path), ..], [sub dir paths], n_files)} of rescanned dirs
+        :param removed: dir paths that no longer exist in the dataset
+        :return: None
+        """
+        try:
+            with closing(sqlite3.connect(self.path)) as con, con:
+                self.__createTables(con)
+                stale = [(p,) for p in list(changed) + list(removed)]
+                con.executemany("DELETE FROM dirs WHERE path = ?", stale)
+                con.executemany("DELETE FROM files WHERE dir = ?", stale)
+                con.executemany("INSERT INTO dirs VALUES (?, ?, ?, ?)",
+                                [(p, os.path.dirname(p), e[0], e[3]) for p, e in changed.items()])
+                con.executemany("INSERT INTO files VALUES (?, ?)",
+                                [(p, name) for p, e in changed.items() for name, _ in e[1]])
+                con.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                [("version", INDEX_VERSION), ("extensions", self.extensions)])
+        except sqlite3.Error as error:
+            logger.warning(f"\nWARNING: could not save index <{self.path}> : {error}")
+
+    @staticmethod
+    def __createTables(con):
+        con.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER, n_files INTEGER)")
+        con.execute("CREATE TABLE IF NOT EXISTS files (dir TEXT, name TEXT)")
+        con.execute("CREATE INDEX IF NOT EXISTS files_dir ON files (dir)")
+        con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
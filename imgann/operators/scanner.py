@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# set the logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from .scanindex import ScanIndex
+
+""":cvar
+scan record format
+    - name : str
+    - folder : str (name of the parent folder)
+    - path : str (absolute path to the file)
+"""
+
+IMAGE_TYPES = ("png", "jpg", "jpeg")
+# directories modified this close to the scan start are not trusted from the index on the next scan, a file added in
+# the same mtime tick (2s on FAT, 1s on some NFS servers) would not change the directory mtime
+RACY_WINDOW_NS = 2 * 10 ** 9
+
+
+class DirScanner:
+    """ single pass, multi-threaded image directory scanner. """
+
+    def __init__(self, max_workers: int = None, extensions=IMAGE_TYPES, index_path: str = None):
+        """
+        :param max_workers: number of threads used to list the directories, defaults to min(32, cpu_count + 4)
+        :param extensions: file extensions (lower case, without the dot) to keep in the scan.
+        :param index_path: optional sqlite index file. directories with an unchanged mtime are read from it
+                           instead of being listed again, and the index is refreshed after each scan. directories
+                           modified within RACY_WINDOW_NS of a scan are always listed again by the next one.
+        """
+        self.max_workers = max_workers if max_workers else min(32, (os.cpu_count() or 1) + 4)
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.index = ScanIndex(index_path, self.extensions) if index_path else None
+        self.stats = {}
+        self.__cache = {}
+
+    def scan(self, root: str):
+        """ walk the given directory once and yield the image files in it.
+
+        :param root: relative or absolute path to the dataset folder.
+        :return: generator of (name, folder, path) tuples
+        """
+        root = os.path.abspath(root)
+        self.__cache = self.index.load() if self.index else {}
+        changed, visited = {}, set()
+        n_dirs, n_files = 0, 0
+        start = time.perf_counter()
+        racy_ns = time.time_ns() - RACY_WINDOW_NS
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self.__listDir, root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, mtime_ns, files, sub_dirs, n_entries, reused = future.result()
+                    visited.add(path)
+                    if not reused:
+                        # a racy directory is saved without its mtime, so it is listed again by the next scan
+                        racy = mtime_ns is not None and mtime_ns >= racy_ns
+                        changed[path] = (None if racy else mtime_ns, files, sub_dirs, n_entries)
+                    n_dirs += 1
+                    n_files += n_entries
+                    for sub_dir in sub_dirs:
+                        pending.add(executor.submit(self.__listDir, sub_dir))
+                    folder = os.path.basename(path)
+                    for name, file_path in files:
+                        yield name, folder, file_path
+        if self.index and (changed or len(visited) != len(self.__cache)):
+            self.index.save(changed, set(self.__cache) - visited)
+        self.__report(root, n_dirs, n_files, len(visited) - len(changed), time.perf_counter() - start)
+        self.__cache = {}
+
+    def __listDir(self, path: str):
+        """ list a single directory, or take it from the index if it has not changed since the last scan.
+
+        :param path: absolute path to the directory
+        :return: (path, mtime_ns, [(name, path), ..] of image files, [sub directory paths], number of files, reused)
+        """
+        files, sub_dirs = [], []
+        n_entries = 0
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = self.__cache.get(path)
+            if cached and cached[0] == mtime_ns:
+                return (path,) + cached + (True,)
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_dirs.append(entry.path)
+                    elif entry.is_file():
+                        n_entries += 1
+                        if entry.name.rsplit(".", 1)[-1].lower() in self.extensions:
+                            files.append((entry.name, entry.path))
+        except OSError as error:
+            logger.warning(f"\nWARNING: could not read directory <{path}> : {error}")
+            mtime_ns = None
+        return path, mtime_ns, files, sub_dirs, n_entries, False
+
+    def __report(self, root, n_dirs, n_files, n_reused, elapsed):
+        """ log and save the throughput of the last scan. """
+        elapsed = max(elapsed, 1e-9)
+        self.stats = {"directories": n_dirs,
+                      "reused directories": n_reused,
+                      "files": n_files,
+                      "seconds": elapsed,
+                      "directories/sec": n_dirs / elapsed,
+                      "files/sec": n_files / elapsed}
+        logger.info(f"\nscanned <{root}> : {n_dirs} directories ({n_reused} from index), {n_files} files in {elapsed:.2f}s "
+                    f"({self.stats['directories/sec']:.0f} dirs/sec, {self.stats['files/sec']:.0f} files/sec)")
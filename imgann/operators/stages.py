@@ -0,0 +1,260 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import io
+import sys
+import json
+import time
+import inspect
+import logging
+import threading
+import functools
+import tracemalloc
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# setup logger
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+""":cvar
+stage record :
+    - calls : int, number of times the stage ran
+    - wall_seconds : float
+    - cpu_seconds : float, process cpu time, includes the other threads
+    - items : int, rows / files handled by the stage, generators count the yielded items
+    - peak_rss_mb : float, process memory high-water mark when the stage ended (not on Windows)
+    - traced_peak_mb : float, peak python allocations during the stage, profile mode only
+"""
+
+# instrumentation settings, set with configure()
+_settings = {"sink": None, "profile": False}
+# timer of the running conversion, shared with the writer threads
+_active = {"timer": None}
+
+
+def configure(sink=None, profile: bool = False):
+    """ turn the per stage instrumentation of the conversions on or off.
+
+    :param sink: where the reports go, None to turn it off :
+        - "log" : logged as a table
+        - path ending with .json : report saved as JSON, the cProfile stats next to it as <path>.prof
+        - callable : called with the report dictionary
+    :param profile: also run cProfile and tracemalloc, much slower
+    :return: None
+    """
+    _settings["sink"] = sink
+    _settings["profile"] = profile
+
+
+def conversion(func):
+    """ decorator of the Convertor methods, records their stages when the instrumentation is on. """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _settings["sink"] is None or _active["timer"] is not None:
+            return func(*args, **kwargs)
+        with StageTimer(func.__name__, _settings["profile"]) as timer:
+            result = func(*args, **kwargs)
+        timer.emit(_settings["sink"])
+        return result
+    return wrapper
+
+
+def timed(func=None, count=None):
+    """ decorator of the operator methods, records a stage named <Class>.<method>.
+
+    :param count: function(owner, result) giving the number of items, defaults to the rows of the returned
+     DataFrame / dict of DataFrames, or 1. generators count the yielded items.
+    """
+    if func is None:
+        return lambda f: timed(f, count)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = _active["timer"]
+        if timer is None:
+            return func(*args, **kwargs)
+        owner = args[0]
+        cls_name = owner.__name__ if inspect.isclass(owner) else type(owner).__name__
+        name = f"{cls_name}.{func.__name__.lstrip('_')}"
+        with timer.stage(name) as record:
+            result = func(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return timer.wrap_generator(name, result)
+            record["items"] = count(owner, result) if count is not None else _countItems(result)
+        return result
+    return wrapper
+
+
+def extracted(operator, result):
+    """ item count of the extract stages, the annotation rows of the operator. """
+    return int(operator.annotations.shape[0])
+
+
+def _countItems(obj):
+    """
+    :return: number of rows of a DataFrame, dict of DataFrames or ImgData, 1 otherwise
+    """
+    if hasattr(obj, "shape"):
+        return int(obj.shape[0])
+    if isinstance(obj, dict):
+        return sum(_countItems(v) for v in obj.values())
+    if hasattr(obj, "dataset") and hasattr(obj.dataset, "shape"):
+        return int(obj.dataset.shape[0])
+    return 1
+
+
+class StageTimer:
+    """ wall time, cpu time, memory and item counts of the stages of a single conversion """
+
+    def __init__(self, name: str, profile: bool = False):
+        """
+        :param name: conversion name, i.e. voc2coco
+        :param profile: run cProfile and tracemalloc during the conversion
+        """
+        self.name = name
+        self.profile = profile
+        self.stages = {}
+        self.profiler = None
+        self.total = {}
+        self.__lock = threading.Lock()
+        self.__owner = None
+        self.__stack = []
+        self.__start = None
+
+    def __enter__(self):
+        _active["timer"] = self
+        self.__owner = threading.get_ident()
+        if self.profile:
+            tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.__start = (time.perf_counter(), time.process_time())
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.total = {"wall_seconds": time.perf_counter() - self.__start[0],
+                      "cpu_seconds": time.process_time() - self.__start[1],
+                      "peak_rss_mb": _peakRss()}
+        if self.profile:
+            self.profiler.disable()
+            self.total["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        _active["timer"] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """ record the enclosed code as a stage, nested stages of the conversion thread are named parent/child.
+
+        :param name: stage name
+        :return: record dictionary, "items" can be set in the block
+        """
+        main_thread = threading.get_ident() == self.__owner
+        if main_thread and self.__stack:
+            name = self.__stack[-1][0] + "/" + name
+        record = {"items": 0}
+        traced = self.profile and main_thread and hasattr(tracemalloc, "reset_peak")
+        if traced:
+            self.__foldPeak()
+            tracemalloc.reset_peak()
+        if main_thread:
+            self.__stack.append([name, 0])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = time.process_time() - cpu
+            if main_thread:
+                _, child_peak = self.__stack.pop()
+                if traced:
+                    record["traced_peak_mb"] = max(child_peak, tracemalloc.get_traced_memory()[1]) / 2 ** 20
+                    if self.__stack:
+                        self.__stack[-1][1] = max(self.__stack[-1][1], int(record["traced_peak_mb"] * 2 ** 20))
+                    tracemalloc.reset_peak()
+            self.__add(name, record)
+
+    def wrap_generator(self, name: str, gen):
+        """ time a generator while it is consumed, the items are the yielded values.
+
+        :param name: stage name
+        :param gen: generator returned by a timed method
+        :return: generator yielding the same values
+        """
+        record = {"calls": 0, "items": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+        try:
+            while True:
+                wall, cpu = time.perf_counter(), time.process_time()
+                try:
+                    value = next(gen)
+                except StopIteration:
+                    break
+                finally:
+                    record["wall_seconds"] += time.perf_counter() - wall
+                    record["cpu_seconds"] += time.process_time() - cpu
+                record["items"] += 1
+                yield value
+        finally:
+            self.__add(name, record)
+
+    def report(self):
+        """
+        :return: {"conversion" : name, "total" : {..}, "stages" : {stage name : stage record}}
+        """
+        return {"conversion": self.name, "total": self.total, "stages": self.stages}
+
+    def emit(self, sink):
+        """ send the report to a sink, see configure(). """
+        report = self.report()
+        if callable(sink):
+            sink(report)
+        elif isinstance(sink, str) and sink.endswith(".json"):
+            with open(sink, "w") as fp:
+                json.dump(report, fp, indent=2)
+            if self.profiler is not None:
+                self.profiler.dump_stats(sink + ".prof")
+        else:
+            lines = [f"{self.name} : {self.total['wall_seconds']:.3f}s wall, {self.total['cpu_seconds']:.3f}s cpu"]
+            for name, rec in self.stages.items():
+                memory = f"{rec['peak_rss_mb']:9.1f} MB" if rec.get("peak_rss_mb") is not None else ""
+                lines.append(f"  {name:<40} {rec['calls']:7d} calls {rec['wall_seconds']:9.3f}s "
+                             f"{rec['cpu_seconds']:9.3f}s cpu {rec['items']:10d} items {memory}")
+            logger.info("\n" + "\n".join(lines))
+            if self.profiler is not None:
+                stream = io.StringIO()
+                pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(25)
+                logger.info("\n" + stream.getvalue())
+
+    def __foldPeak(self):
+        """ keep the allocation peak reached so far in the parent stage before it is reset for a child. """
+        if self.__stack:
+            self.__stack[-1][1] = max(self.__stack[-1][1], tracemalloc.get_traced_memory()[1])
+
+    def __add(self, name: str, record: dict):
+        record["peak_rss_mb"] = _peakRss()
+        with self.__lock:
+            total = self.stages.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "items": 0})
+            total["calls"] += record.pop("calls", 1)
+            for key in ["wall_seconds", "cpu_seconds", "items"]:
+                total[key] += record.get(key, 0)
+            for key in ["peak_rss_mb", "traced_peak_mb"]:
+                if record.get(key) is not None:
+                    total[key] = max(total.get(key, 0), record[key])
+
+
+def _peakRss():
+    """
+    :return: process memory high-water mark in MB, None when the resource module is not available
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
@@ -3,14 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC
+import io
 import os
-import pathlib 
 import sys 
 import logging
 from unicodedata import name 
+import numpy as np
 import pandas as pd 
-from pathlib import Path
-import PIL 
+from concurrent.futures import ThreadPoolExecutor
 
 # setup logger
 logging.basicConfig()
@@ -18,6 +18,10 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 from .operator import IOperator
+from .stages import timed, extracted
+from .imgsize import SizeProber
+from .metacache import MetadataCache
+from .scanner import DirScanner, IMAGE_TYPES
 
 class Yolo(IOperator, ABC):
     """ Instance Objec for YOLO annotation format"""
@@ -26,21 +30,23 @@ class Yolo(IOperator, ABC):
         super().__init__(dataset)
         self._dataset = dataset 
 
-    def extract(self, path:str):
+    @timed(count=extracted)
+    def extract(self, path:str, metadata_cache=False):
         """extract data from .txt annotation files and update super attributes
 
         Args:
             path (str): root path for the all annotation & image files
+            metadata_cache (bool | str, optional): read the image sizes through the MetadataCache, True for its default location or a path to the sqlite file. Defaults to False, the headers are probed without writing anything.
         """
-        image_paths, image_files = self.__getAllPaths(path, ['png', 'jpg', 'jpeg'])
-        image_df = self.__getImageData(image_paths)
+        image_paths, ann_paths = self.__getAllPaths(path)
+        image_df = self.__getImageData(image_paths, metadata_cache)
         self.__updateDataset(image_df)
 
-        ann_paths, ann_files = self.__getAllPaths(path, '*.txt')
-        name_dict = dict(zip(['.'.join(i.split('.')[:-1]) for i in image_df['name'].values], image_df.loc[:, ['image_id', 'width', 'height']].values))
+        name_dict = dict(zip([os.path.splitext(i)[0] for i in image_df['name'].values], image_df.loc[:, ['image_id', 'width', 'height']].values))
         ann_df = self.__getAnnData(ann_paths, name_dict)
         self.__DFRefiner(ann_df)
 
+    @timed
     def archive(self, location: str, data):
         """save Yolo Annotated .txt file in the given location
 
@@ -55,14 +61,15 @@ class Yolo(IOperator, ABC):
             logger.exception(error)
             sys.exit(1)
 
+    @timed
     def translate(self):
         """translate from common format to .txt compatible bbox format
 
         Yields:
             List[List, str]: list of all a image related bounding boxes data and image name
         """
-        for _, r in self._dataset.iterrows():
-            ann_list = self.__filterImgObj(r['image_id'])
+        records = self._dataset.to_dict('records')
+        for r, ann_list in zip(records, self.iter_image_annotations([r['image_id'] for r in records])):
             data = self.__txtFormatter(ann_list, r['width'], r['height'])
             if data:
                 yield data, r['name']
@@ -90,15 +97,6 @@ class Yolo(IOperator, ABC):
         ann_str = ''.join(ann_str_list)
         return ann_str 
 
-    def __filterImgObj(self, img_id):
-        """ get row for specific image_id.
-
-        :param img_id: [int] image_id in the self.annotations
-        :return: all the row that carry given image_id as a list.
-        """
-        filtered_list = self.annotations.loc[self.annotations["image_id"] == img_id, :].values.tolist()
-        return filtered_list
-
     def __DFRefiner(self, ann_df):
         """
         create pd.DataFrame with columns of [ "obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max" ] and
@@ -106,21 +104,20 @@ class Yolo(IOperator, ABC):
         :param ann_df: pd.Dataframe with columns of [ 'x_min', 'y_min', 'x_max', 'y_max', 'class', 'image_id' ]
         :return: None
         """
-        ann_df = ann_df.copy()
-
-        cats = list(ann_df.loc[:, "class"].unique())
+        codes, cats = pd.factorize(ann_df["class"])
+        cats = list(cats)
         n_cats = len(cats)
-        cat_series = pd.Series(range(1, n_cats + 1), index=cats)
 
-        ann_df["class_id"] = ann_df["class"].map(cat_series)
-        ann_df["obj_id"] = range(1,ann_df.shape[0]+1)
-        nw_df = ann_df.loc[:, ["obj_id", "image_id", "class_id", "x_min", "y_min", "x_max", "y_max"]]
+        nw_df = pd.DataFrame({"obj_id": range(1, ann_df.shape[0] + 1), "image_id": ann_df["image_id"],
+                              "class_id": codes + 1, "x_min": ann_df["x_min"], "y_min": ann_df["y_min"],
+                              "x_max": ann_df["x_max"], "y_max": ann_df["y_max"]})
 
         super(Yolo, self).set_annotations(nw_df)
         super(Yolo, self).set_classes(dict(zip(range(1,n_cats+1),cats)))
 
+    @timed
     def __getAnnData(self, ann_paths, name_dict):
-        """build annotation data for the dataset
+        """build annotation data for the dataset, all the .txt files are read on a thread pool and parsed at once
 
         Args:
             ann_paths (List[str]): all annotation file paths
@@ -129,53 +126,77 @@ class Yolo(IOperator, ABC):
         Returns:
             pd.DataFrame: data-frame with columns of ['x_min', 'y_min', 'x_max', 'y_max', 'class', 'image_id']
         """
-        image_anns = []
-        for p in ann_paths:
-            fname = '.'.join(p.split('\\')[-1].split('.')[:-1])
-            image_id, iw, ih = name_dict[fname]
-            obj_list = self.__extractAnn(p, iw, ih)
-            obj_list = [i+[image_id] for i in obj_list]
-            image_anns.extend(obj_list)
-        ann_df = pd.DataFrame.from_records(image_anns,columns=['x_min', 'y_min', 'x_max', 'y_max', 'class', 'image_id'])
+        fnames = [os.path.splitext(os.path.basename(p))[0] for p in ann_paths]
+        unknown = [p for p, f in zip(ann_paths, fnames) if f not in name_dict]
+        if unknown:
+            logger.warning(f"\nWARNING: {len(unknown)} annotation files have no matching image, e.g. {unknown[0]}")
+            ann_paths = [p for p, f in zip(ann_paths, fnames) if f in name_dict]
+            fnames = [f for f in fnames if f in name_dict]
+
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as executor:
+            contents = [c.strip() for c in executor.map(self.__readFile, ann_paths)]
+        # blank lines are kept as NaN rows, so the row count of every file is its number of lines
+        n_rows = np.array([c.count(b'\n') + 1 if c else 0 for c in contents])
+        image_info = np.array([name_dict[f] for f in fnames]).reshape(-1, 3)
+        row_info = np.repeat(image_info, n_rows, axis=0)
+
+        columns = ['label', 'x', 'y', 'width', 'height']
+        if n_rows.sum():
+            try:
+                # the extra column catches lines with a sixth field
+                raw_df = pd.read_csv(io.BytesIO(b'\n'.join(c for c in contents if c)), sep=r'\s+', header=None,
+                                     names=columns + ['extra'], skip_blank_lines=False, float_precision='round_trip')
+            except ValueError as error:
+                logger.error(f"\n ERROR : malformed .txt annotation files : {error}")
+                sys.exit(1)
+        else:
+            raw_df = pd.DataFrame(columns=columns + ['extra'], dtype=float)
+        valid = raw_df.notna().any(axis=1).to_numpy()
+        for col in columns:
+            if not pd.api.types.is_numeric_dtype(raw_df[col]):
+                raw_df[col] = pd.to_numeric(raw_df[col], errors='coerce')
+        malformed = (valid & raw_df[columns].isna().any(axis=1).to_numpy()) | raw_df['extra'].notna().to_numpy()
+        if malformed.any():
+            bad_file = ann_paths[np.repeat(np.arange(len(ann_paths)), n_rows)[np.argmax(malformed)]]
+            logger.error(f"\n ERROR : {int(malformed.sum())} lines are not [class x y width height], e.g. in <{bad_file}>.")
+            sys.exit(1)
+        raw_df, row_info = raw_df.loc[valid, :], row_info[valid]
+
+        image_id, iw, ih = row_info[:, 0], row_info[:, 1], row_info[:, 2]
+        boxes = self.__normalized2KITTI(np.trunc(iw * raw_df['x'].to_numpy()), np.trunc(ih * raw_df['y'].to_numpy()),
+                                        np.trunc(iw * raw_df['width'].to_numpy()), np.trunc(ih * raw_df['height'].to_numpy()))
+        codes, labels = pd.factorize(raw_df['label'])
+        class_names = np.array([str(float(l)) for l in labels], dtype=object)
+        ann_df = pd.DataFrame(dict(zip(['x_min', 'y_min', 'x_max', 'y_max'], boxes)))
+        ann_df['class'] = class_names[codes]
+        ann_df['image_id'] = image_id
         return ann_df
 
-    def __extractAnn(self, fpath, w, h):
-        """extract image annotation data from the .txt file
-
-        Args:
-            fpath (str): .txt file relative path
-            w (int): image original width
-            h (int): image original height
-
-        Returns:
-            List[List]: image annotation data list with [x_min, y_min, x_max, y_max, label]
+    @staticmethod
+    def __readFile(fpath):
         """
-        obj_list = []
-        with open(fpath, 'r') as pf:
-            for l in pf.readlines():
-                label, x_o, y_o, bw, bh = [float(i) for i in l.rstrip('\n').split(' ')]
-                bbox_val = self.__normalized2KITTI([int(w*x_o), int(h*y_o), int(w*bw), int(h*bh)])+[str(label)]
-                obj_list.append(bbox_val)
-        return obj_list
-
-
-    def __normalized2KITTI(self, box, center=True):
+        :param fpath: .txt file path
+        :return: file content in bytes
         """
+        with open(fpath, 'rb') as pf:
+            return pf.read()
+
+    def __normalized2KITTI(self, o_x, o_y, o_width, o_height, center=True):
+        """ vectorized over numpy arrays of boxes.
 
-        :param box: [X, Y, width, height]
-        :return: [(xmin, ymin), (xmax, ymax)]
+        :param o_x, o_y, o_width, o_height: [X, Y, width, height] columns in pixels
+        :return: [xmin, ymin, xmax, ymax] columns
         """
-        o_x, o_y, o_width, o_height = box
-        if center:  
-            xmin = int(o_x - o_width / 2)
-            ymin = int(o_y - o_height / 2)
-            xmax = int(o_x + o_width / 2)
-            ymax = int(o_y + o_height / 2)
+        if center:
+            xmin = np.trunc(o_x - o_width / 2).astype(np.int64)
+            ymin = np.trunc(o_y - o_height / 2).astype(np.int64)
+            xmax = np.trunc(o_x + o_width / 2).astype(np.int64)
+            ymax = np.trunc(o_y + o_height / 2).astype(np.int64)
         else:
-            xmin = o_x
-            ymin = o_y
-            xmax = int(o_x + o_width)
-            ymax = int(o_y + o_height)
+            xmin = o_x.astype(np.int64)
+            ymin = o_y.astype(np.int64)
+            xmax = np.trunc(o_x + o_width).astype(np.int64)
+            ymax = np.trunc(o_y + o_height).astype(np.int64)
         return [xmin, ymin, xmax, ymax]
 
     def __KITTI2normilized(self, xmin, ymin, xmax, ymax, center=True):
@@ -205,38 +226,52 @@ class Yolo(IOperator, ABC):
         :param image_df: image attributes DataFrame
         :return: merge current self.__dataset with image_df.
         """
-        partial_df = image_df.copy()
-        res_df = pd.merge(self._dataset, partial_df, on="name")
+        dataset = self._dataset.drop(columns=["width", "height"], errors="ignore")
+        res_df = pd.merge(dataset, image_df, on="name")
         super(Yolo, self).set_dataset(res_df)
         
-    def __getImageData(self, image_plist):
-        """extract image size data
+    @timed
+    def __getImageData(self, image_plist, metadata_cache=False):
+        """extract image size data from the image headers
 
         Args:
             image_plist (str): relative path to image files
+            metadata_cache (bool | str, optional): see extract()
 
         Returns:
-            pd.DataFrame: data-frame with columns of [name, width, height, image_id]
-        """
-        image_name, image_width, image_height = [], [], []
-        for p in image_plist:
-            image_name.append(p.split('\\')[-1])
-            im = PIL.Image.open(p)
-            w, h = im.size
-            image_height.append(h)
-            image_width.append(w)
+            pd.DataFrame: data-frame with columns of [name, width, height, image_id], images without a size are left out
+        """
+        if metadata_cache:
+            sizes = MetadataCache(metadata_cache if isinstance(metadata_cache, str) else None).lookup(image_plist)
+        else:
+            sizes = SizeProber().probe_all(image_plist)
+        # the cache gives (None, None, ..) for the images it could not read
+        readable = [info[0] is not None and info[1] is not None for info in sizes]
+        if not all(readable):
+            unreadable = [p for p, ok in zip(image_plist, readable) if not ok]
+            logger.warning(f"\nWARNING: {len(unreadable)} images could not be read and are skipped, e.g. {unreadable[0]}")
+            sizes = [info for info, ok in zip(sizes, readable) if ok]
+            image_plist = [p for p, ok in zip(image_plist, readable) if ok]
+        image_name = [os.path.basename(p) for p in image_plist]
+        image_width = [info[0] for info in sizes]
+        image_height = [info[1] for info in sizes]
         image_df = pd.DataFrame({'name': image_name, 'width': image_width, 'height': image_height, 'image_id': list(range(len(image_height)))})
         return image_df
 
 
-    def __getAllPaths(self, root_path, extensions):
-        if isinstance(extensions, str):
-            file_list = [path.name for path in Path(root_path).rglob(extensions)]
-            path_list = [str(path) for path in Path(root_path).rglob(extensions)]
-        else:
-            file_list, path_list = [], []
-            for e in extensions:
-                file_list.extend([path.name for path in Path(root_path).rglob(f'*.{e}')])
-                path_list.extend([str(path) for path in Path(root_path).rglob(f'*.{e}')])
+    def __getAllPaths(self, root_path):
+        """walk the root folder once and split the files into images and labels by their extension
 
-        return path_list, file_list
\ No newline at end of file
+        Args:
+            root_path (str): root path for the all annotation & image files
+
+        Returns:
+            Tuple[List[str], List[str]]: sorted image file paths and .txt file paths
+        """
+        image_paths, ann_paths = [], []
+        for name, _, fpath in DirScanner(extensions=IMAGE_TYPES + ('txt',)).scan(root_path):
+            if name.rsplit('.', 1)[-1].lower() == 'txt':
+                ann_paths.append(fpath)
+            else:
+                image_paths.append(fpath)
+        return sorted(image_paths), sorted(ann_paths)
@@ -6,12 +6,16 @@ import sys
 from typing import List
 
 from .operators.imgdata import ImgData
-from .operators import coco, csv, pascalvoc, yolo
+from .operators import coco, csv, parquet, pascalvoc, yolo, preview
+from .operators.lazy import LazyModule
 
 # setup logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# only needed to show the contact sheets on screen
+plt = LazyModule("matplotlib.pyplot")
+
 """
 ### obj_lis : attributes ###
 {
@@ -41,56 +45,100 @@ class Sample:
                      ann_type: str = 'coco',
                      center: bool = True,
                      image_shape: List[int] = [300, 300],
-                     seed: int = 0):
-        """render a set of random images from dataset with annotations.
+                     seed: int = 0,
+                     cache: bool = False,
+                     output: str = None,
+                     columns: int = 5,
+                     rows: int = 5,
+                     n_workers: int = 4,
+                     per_class: int = None,
+                     stratify: str = None,
+                     rare_weight: float = 0.0):
+        """render a set of random images from dataset with annotations, tiled into contact sheets.
 
         Args:
             data_path (str): relative path current folder, or absolute path to the main folder of the image dataset
             ann_path (str): relative path current folder, or absolute path to the main folder of the annotated file
             num_of_samples (int, optional): number of samples to show. Defaults to 5.
-            ann_type (str, optional): annotation type of the file in 'ann_path', from one of type from ['coco', 'voc', 'csv']. Defaults to 'coco'.
+            ann_type (str, optional): annotation type of the file in 'ann_path', from one of type from ['coco', 'voc', 'csv', 'yolo', 'parquet']. Defaults to 'coco'.
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
-            image_shape (List[int], optional): output image size in pixels. Defaults to [300, 300].
+            image_shape (List[int], optional): size of each image in the contact sheets in pixels. Defaults to [300, 300].
             seed (int, optional): set random-state for consintent outputs, else function given different set at each run. Defaults to 0.
-        """
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            output (str, optional): folder to save the contact sheets in as sheet_000.png, .. without showing them, works without a display. Defaults to None, shows each sheet in a matplotlib figure.
+            columns (int, optional): number of images in a row of a contact sheet. Defaults to 5.
+            rows (int, optional): number of rows in a contact sheet, the rest of the samples go to the next sheets. Defaults to 5.
+            n_workers (int, optional): number of threads decoding and drawing the images. Defaults to 4.
+            per_class (int, optional): show up to this many images of every class instead of 'num_of_samples' random images. Defaults to None.
+            stratify (str, optional): 'class' or 'folder', split 'num_of_samples' across the classes (by the rarest class of each image) or the folders. Defaults to None, uniform sampling.
+            rare_weight (float, optional): with 'stratify', 0 splits in proportion to the group sizes, 1 gives every group the same number of images, values between favour the rare groups. Defaults to 0.0.
 
-        global obj
-        imgdataset = ImgData.extract(data_path)
-        if ann_type == 'coco':
-            obj = coco.COCO(imgdataset.dataset)
-        elif ann_type == 'voc':
-            obj = pascalvoc.PascalVOC(imgdataset.dataset)
-        elif ann_type == 'csv':
-            obj = csv.CSV(imgdataset.dataset)
-        elif ann_type == 'yolo':
-            obj = yolo.Yolo(imgdataset.dataset)
-        else:
-            logger.error(
-                f"\nERROR: '{ann_type}' is not a valid annotation type.")
-            sys.exit(1)
+        Returns:
+            List[str]: paths of the saved contact sheets when output is given.
+        """
 
-        if ann_type == 'coco':
-            obj.extract(ann_path, center)
+        obj = Sample.__loadOperator(data_path, ann_path, ann_type, center, cache)
+        if per_class is not None:
+            obj_list = obj.sample_balanced(per_class, seed)
+        elif stratify is not None:
+            obj_list = obj.sample_stratified(num_of_samples, stratify, rare_weight, seed)
         else:
-            obj.extract(ann_path)
-        
-        obj_list = obj.sample(num_of_samples, seed)
-        cat_dict = obj.classes
-        for img_obj in obj_list:
-            path = img_obj["path"]
-            obj_data = img_obj["bbox"]
-            cat_name = [cat_dict[j] for j in img_obj["classes"]]
-            obj.render(path, obj_data, cat_name, image_shape)
+            obj_list = obj.sample(num_of_samples, seed)
+        if output is not None:
+            paths = preview.write_contact_sheets(output, obj_list, obj.classes, image_shape, columns, rows, n_workers)
+            logger.info(f"{len(obj_list)} samples saved in {len(paths)} contact sheets at <{output}>.")
+            return paths
+
+        px = 1/plt.rcParams['figure.dpi']  # pixel in inches
+        for sheet in preview.contact_sheets(obj_list, obj.classes, image_shape, columns, rows, n_workers):
+            plt.figure(figsize=(sheet.shape[1]*px, sheet.shape[0]*px))
+            plt.imshow(sheet[:, :, ::-1])
+            plt.xticks([])
+            plt.yticks([])
+            plt.show()
         return
 
     @staticmethod
-    def describe_data(data_path: str):
+    def render_previews(data_path: str,
+                        ann_path: str,
+                        output: str,
+                        ann_type: str = 'coco',
+                        center: bool = True,
+                        max_size: int = None,
+                        n_workers: int = 1,
+                        cache: bool = False):
+        """save an annotated copy of every image in the dataset, without matplotlib or a display.
+
+        Args:
+            data_path (str): relative path current folder, or absolute path to the main folder of the image dataset
+            ann_path (str): relative path current folder, or absolute path to the main folder of the annotated file
+            output (str): folder to save the annotated images in, named <image_id>_<image file name> and encoded in the format of the image.
+            ann_type (str, optional): annotation type of the file in 'ann_path', from one of type from ['coco', 'voc', 'csv', 'yolo', 'parquet']. Defaults to 'coco'.
+            center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            max_size (int, optional): downscale the images so the longest side is at most this many pixels before drawing. Defaults to None, keeps the image size.
+            n_workers (int, optional): number of processes to decode, draw and encode the images with. Defaults to 1.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+
+        Returns:
+            List[str]: paths of the saved images.
+        """
+        obj = Sample.__loadOperator(data_path, ann_path, ann_type, center, cache)
+        paths = obj.previews(output, max_size, n_workers)
+        logger.info(f"{len(paths)} annotated images saved at <{output}>.")
+        return paths
+
+    @staticmethod
+    def describe_data(data_path: str,
+                      cache: bool = False,
+                      metadata: bool = False):
         """give a summary of a image dataset
 
         Args:
             data_path (str): absolute or relative path to image dataset main folder
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
+            metadata (bool, optional): read image sizes and formats (through the shared image metadata cache) into the summary. Defaults to False.
         """
-        img_dataset = ImgData.extract(data_path)
+        img_dataset = ImgData.extract(data_path, cache=cache, metadata=metadata)
         data_dict = img_dataset.describe()
         log_st = Sample.descFormat("image data summary", data_dict)
         logger.info("\n"+log_st)
@@ -98,33 +146,18 @@ class Sample:
 
     @staticmethod
     def describe_ann(data_path: str,
-                     ann_path: str, ann_type: str = 'coco', center: bool = True):
+                     ann_path: str, ann_type: str = 'coco', center: bool = True,
+                     cache: bool = False):
         """give summary of annotated dataset
 
         Args:
             data_path (str): absolute or relative path to image dataset main folder
             ann_path (str): absolute or relative path to image annotation file or folder
-            ann_type (str, optional): annotation type of the file in 'ann_path', from one of type from ['coco', 'voc', 'csv']. Defaults to 'coco'.
+            ann_type (str, optional): annotation type of the file in 'ann_path', from one of type from ['coco', 'voc', 'csv', 'yolo', 'parquet']. Defaults to 'coco'.
             center (bool, optional): wether in KITTI bbox contains (X_center, Y_center, ...) or (X_min, Y_min, ...). Defaults to True.
+            cache (bool, optional): keep an index of the image dataset next to its folder, so only changed folders are rescanned on later runs. Defaults to False.
         """
-        imgdataset = ImgData.extract(data_path)
-        if ann_type == 'coco':
-            obj = coco.COCO(imgdataset.dataset)
-        elif ann_type == 'voc':
-            obj = pascalvoc.PascalVOC(imgdataset.dataset)
-        elif ann_type == 'csv':
-            obj = csv.CSV(imgdataset.dataset)
-        elif ann_type == 'yolo':
-            obj = yolo.Yolo(imgdataset.dataset)
-        else:
-            logger.error(
-                f"\n ERROR : {ann_type} is not a valid annotation type.")
-            sys.exit(1)
-
-        if ann_type == 'coco':
-            obj.extract(ann_path, center)
-        else:
-            obj.extract(ann_path)
+        obj = Sample.__loadOperator(data_path, ann_path, ann_type, center, cache)
         log_data = obj.describe()
         log_st = Sample.descFormat("image annotation summary", log_data)
         logger.info("\n"+log_st)
@@ -166,6 +199,34 @@ class Sample:
         log_string += log_data
         return log_string
 
+    @staticmethod
+    def __loadOperator(data_path, ann_path, ann_type, center, cache):
+        """
+
+        :return: operator of the ann_type with the annotations in ann_path extracted.
+        """
+        imgdataset = ImgData.extract(data_path, cache=cache)
+        if ann_type == 'coco':
+            obj = coco.COCO(imgdataset.dataset)
+        elif ann_type == 'voc':
+            obj = pascalvoc.PascalVOC(imgdataset.dataset)
+        elif ann_type == 'csv':
+            obj = csv.CSV(imgdataset.dataset)
+        elif ann_type == 'yolo':
+            obj = yolo.Yolo(imgdataset.dataset)
+        elif ann_type == 'parquet':
+            obj = parquet.Parquet(imgdataset.dataset)
+        else:
+            logger.error(
+                f"\n ERROR : {ann_type} is not a valid annotation type.")
+            sys.exit(1)
+
+        if ann_type == 'coco':
+            obj.extract(ann_path, center)
+        else:
+            obj.extract(ann_path)
+        return obj
+
     @staticmethod
     def __getMax(ls):
         """
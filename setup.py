@@ -54,12 +54,13 @@ setup(
 
     python_requires='>=3.6, <4',
 
-    install_requires=['numpy', 'pandas', 'matplotlib', 'opencv-python', 'pillow'],
+    install_requires=['numpy', 'pandas', 'scipy', 'matplotlib', 'opencv-python', 'pillow'],
 
     extras_require={
         'dev': ['check-manifest',
                 'pytest>=3.7'],
         'test': ['coverage', 'unittest'],
+        'arrow': ['pyarrow'],
     },
 
     # package_data={  # Optional
@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.boxstore import BoxStore
+from imgann.operators.csv import CSV
+
+
+class TestBoxStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        dataset = pd.DataFrame({"name": ["a.png", "b.png", "c.png"], "folder": "x",
+                                "path": ["x/a.png", "x/b.png", "x/c.png"], "image_id": [1, 2, 3],
+                                "width": [10, 20, 30], "height": [10, 20, 30]})
+        self.operator = CSV(dataset)
+        self.operator.set_annotations(pd.DataFrame({"obj_id": [1, 2, 3], "image_id": [2, 1, 2], "class_id": [1, 2, 1],
+                                                    "x_min": [0, 1, 2], "y_min": [0, 1, 2], "x_max": [5, 6, 7],
+                                                    "y_max": [5, 6, 7]}))
+        self.operator.set_classes({1: "cat", 2: "dog"})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup(self):
+        store = BoxStore.write(self.tmp.name, self.operator)
+        self.assertIsInstance(store.boxes, np.memmap)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.classes, {1: "cat", 2: "dog"})
+        for image_id in [1, 2, 3, 4]:
+            np.testing.assert_array_equal(store.get_image_annotations(image_id),
+                                          self.operator.get_image_annotations(image_id))
+
+        self.operator.attach_store(store)
+        samples = self.operator.sample(3)
+        self.assertEqual(samples[1]["classes"], [1, 1])
+        self.assertEqual(samples[1]["bbox"], [[(0, 0), (5, 5)], [(2, 2), (7, 7)]])
+
+        samples = store.sample(3)
+        self.assertEqual([x["path"] for x in samples], ["x/a.png", "x/b.png", "x/c.png"])
+        self.assertEqual(samples[0]["classes"], [2])
+
+    def test_sparse_ids(self):
+        annotations = self.operator.annotations.copy()
+        annotations["image_id"] = [10 ** 12, -5, 10 ** 12]
+        self.operator.set_annotations(annotations)
+        store = BoxStore.write(self.tmp.name, self.operator)
+        self.assertEqual(store.offsets.shape, (3,))
+        self.assertEqual(store.get_image_annotations(10 ** 12)[:, 0].tolist(), [1, 3])
+        self.assertEqual(store.get_image_annotations(-5)[:, 0].tolist(), [2])
+        self.assertEqual(store.get_image_annotations(7).shape, (0, 7))
+
+        rows, bounds = self.operator.take_images([-5, 7, 10 ** 12])
+        self.operator.attach_store(store)
+        store_rows, store_bounds = self.operator.take_images([-5, 7, 10 ** 12])
+        np.testing.assert_array_equal(store_rows, rows)
+        np.testing.assert_array_equal(store_bounds, [0, 1, 1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+import unittest
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.coco import COCO
+
+
+class TestCOCOFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        names = ["a.png", "b.png", "c.png"]
+        self.dataset = pd.DataFrame({"name": names, "folder": "x", "path": [f"x/{n}" for n in names]})
+        self.data = {"images": [{"file_name": "a.png", "height": 20, "width": 30, "id": 1},
+                                {"file_name": "b.png", "height": 40, "width": 50, "id": 2}],
+                     "annotations": [{"id": 1, "image_id": 1, "category_id": 1, "bbox": [2, 3, 4, 5]},
+                                     {"id": 2, "image_id": 2, "category_id": 2, "bbox": [6, 7, 8, 9]},
+                                     {"id": 3, "image_id": 2, "category_id": 1, "bbox": [1, 1, 2, 2]}],
+                     "categories": [{"id": 1, "name": "cat"}, {"id": 2, "name": "dog"}]}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def __extract(self, data):
+        path = os.path.join(self.tmp.name, "ann.json")
+        with open(path, "w") as fp:
+            json.dump(data, fp)
+        coco = COCO(self.dataset)
+        coco.extract(path, False)
+        return coco
+
+    def test_bbox_length(self):
+        for bbox in [[], [1, 2, 3], [1, 2, 3, 4, 5]]:
+            self.data["annotations"][1]["bbox"] = bbox
+            with self.assertRaises(SystemExit):
+                self.__extract(self.data)
+
+    def test_string_image_ids(self):
+        self.data["images"][0]["id"] = "img-a"
+        self.data["images"][1]["id"] = "img-b"
+        for ann, image_id in zip(self.data["annotations"], ["img-a", "img-b", "img-b"]):
+            ann["image_id"] = image_id
+        coco = self.__extract(self.data)
+        self.assertEqual(coco.get_dataset()["image_id"].tolist(), [1, 2])
+        self.assertEqual(coco.annotations["image_id"].tolist(), [1, 2, 2])
+        self.assertEqual(coco.get_image_annotations(2)[:, 0].tolist(), [2, 3])
+
+    def test_mixed_image_ids(self):
+        # the ids switch to strings after the first image, the integer ids read before are kept
+        self.data["images"][1]["id"] = "img-b"
+        for ann in self.data["annotations"][1:]:
+            ann["image_id"] = "img-b"
+        coco = self.__extract(self.data)
+        self.assertEqual(coco.get_dataset()["image_id"].tolist(), [1, 2])
+        self.assertEqual(coco.annotations["image_id"].tolist(), [1, 2, 2])
+
+    def test_unmatched_images(self):
+        # d.png is annotated but not in the image dataset, c.png is in the dataset without an entry in the file
+        self.data["images"].append({"file_name": "d.png", "height": 10, "width": 10, "id": 3})
+        self.data["annotations"].append({"id": 4, "image_id": 3, "category_id": 2, "bbox": [1, 2, 3, 4]})
+        coco = self.__extract(self.data)
+        missing, unannotated = coco.get_unmatched_images()
+        self.assertEqual(missing[["name", "image_id"]].values.tolist(), [["d.png", 3]])
+        self.assertEqual(unannotated["name"].tolist(), ["c.png"])
+        self.assertEqual(coco.get_dataset()["name"].tolist(), ["a.png", "b.png"])
+
+    def test_all_matched_images(self):
+        self.dataset = self.dataset.iloc[:2]
+        missing, unannotated = self.__extract(self.data).get_unmatched_images()
+        self.assertEqual((missing.shape[0], unannotated.shape[0]), (0, 0))
+
+    def test_archive_structure(self):
+        coco = self.__extract(self.data)
+        dataset = coco.get_dataset()
+        dataset["width"] = dataset["width"].astype(float)
+        dataset.loc[0, "width"] = float("nan")
+        coco.set_dataset(dataset)
+
+        path = os.path.join(self.tmp.name, "out.json")
+        coco.archive(path, coco.translate(False))
+        with open(path) as fp:
+            written = json.load(fp)
+        # the structure and value types of the original json.dump writer
+        self.assertEqual(written, {
+            "annotations": [
+                {"id": 1, "image_id": 1, "category_id": 1, "area": "20", "bbox": [2, 3, 4, 5],
+                 "ignore": "0", "iscrowd": "0"},
+                {"id": 2, "image_id": 2, "category_id": 2, "area": "72", "bbox": [6, 7, 8, 9],
+                 "ignore": "0", "iscrowd": "0"},
+                {"id": 3, "image_id": 2, "category_id": 1, "area": "4", "bbox": [1, 1, 2, 2],
+                 "ignore": "0", "iscrowd": "0"}],
+            "images": [{"file_name": "a.png", "height": 20, "width": "nan", "id": 1},
+                       {"file_name": "b.png", "height": 40, "width": "50.0", "id": 2}],
+            "categories": [{"id": 1, "name": "cat", "supercategory": "none"},
+                           {"id": 2, "name": "dog", "supercategory": "none"}]})
+        self.assertEqual(coco.translate(False, records=True), written)
+        with open(path) as fp:
+            self.assertEqual(fp.read(), json.dumps(written))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.csv import CSV
+from imgann.operators.pascalvoc import PascalVOC
+
+
+class TestAnnotationSet(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = pd.DataFrame({"name": ["a.png", "b.png"], "folder": ["x", "x"], "path": ["x/a.png", "x/b.png"],
+                                     "image_id": [1, 2], "width": [10, 20], "height": [10, 20]})
+        self.annotations = pd.DataFrame({"obj_id": [1, 2, 3], "image_id": [1, 2, 2], "class_id": [1, 2, 1],
+                                         "x_min": [0, 1, 2], "y_min": [0, 1, 2], "x_max": [5, 6, 7],
+                                         "y_max": [5, 6, 7]})
+
+    def test_transfer_shares_columns(self):
+        voc_obj = PascalVOC(self.dataset)
+        voc_obj.set_annotations(self.annotations)
+        voc_obj.set_classes({1: "cat", 2: "dog"})
+
+        ann_set = voc_obj.export()
+        self.assertEqual(len(ann_set), 3)
+        csv_obj = CSV.from_annotation_set(ann_set)
+        self.assertIs(csv_obj.get_dataset(), self.dataset)
+        self.assertTrue(np.shares_memory(csv_obj.annotations["x_min"].to_numpy(), ann_set.boxes["x_min"]))
+
+        res_df = csv_obj.translate()
+        self.assertEqual(res_df["filename"].tolist(), ["a.png", "b.png", "b.png"])
+        self.assertEqual(res_df["class"].tolist(), ["cat", "dog", "cat"])
+        self.assertEqual(res_df["width"].tolist(), [10, 20, 20])
+
+    def test_image_index_invalidation(self):
+        voc_obj = PascalVOC(self.dataset)
+        voc_obj.set_annotations(self.annotations)
+        self.assertEqual(voc_obj.get_image_annotations(2)[:, 0].tolist(), [2, 3])
+        self.assertEqual(voc_obj.get_image_annotations(3).shape[0], 0)
+
+        voc_obj.set_annotations(self.annotations.assign(image_id=[2, 1, 1]))
+        self.assertEqual(voc_obj.get_image_annotations(2)[:, 0].tolist(), [1])
+        self.assertEqual(voc_obj.get_image_annotations(1)[:, 0].tolist(), [2, 3])
+
+    def test_image_index_gathers(self):
+        voc_obj = PascalVOC(self.dataset)
+        voc_obj.set_annotations(self.annotations)
+        columns = voc_obj.index_annotations()[0]
+        # the index keeps views of the annotation columns, not a sorted copy of the rows
+        self.assertTrue(np.shares_memory(columns[3], voc_obj.annotations["x_min"].to_numpy()))
+        rows = list(voc_obj.iter_image_annotations([2, 3, 1], chunk_size=2))
+        self.assertEqual([[r[0] for r in image_rows] for image_rows in rows], [[2, 3], [], [1]])
+        self.assertEqual(rows[0], voc_obj.get_image_annotations(2).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
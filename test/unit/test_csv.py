@@ -0,0 +1,74 @@
+import os
+import filecmp
+import tempfile
+import unittest
+import logging
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.csv import CSV
+
+
+class TestCSVChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        names = [f"{i}.png" for i in range(5)]
+        self.dataset = pd.DataFrame({"name": names, "folder": "x", "path": [f"x/{n}" for n in names]})
+        rows = [(names[i % 5], 100 + i % 5, 50, ["cat", "dog", "bird"][i % 3], i, i, i + 10, i + 20)
+                for i in range(13)]
+        self.ann_path = os.path.join(self.tmp.name, "ann.csv")
+        pd.DataFrame(rows, columns=["filename", "width", "height", "class", "xmin", "ymin", "xmax", "ymax"]) \
+            .to_csv(self.ann_path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunked_round_trip(self):
+        full = CSV(self.dataset)
+        full.extract(self.ann_path)
+        full_path = os.path.join(self.tmp.name, "full.csv")
+        full.archive(full_path, full.translate())
+
+        for chunk_size in [1, 4, 100]:
+            chunked = CSV(self.dataset)
+            chunked.extract(self.ann_path, chunk_size=chunk_size)
+            pd.testing.assert_frame_equal(chunked.annotations, full.annotations.reset_index(drop=True))
+            pd.testing.assert_frame_equal(chunked.get_dataset(), full.get_dataset())
+            self.assertEqual(chunked.classes, full.classes)
+
+            chunk_path = os.path.join(self.tmp.name, f"chunked_{chunk_size}.csv")
+            chunked.archive(chunk_path, chunked.translate(chunk_size=chunk_size))
+            self.assertTrue(filecmp.cmp(full_path, chunk_path, shallow=False))
+            self.assertTrue(filecmp.cmp(self.ann_path, chunk_path, shallow=False))
+
+    def test_multilabel(self):
+        csv_obj = CSV(self.dataset)
+        ml = csv_obj.to_multilabel(self.ann_path)
+        self.assertTrue(sparse.issparse(ml.matrix))
+        ml_df = ml.to_frame()
+        self.assertEqual(list(ml_df.columns), ["filename", "bird", "cat", "dog"])
+        self.assertEqual(ml_df["filename"].tolist(), [f"{i}.png" for i in range(5)])
+        self.assertEqual(ml_df.iloc[3, 1:].tolist(), [1, 1, 0])
+        self.assertEqual(ml_df.iloc[4, 1:].tolist(), [0, 1, 1])
+
+        npz_path = os.path.join(self.tmp.name, "ml.npz")
+        csv_obj.archive(npz_path, ml)
+        matrix = sparse.load_npz(npz_path)
+        np.testing.assert_array_equal(matrix.toarray(), ml_df.iloc[:, 1:].to_numpy())
+
+        csv_path = os.path.join(self.tmp.name, "ml.csv")
+        csv_obj.archive(csv_path, ml)
+        pd.testing.assert_frame_equal(pd.read_csv(csv_path), ml_df)
+
+        csv_path = os.path.join(self.tmp.name, "ml.csv")
+        csv_obj.archive(csv_path, ml_df)
+        self.assertEqual(pd.read_csv(csv_path).values.tolist(), ml_df.values.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
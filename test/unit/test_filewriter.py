@@ -0,0 +1,58 @@
+import threading
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.filewriter import FileWriter
+
+
+class TestFileWriter(unittest.TestCase):
+
+    def test_queue_depth(self):
+        release, written = threading.Event(), []
+
+        def archive(location, data):
+            release.wait(5)
+            written.append(location)
+
+        writer = FileWriter(archive, n_writers=1, queue_depth=2)
+        writer.submit("0", None)
+        writer.submit("1", None)
+        # both slots are taken by pending writes, the next submit waits for one of them
+        blocked = threading.Thread(target=writer.submit, args=("2", None))
+        blocked.start()
+        blocked.join(0.2)
+        self.assertTrue(blocked.is_alive())
+        self.assertEqual(writer.n_files, 2)
+
+        release.set()
+        blocked.join(5)
+        self.assertFalse(blocked.is_alive())
+        writer.close()
+        self.assertEqual(sorted(written), ["0", "1", "2"])
+        self.assertEqual(writer.stats["files"], 3)
+
+    def test_write_error(self):
+        def archive(location, data):
+            if location == "bad":
+                raise OSError("disk full")
+
+        writer = FileWriter(archive, n_writers=2)
+        with self.assertRaises(SystemExit):
+            with writer:
+                writer.submit("good", None)
+                writer.submit("bad", None)
+        self.assertIsInstance(writer.error, OSError)
+
+        writer = FileWriter(archive, n_writers=1)
+        writer.submit("bad", None)
+        writer.executor.shutdown(wait=True)
+        # later submits stop at the first error instead of queueing more files
+        with self.assertRaises(SystemExit):
+            writer.submit("good", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
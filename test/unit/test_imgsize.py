@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+import logging
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.imgsize import SizeProber
+
+
+class TestSizeProber(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.images = {"rgb.png": ("RGB", (64, 48), {}),
+                       "gray.png": ("L", (7, 9), {}),
+                       "base.jpg": ("RGB", (123, 45), {}),
+                       "progressive.jpg": ("RGB", (320, 200), {"progressive": True}),
+                       "cmyk.jpg": ("CMYK", (31, 17), {}),
+                       "other.gif": ("RGB", (5, 6), {})}
+        for name, (mode, size, kwargs) in self.images.items():
+            Image.new(mode, size).save(os.path.join(self.tmp.name, name), **kwargs)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_probe_all(self):
+        names = sorted(self.images)
+        paths = [os.path.join(self.tmp.name, name) for name in names]
+        sizes = SizeProber(max_workers=2).probe_all(paths)
+        self.assertEqual([tuple(s) for s in sizes], [self.images[name][1] for name in names])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import sys
+import json
+import subprocess
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# loaded only by rendering, multilabel output and the header-less image fallback
+HEAVY_MODULES = ["matplotlib", "cv2", "PIL", "scipy", "sklearn"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import imgann
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in %r if m in sys.modules]}))
+""" % HEAVY_MODULES
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_heavy_modules_are_lazy(self):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], check=True, stdout=subprocess.PIPE).stdout
+        result = json.loads(out.decode().strip().splitlines()[-1])
+        logger.info(f"import imgann : {result['seconds']:.3f}s")
+        self.assertEqual(result["loaded"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
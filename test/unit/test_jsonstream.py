@@ -0,0 +1,62 @@
+import io
+import json
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.jsonstream import JSONStreamReader, ColumnBuffer
+
+
+class TestJSONStreamReader(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {"info": {"year": 2021},
+                     "images": [{"id": i, "file_name": f"{i}.jpg", "width": 640, "height": 480} for i in range(10)],
+                     "annotations": [{"id": i, "image_id": i % 10, "bbox": [1.5, 2, 30, 12345678]} for i in range(25)],
+                     "categories": []}
+
+    def test_items(self):
+        for chunk_size in [1, 7, 1 << 20]:
+            fp = io.StringIO(json.dumps(self.data, indent=2))
+            items = list(JSONStreamReader(fp, chunk_size).items(("images", "annotations", "categories")))
+            self.assertEqual([v for k, v in items if k == "images"], self.data["images"])
+            self.assertEqual([v for k, v in items if k == "annotations"], self.data["annotations"])
+            self.assertFalse([v for k, v in items if k in ("info", "categories")])
+
+    def test_truncated(self):
+        fp = io.StringIO(json.dumps(self.data)[:-20])
+        with self.assertRaises(ValueError):
+            list(JSONStreamReader(fp, 16).items(("annotations",)))
+
+    def test_column_buffer(self):
+        buffer = ColumnBuffer({"a": "int64", "b": "float64"}, capacity=2)
+        for i in range(5):
+            buffer.append(i, i / 2)
+        cols = buffer.to_dict()
+        self.assertEqual(cols["a"].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(cols["b"].tolist(), [0, 0.5, 1, 1.5, 2])
+
+    def test_column_buffer_set_dtype(self):
+        buffer = ColumnBuffer({"a": "int64", "b": "float64"}, capacity=2)
+        buffer.append(1, 0.5)
+        buffer.set_dtype("a", object)
+        buffer.append("x", 1.0)
+        buffer.append(3, 1.5)
+        self.assertEqual(buffer.to_dict()["a"].tolist(), [1, "x", 3])
+        self.assertEqual(buffer.to_dict()["b"].dtype, "float64")
+
+    def test_column_buffer_short_record(self):
+        buffer = ColumnBuffer({"a": "int64", "b": "float64"})
+        buffer.append(1, 0.5)
+        with self.assertRaises(ValueError):
+            buffer.append(2)
+        with self.assertRaises(ValueError):
+            buffer.append(2, 1.0, 3)
+        self.assertEqual(buffer.size, 1)
+        self.assertEqual(buffer.to_dict()["a"].tolist(), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
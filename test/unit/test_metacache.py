@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+import logging
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.metacache import MetadataCache
+from imgann.operators.imgdata import ImgData
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, (mode, fmt) in enumerate([("RGB", "png"), ("L", "jpg"), ("RGBA", "png")]):
+            path = os.path.join(self.tmp.name, f"{i}.{fmt}")
+            Image.new(mode, (10 + i, 20)).save(path)
+            self.paths.append(path)
+        self.cache_path = os.path.join(self.tmp.name, "cache", "metadata.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup(self):
+        cache = MetadataCache(self.cache_path)
+        expected = [(10, 20, "PNG", 3), (11, 20, "JPEG", 1), (12, 20, "PNG", 4)]
+        self.assertEqual(cache.lookup(self.paths), expected)
+        self.assertEqual(cache.stats["probed"], 3)
+        self.assertEqual(cache.lookup(self.paths), expected)
+        self.assertEqual(cache.stats["cached"], 3)
+
+        Image.new("RGB", (99, 20)).save(self.paths[0])
+        os.utime(self.paths[0], ns=(0, 0))
+        self.assertEqual(cache.lookup(self.paths[:1]), [(99, 20, "PNG", 3)])
+        self.assertEqual(cache.stats["probed"], 1)
+
+    def test_eviction(self):
+        MetadataCache(self.cache_path, max_entries=2).lookup(self.paths)
+        cache = MetadataCache(self.cache_path, max_entries=2)
+        cache.lookup(self.paths)
+        self.assertEqual(cache.stats["cached"], 2)
+
+    def test_missing_file(self):
+        cache = MetadataCache(self.cache_path)
+        paths = [self.paths[0], os.path.join(self.tmp.name, "missing.png")]
+        self.assertEqual(cache.lookup(paths), [(10, 20, "PNG", 3), (None, None, None, None)])
+        self.assertEqual(cache.lookup(paths)[0], (10, 20, "PNG", 3))
+        self.assertEqual(cache.stats["probed"], 1)
+
+    def test_imgdata_metadata(self):
+        dataset = ImgData.extract(self.tmp.name, metadata=self.cache_path).dataset
+        self.assertEqual(dataset[["name", "width", "height", "format", "channels"]].values.tolist(),
+                         [["0.png", 10, 20, "PNG", 3], ["1.jpg", 11, 20, "JPEG", 1], ["2.png", 12, 20, "PNG", 4]])
+        self.assertTrue(os.path.exists(self.cache_path))
+        self.assertNotIn("width", ImgData.extract(self.tmp.name).dataset.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import importlib.util
+import tempfile
+import unittest
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.parquet import Parquet
+
+
+@unittest.skipIf(importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed")
+class TestParquet(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dataset = pd.DataFrame({"name": ["a.png", "b.png"], "folder": ["x", "x"],
+                                     "path": ["x/a.png", "x/b.png"]})
+        self.images = self.dataset.assign(width=[10, 20], height=[30, 40], image_id=[1, 2])
+        self.annotations = pd.DataFrame({"obj_id": [1, 2, 3], "image_id": [1, 2, 2], "class_id": [1, 2, 1],
+                                         "x_min": [0, 1, 2], "y_min": [0, 1, 2], "x_max": [5, 6, 7],
+                                         "y_max": [5, 6, 7]})
+        self.classes = {1: "cat", 2: "dog"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        for ipc in [False, True]:
+            writer = Parquet(self.images)
+            writer.set_annotations(self.annotations)
+            writer.set_classes(self.classes)
+            writer.archive(self.tmp.name, writer.translate(), ipc)
+
+            reader = Parquet(self.dataset)
+            reader.extract(self.tmp.name)
+            pd.testing.assert_frame_equal(reader.annotations, self.annotations)
+            pd.testing.assert_frame_equal(reader.get_dataset(), self.images)
+            self.assertEqual(reader.classes, self.classes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.pascalvoc import PascalVOC
+
+XML = ("<annotation><filename>{name}</filename><size><width>{width}</width><height>20</height></size>"
+       "{objects}</annotation>")
+OBJECT = ("<object><name>{label}</name><bndbox><xmin>{x}</xmin><ymin>1</ymin><xmax>{x2}</xmax><ymax>9</ymax>"
+          "</bndbox></object>")
+
+
+class TestPascalVOC(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        names = [f"{i:02d}.png" for i in range(11)]
+        for i, name in enumerate(names):
+            objects = "".join(OBJECT.format(label=["cat", "dog"][j % 2], x=j, x2=j + 5) for j in range(i % 3))
+            with open(os.path.join(self.tmp.name, f"{i:02d}.xml"), "w") as fp:
+                fp.write(XML.format(name=name, width=30 + i, objects=objects))
+        self.dataset = pd.DataFrame({"name": names, "folder": "x", "path": [f"x/{n}" for n in names]})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def __extract(self, n_workers):
+        voc_obj = PascalVOC(self.dataset)
+        voc_obj.extract(self.tmp.name, n_workers=n_workers, chunk_size=3)
+        return voc_obj
+
+    def test_parallel_extract(self):
+        serial, parallel = self.__extract(1), self.__extract(2)
+        pd.testing.assert_frame_equal(parallel.get_dataset(), serial.get_dataset())
+        pd.testing.assert_frame_equal(parallel.annotations, serial.annotations)
+        self.assertEqual(parallel.classes, serial.classes)
+        self.assertEqual(sorted(serial.get_dataset()["image_id"]), list(range(1, 12)))
+        self.assertEqual(serial.annotations.shape[0], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import logging
+import numpy as np
+import cv2
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators import preview
+
+
+class TestContactSheets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.samples = []
+        for i in range(7):
+            path = os.path.join(self.tmp.name, f"{i}.png")
+            cv2.imwrite(path, np.full((40 + i, 80, 3), 200, dtype=np.uint8))
+            self.samples.append({"classes": [1], "bbox": [[(10, 10), (30, 30)]], "image_id": i + 1, "path": path})
+        self.classes = {1: "cat"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_annotate(self):
+        tile = preview.annotate(self.samples[0], self.classes, [40, 40])
+        self.assertEqual(tile.shape, (40, 40, 3))
+        # the 80x40 image is scaled to 40x20 and centered 10px down, so the box corner (10, 10) lands on x=5, y=15
+        self.assertEqual(tuple(tile[15, 5]), preview.PALETTE[1])
+        self.assertEqual(tuple(tile[0, 0]), preview.BACKGROUND)
+
+        missing = dict(self.samples[0], path=os.path.join(self.tmp.name, "missing.png"))
+        self.assertTrue((preview.annotate(missing, self.classes, [40, 40]) == preview.BACKGROUND).all())
+
+    def test_write_contact_sheets(self):
+        location = os.path.join(self.tmp.name, "sheets")
+        paths = preview.write_contact_sheets(location, self.samples, self.classes, [50, 30], columns=2, rows=2,
+                                             n_workers=2)
+        self.assertEqual([os.path.basename(p) for p in paths], ["sheet_000.png", "sheet_001.png"])
+        self.assertEqual(cv2.imread(paths[0]).shape, (60, 100, 3))
+        self.assertEqual(cv2.imread(paths[1]).shape, (60, 100, 3))
+
+    def test_write_previews(self):
+        location = os.path.join(self.tmp.name, "previews")
+        samples = self.samples + [dict(self.samples[0], image_id=99, path=os.path.join(self.tmp.name, "missing.png"))]
+        paths = preview.write_previews(location, samples, self.classes, max_size=40, n_workers=2, chunk_size=3)
+        self.assertEqual([os.path.basename(p) for p in paths], [f"{i + 1}_{i}.png" for i in range(7)])
+        img = cv2.imread(paths[0])
+        self.assertEqual(img.shape, (20, 40, 3))
+        self.assertEqual(tuple(img[5, 5]), preview.PALETTE[1])
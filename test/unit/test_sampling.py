@@ -0,0 +1,69 @@
+import unittest
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators import sampling
+from imgann.operators.csv import CSV
+
+
+class TestSampling(unittest.TestCase):
+
+    def setUp(self):
+        dataset = pd.DataFrame({"name": ["a.png", "b.png", "c.png", "d.png"], "folder": "x",
+                                "path": ["x/a.png", "x/b.png", "x/c.png", "x/d.png"], "image_id": [1, 2, 3, 4]})
+        self.operator = CSV(dataset)
+        self.operator.set_annotations(pd.DataFrame({"obj_id": [1, 2, 3, 4], "image_id": [2, 1, 2, 4],
+                                                    "class_id": [1, 2, 1, 2], "x_min": [0, 1, 2, 3],
+                                                    "y_min": [0, 1, 2, 3], "x_max": [5, 6, 7, 8],
+                                                    "y_max": [5, 6, 7, 8]}))
+        self.operator.set_classes({1: "cat", 2: "dog"})
+
+    def test_sample(self):
+        samples = self.operator.sample(10)
+        self.assertEqual([x["image_id"] for x in samples], [1, 2, 3, 4])
+        self.assertEqual(samples[1]["classes"], [1, 1])
+        self.assertEqual(samples[1]["bbox"], [[(0, 0), (5, 5)], [(2, 2), (7, 7)]])
+        self.assertEqual(samples[2]["bbox"], [])
+        self.assertEqual(self.operator.sample(2, 7), self.operator.sample(2, 7))
+
+        arrays = self.operator.sample(10, arrays=True)
+        np.testing.assert_array_equal(arrays[1]["bbox"], [[[0, 0], [5, 5]], [[2, 2], [7, 7]]])
+        self.assertEqual(arrays[2]["classes"].shape, (0,))
+
+    def test_stratified(self):
+        index = self.operator.sample_index()
+        self.assertEqual(index.sizes("class"), {1: 1, 2: 2})
+        self.assertEqual(index.sizes("folder"), {"x": 4})
+
+        samples = self.operator.sample_balanced(1, s=3)
+        self.assertTrue(any(1 in x["classes"] for x in samples))
+        self.assertTrue(any(2 in x["classes"] for x in samples))
+        self.assertEqual([x["image_id"] for x in self.operator.sample_balanced(1, class_ids=[1])], [2])
+
+        # image 2 has class 1 and 2, its rarest class is 1, so each class has one image left in its stratum
+        samples = self.operator.sample_stratified(2, rare_weight=1.0, s=3)
+        self.assertEqual(sorted(x["image_id"] for x in samples), [2, 4])
+        self.assertEqual(len(self.operator.sample_stratified(10, by="folder")), 4)
+        self.assertEqual(self.operator.sample_stratified(1, s=5), self.operator.sample_stratified(1, s=5))
+
+    def test_allocate(self):
+        np.testing.assert_array_equal(sampling._allocate(np.array([90, 9, 1]), 10), [9, 1, 0])
+        np.testing.assert_array_equal(sampling._allocate(np.array([90, 9, 1]), 10, rare_weight=1.0), [5, 4, 1])
+        np.testing.assert_array_equal(sampling._allocate(np.array([2, 0, 1]), 10), [2, 0, 1])
+
+    def test_take_ranges(self):
+        values = np.arange(10).reshape(5, 2)
+        rows, bounds = sampling.take_ranges(values, np.array([3, 0, 2]), np.array([5, 1, 2]))
+        np.testing.assert_array_equal(rows, [[6, 7], [8, 9], [0, 1]])
+        np.testing.assert_array_equal(bounds, [0, 2, 3, 3])
+
+    def test_reservoir(self):
+        self.assertEqual(sampling.reservoir(range(3), 5), [0, 1, 2])
+        picked = sampling.reservoir(iter(range(1000)), 10, 3)
+        self.assertEqual(len(set(picked)), 10)
+        self.assertEqual(picked, sorted(picked))
+        self.assertEqual(picked, sampling.reservoir(range(1000), 10, 3))
@@ -0,0 +1,97 @@
+import os
+import time
+import tempfile
+import unittest
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.scanner import DirScanner
+from imgann.operators.imgdata import ImgData
+
+
+class TestDirScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for folder, files in [("", ["a.png", "notes.txt"]),
+                              ("train", ["b.jpg", "c.JPEG"]),
+                              ("train/deep", ["d.png"]),
+                              ("test", [])]:
+            os.makedirs(os.path.join(self.root, folder), exist_ok=True)
+            for file in files:
+                open(os.path.join(self.root, folder, file), "w").close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan(self):
+        scanner = DirScanner(max_workers=2)
+        records = sorted(scanner.scan(self.root))
+        self.assertEqual([r[0] for r in records], ["a.png", "b.jpg", "c.JPEG", "d.png"])
+        self.assertEqual(records[1][1], "train")
+        self.assertEqual(records[3], ("d.png", "deep", os.path.join(self.root, "train", "deep", "d.png")))
+        self.assertEqual(scanner.stats["directories"], 4)
+        self.assertEqual(scanner.stats["files"], 5)
+
+    def __age(self, ns=10 ** 18):
+        """ move the folder mtimes out of the racy window of the next scan """
+        for folder, _, _ in os.walk(self.root):
+            os.utime(folder, ns=(ns, ns))
+
+    def test_scan_index(self):
+        index_path = os.path.join(self.root, "test", "index.sqlite")
+        self.__age()
+        first = sorted(DirScanner(index_path=index_path).scan(self.root))
+
+        scanner = DirScanner(index_path=index_path)
+        self.assertEqual(sorted(scanner.scan(self.root)), first)
+        self.assertEqual(scanner.stats["reused directories"], 3)
+
+        open(os.path.join(self.root, "train", "deep", "e.jpg"), "w").close()
+        self.assertEqual(len(list(scanner.scan(self.root))), 5)
+        self.assertEqual(scanner.stats["reused directories"], 2)
+
+    def test_scan_index_mtime(self):
+        index_path = os.path.join(self.root, "test", "index.sqlite")
+        folder = os.path.join(self.root, "train", "deep")
+        scanner = DirScanner(index_path=index_path)
+        self.__age()
+        list(scanner.scan(self.root))
+        # writing the index changed the mtime of its folder
+        self.__age()
+        list(scanner.scan(self.root))
+        self.assertEqual(scanner.stats["reused directories"], 4)
+
+        os.rename(os.path.join(folder, "d.png"), os.path.join(folder, "e.png"))
+        os.utime(folder, ns=(10 ** 18 + 1, 10 ** 18 + 1))
+        names = [r[0] for r in scanner.scan(self.root)]
+        self.assertIn("e.png", names)
+        self.assertNotIn("d.png", names)
+        self.assertEqual(scanner.stats["reused directories"], 3)
+
+    def test_scan_index_racy(self):
+        index_path = os.path.join(self.root, "index.sqlite")
+        folder = os.path.join(self.root, "train", "deep")
+        self.__age()
+        now = time.time_ns()
+        os.utime(folder, ns=(now, now))
+        scanner = DirScanner(index_path=index_path)
+        list(scanner.scan(self.root))
+
+        # a file added in the same mtime tick as the last scan leaves the folder mtime unchanged
+        open(os.path.join(folder, "e.png"), "w").close()
+        os.utime(folder, ns=(now, now))
+        self.assertIn("e.png", [r[0] for r in scanner.scan(self.root)])
+
+    def test_sampled_scan(self):
+        names = ImgData.extract(self.root, sample=2, seed=3).dataset["name"].tolist()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(set(names) <= {"a.png", "b.jpg", "c.JPEG", "d.png"})
+        self.assertEqual(ImgData.extract(self.root, sample=10).dataset.shape[0], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators import stages
+from imgann.operators.csv import CSV
+from imgann.operators.pascalvoc import PascalVOC
+
+
+class TestStages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        names = [f"{i}.png" for i in range(4)]
+        self.dataset = pd.DataFrame({"name": names, "folder": "x", "path": [f"x/{n}" for n in names]})
+        rows = [(names[i % 4], 100, 50, ["cat", "dog"][i % 2], i, i, i + 10, i + 20) for i in range(6)]
+        self.ann_path = os.path.join(self.tmp.name, "ann.csv")
+        pd.DataFrame(rows, columns=["filename", "width", "height", "class", "xmin", "ymin", "xmax", "ymax"]) \
+            .to_csv(self.ann_path, index=False)
+
+    def tearDown(self):
+        stages.configure(None)
+        self.tmp.cleanup()
+
+    def __convert(self):
+        csv_obj = CSV(self.dataset)
+        csv_obj.extract(self.ann_path)
+        voc_obj = PascalVOC.from_annotation_set(csv_obj.export())
+        for data in voc_obj.translate():
+            voc_obj.archive(os.path.join(self.tmp.name, data[1] + ".xml"), data[0])
+
+    def test_disabled(self):
+        stages.configure(None)
+        self.assertIs(stages.conversion(self.__convert)(), None)
+
+    def test_stage_records(self):
+        reports = []
+        stages.configure(reports.append, profile=True)
+        stages.conversion(self.__convert)()
+        self.assertEqual(len(reports), 1)
+        records = reports[0]["stages"]
+        self.assertEqual(records["CSV.extract"]["items"], 6)
+        self.assertEqual(records["PascalVOC.translate"]["items"], 4)
+        self.assertEqual(records["PascalVOC.archive"]["calls"], 4)
+        self.assertIn("traced_peak_mb", records["CSV.extract"])
+        self.assertGreaterEqual(reports[0]["total"]["wall_seconds"], records["CSV.extract"]["wall_seconds"])
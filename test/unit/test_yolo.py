@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+import logging
+import pandas as pd
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+from imgann.operators.yolo import Yolo
+
+
+class TestYolo(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.labels = {"a": "0 0.5 0.5 0.2 0.4\n1 0.25 0.25 0.1 0.1\n",
+                       "b": "",
+                       "c": "\n1 0.5 0.5 0.5 0.5\n\n"}
+        for name in self.labels:
+            Image.new("RGB", (100, 50)).save(os.path.join(self.root, f"{name}.png"))
+        names = sorted(f"{name}.png" for name in self.labels)
+        self.dataset = pd.DataFrame({"name": names, "folder": "x", "path": [f"x/{n}" for n in names]})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def __extract(self, metadata_cache=False):
+        for name, text in self.labels.items():
+            with open(os.path.join(self.root, f"{name}.txt"), "w") as fp:
+                fp.write(text)
+        yolo_obj = Yolo(self.dataset)
+        yolo_obj.extract(self.root, metadata_cache)
+        return yolo_obj
+
+    def test_label_files(self):
+        yolo_obj = self.__extract()
+        ids = dict(zip(yolo_obj.get_dataset()["name"], yolo_obj.get_dataset()["image_id"]))
+        self.assertEqual(yolo_obj.get_image_annotations(ids["a.png"])[:, 3:].tolist(),
+                         [[40, 15, 60, 35], [20, 9, 30, 14]])
+        self.assertEqual(yolo_obj.get_image_annotations(ids["b.png"]).shape[0], 0)
+        self.assertEqual(yolo_obj.get_image_annotations(ids["c.png"])[:, 3:].tolist(), [[25, 12, 75, 37]])
+        self.assertEqual(yolo_obj.classes, {1: "0.0", 2: "1.0"})
+
+    def test_corrupt_image(self):
+        with open(os.path.join(self.root, "a.png"), "wb") as fp:
+            fp.write(b"not an image")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            yolo_obj = self.__extract(os.path.join(cache_dir, "metadata.sqlite"))
+        dataset = yolo_obj.get_dataset()
+        self.assertEqual(dataset["name"].tolist(), ["b.png", "c.png"])
+        self.assertEqual(dataset["image_id"].dtype, "int64")
+        self.assertEqual(yolo_obj.annotations["image_id"].tolist(),
+                         dataset.loc[dataset["name"] == "c.png", "image_id"].tolist())
+        self.assertEqual(yolo_obj.annotations.loc[:, "x_min":].values.tolist(), [[25, 12, 75, 37]])
+
+    def test_empty_label_files(self):
+        self.labels = {name: "\n" for name in self.labels}
+        yolo_obj = self.__extract()
+        self.assertEqual(yolo_obj.annotations.shape[0], 0)
+        self.assertEqual(yolo_obj.get_dataset().shape[0], 3)
+
+    def test_malformed_label_files(self):
+        for line in ["0 0.5 0.5", "0 0.5 0.5 0.2 0.4 7", "0 0.5 0.5 0.2 0.4 7 8", "a 0.5 0.5 0.2 0.4",
+                     "0 0.5 x 0.2 0.4"]:
+            self.labels["b"] = line + "\n"
+            with self.assertRaises(SystemExit):
+                self.__extract()
+
+    def test_file_discovery(self):
+        os.makedirs(os.path.join(self.root, "sub", "deep"))
+        Image.new("RGB", (100, 50)).save(os.path.join(self.root, "sub", "deep", "d.JPG"), format="JPEG")
+        with open(os.path.join(self.root, "sub", "deep", "d.txt"), "w") as fp:
+            fp.write("2 0.5 0.5 0.2 0.2\n")
+        # a label file without an image and a file that is neither are skipped
+        with open(os.path.join(self.root, "sub", "orphan.txt"), "w") as fp:
+            fp.write("3 0.5 0.5 0.2 0.2\n")
+        open(os.path.join(self.root, "sub", "notes.md"), "w").close()
+        self.dataset = pd.concat([self.dataset, pd.DataFrame({"name": ["d.JPG"], "folder": "deep",
+                                                              "path": ["x/d.JPG"]})], ignore_index=True)
+
+        yolo_obj = self.__extract()
+        dataset = yolo_obj.get_dataset()
+        self.assertEqual(sorted(dataset["name"]), ["a.png", "b.png", "c.png", "d.JPG"])
+        self.assertEqual(dataset.loc[dataset["name"] == "d.JPG", ["width", "height"]].values.tolist(), [[100, 50]])
+        counts = {name: yolo_obj.get_image_annotations(image_id).shape[0]
+                  for name, image_id in zip(dataset["name"], dataset["image_id"])}
+        self.assertEqual(counts, {"a.png": 2, "b.png": 0, "c.png": 1, "d.JPG": 1})
+        self.assertEqual(sorted(yolo_obj.classes.values()), ["0.0", "1.0", "2.0"])
+
+
+if __name__ == "__main__":
+    unittest.main()